@@ -0,0 +1,60 @@
+# backend/app/api/admin.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel
+from ..profiling import is_admin_token, profile_store
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+SORT_KEYS = {"cumulative", "tottime", "calls", "ncalls", "time"}
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    created_at: str
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    trigger: str
+    request_id: Optional[str] = None
+
+
+class ProfileList(BaseModel):
+    profiles: List[ProfileSummary]
+
+
+@router.get("/profiles", response_model=ProfileList, dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Profiles in the ring buffer, newest first"""
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative"),
+    limit: int = Query(40, ge=1, le=500),
+):
+    """
+    format=text: the top `limit` functions by `sort`, as pstats prints them.
+    format=pstats: the raw stats file, for snakeviz or pstats.Stats().
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=422, detail=f"sort must be one of {', '.join(sorted(SORT_KEYS))}")
+    if format == "pstats":
+        path = profile_store.stats_path(profile_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+    text = profile_store.stats_text(profile_id, sort=sort, limit=limit)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(text)
@@ -1,61 +1,204 @@
 # backend/app/api/analytics.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from ..database import get_db
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from ..database import get_db, get_read_db
 from ..models.user import User
 from ..models.post import Post
 from ..models.analytics import PostAnalytics  
+from ..models.settings import UserSettings
+from ..models.post_terms import UserHashtagStats, UserTopicStats
 from ..api.users import get_current_user
+from ..api.conditional import (
+    dashboard_stamp, is_not_modified, latest, make_etag, not_modified, stamp_last_modified, validator_headers
+)
+from ..services.analytics_store import METRIC_FIELDS, upsert_post_metrics
+from ..services.post_terms import top_terms
+from ..services.analytics_buffer import ANALYTICS_WRITE_BEHIND, analytics_buffer
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
-@router.get("/dashboard")
+MAX_BULK_ITEMS = 5000
+
+class PostMetrics(BaseModel):
+    post_id: int
+    likes_count: Optional[int] = None
+    comments_count: Optional[int] = None
+    shares_count: Optional[int] = None
+    views_count: Optional[int] = None
+    clicks_count: Optional[int] = None
+    reach: Optional[int] = None
+    impressions: Optional[int] = None
+    audience_data: Optional[dict] = None
+    top_countries: Optional[list] = None
+
+class BulkAnalyticsRequest(BaseModel):
+    items: List[PostMetrics] = Field(..., max_length=MAX_BULK_ITEMS)
+
+class UserStats(BaseModel):
+    total_posts: int
+    drafts: int
+    scheduled: int
+    published: int
+
+class EngagementSummary(BaseModel):
+    total_likes: int
+    total_comments: int
+    total_shares: int
+    avg_engagement_rate: str
+
+class PostingTimeSlot(BaseModel):
+    day: str
+    hour_utc: int
+    score: float
+    posts: int
+
+class ContentPerformance(BaseModel):
+    best_performing_topics: List[str]
+    best_performing_hashtags: List[str]
+    optimal_post_length: str
+    best_posting_days: List[str]
+    optimal_posting_times: List[PostingTimeSlot]
+
+class DashboardResponse(BaseModel):
+    user_stats: UserStats
+    engagement_summary: EngagementSummary
+    content_performance: ContentPerformance
+
+class PostAnalyticsResponse(BaseModel):
+    post_id: int
+    likes_count: Optional[int] = None
+    comments_count: Optional[int] = None
+    shares_count: Optional[int] = None
+    views_count: Optional[int] = None
+    clicks_count: Optional[int] = None
+    engagement_rate: Optional[str] = None
+    reach: Optional[int] = None
+    impressions: Optional[int] = None
+    audience_data: Optional[dict] = None
+    top_countries: Optional[list] = None
+    peak_engagement_time: Optional[datetime] = None
+    metrics_history: Optional[list] = None
+    last_updated: Optional[datetime] = None
+
+class AnalyticsSnapshot(BaseModel):
+    likes_count: Optional[int] = None
+    engagement_rate: Optional[str] = None
+    impressions: Optional[int] = None
+
+class AnalyticsUpdateResponse(BaseModel):
+    success: bool
+    message: str
+    analytics: AnalyticsSnapshot
+
+class BulkAnalyticsResponse(BaseModel):
+    success: bool
+    updated: int
+    rejected_post_ids: List[int]
+
+class TrendPoint(BaseModel):
+    date: date
+    impressions: Optional[int] = None
+    engagement_rate: Optional[str] = None
+    likes: Optional[int] = None
+    comments: Optional[int] = None
+    shares: Optional[int] = None
+    post_type: Optional[str] = None
+
+class PerformanceTrendsResponse(BaseModel):
+    period: str
+    data_points: int
+    trends: List[TrendPoint]
+
+@router.get("/dashboard", response_model=DashboardResponse)
 async def get_analytics_dashboard(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    now = datetime.utcnow()
+    thirty_days_ago = now - timedelta(days=30)
     
-    # Get ALL posts, not just published ones with analytics
-    all_posts = db.query(Post).filter(
-        Post.user_id == current_user.id,
-        Post.created_at >= thirty_days_ago
-    ).all()
+    # Answer polls from the version stamp when nothing changed. The date is
+    # part of it because the 30-day window moves on its own.
+    stamp = dashboard_stamp(db, current_user.id)
+    last_modified = latest(stamp_last_modified(stamp), now.replace(hour=0, minute=0, second=0, microsecond=0))
+    etag = make_etag("dashboard", current_user.id, stamp, now.date())
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+    response.headers.update(headers)
+    
+    # Counts and engagement totals per status in one grouped query
+    # (posts without analytics count, with zero engagement)
+    by_status = {
+        row.status: row for row in db.query(
+            Post.status,
+            func.count(Post.id).label("posts"),
+            func.coalesce(func.sum(PostAnalytics.likes_count), 0).label("likes"),
+            func.coalesce(func.sum(PostAnalytics.comments_count), 0).label("comments"),
+            func.coalesce(func.sum(PostAnalytics.shares_count), 0).label("shares"),
+        )
+        .outerjoin(PostAnalytics, PostAnalytics.post_id == Post.id)
+        .filter(
+            Post.user_id == current_user.id,
+            Post.created_at >= thirty_days_ago
+        )
+        .group_by(Post.status)
+    }
+    
+    def count(status: str) -> int:
+        return by_status[status].posts if status in by_status else 0
     
-    published_posts = [p for p in all_posts if p.status == "published"]
+    published = by_status.get("published")
+    published_count = count("published")
+    total_likes = published.likes if published else 0
+    total_comments = published.comments if published else 0
+    total_shares = published.shares if published else 0
     
-    # Calculate stats including posts without analytics
-    total_likes = sum(p.analytics.likes_count if p.analytics else 0 for p in published_posts)
-    total_comments = sum(p.analytics.comments_count if p.analytics else 0 for p in published_posts)
-    total_shares = sum(p.analytics.shares_count if p.analytics else 0 for p in published_posts)
+    # Filled in by the posting-times job (app/workers/posting_times.py)
+    posting_times = db.query(UserSettings.optimal_posting_times).filter(
+        UserSettings.user_id == current_user.id
+    ).scalar() or []
+    best_days = list(dict.fromkeys(slot["day"] for slot in posting_times))[:3]
+    
+    # Incrementally maintained per-user aggregates (services/post_terms.py)
+    best_topics = top_terms(db, current_user.id, UserTopicStats, "topic")
+    best_hashtags = top_terms(db, current_user.id, UserHashtagStats, "hashtag")
     
     return {
         "user_stats": {
-            "total_posts": len(all_posts),
-            "drafts": len([p for p in all_posts if p.status == "draft"]),
-            "scheduled": len([p for p in all_posts if p.status == "scheduled"]),
-            "published": len(published_posts),
+            "total_posts": sum(row.posts for row in by_status.values()),
+            "drafts": count("draft"),
+            "scheduled": count("scheduled"),
+            "published": published_count,
         },
         "engagement_summary": {
             "total_likes": total_likes,
             "total_comments": total_comments,
             "total_shares": total_shares,
-            "avg_engagement_rate": "0%" if not published_posts else f"{(total_likes + total_comments + total_shares) / len(published_posts):.1f}%",
+            "avg_engagement_rate": "0%" if not published_count else f"{(total_likes + total_comments + total_shares) / published_count:.1f}%",
         },
         "content_performance": {
-            "best_performing_topics": ["AI", "Technology", "Innovation"],
+            "best_performing_topics": best_topics,
+            "best_performing_hashtags": best_hashtags,
             "optimal_post_length": "Medium",
-            "best_posting_days": ["Tuesday", "Wednesday", "Thursday"],
+            "best_posting_days": best_days or ["Tuesday", "Wednesday", "Thursday"],
+            "optimal_posting_times": posting_times,
         }
     }
 
 
-@router.get("/post/{post_id}")
+@router.get("/post/{post_id}", response_model=PostAnalyticsResponse)
 async def get_post_analytics(
     post_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get analytics for a specific post"""
     
@@ -84,7 +227,7 @@ async def get_post_analytics(
         "last_updated": analytics.last_updated
     }
 
-@router.post("/update/{post_id}")
+@router.post("/update/{post_id}", response_model=AnalyticsUpdateResponse)
 async def update_post_analytics(
     post_id: int,
     analytics_data: dict,
@@ -101,56 +244,28 @@ async def update_post_analytics(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Update or create analytics record
-    analytics = db.query(PostAnalytics).filter(
-        PostAnalytics.post_id == post_id
-    ).first()
-    
-    if analytics:
-        # Update existing
-        analytics.likes_count = analytics_data.get("likes_count", analytics.likes_count)
-        analytics.comments_count = analytics_data.get("comments_count", analytics.comments_count)
-        analytics.shares_count = analytics_data.get("shares_count", analytics.shares_count)
-        analytics.views_count = analytics_data.get("views_count", analytics.views_count)
-        analytics.clicks_count = analytics_data.get("clicks_count", analytics.clicks_count)
-        analytics.reach = analytics_data.get("reach", analytics.reach)
-        analytics.impressions = analytics_data.get("impressions", analytics.impressions)
-        
-        # Calculate engagement rate
-        total_engagement = analytics.likes_count + analytics.comments_count + analytics.shares_count
-        if analytics.impressions > 0:
-            engagement_rate = (total_engagement / analytics.impressions) * 100
-            analytics.engagement_rate = f"{engagement_rate:.1f}%"
-        
-        analytics.last_updated = datetime.utcnow()
-    else:
-        # Create new analytics record
-        total_engagement = (
-            analytics_data.get("likes_count", 0) + 
-            analytics_data.get("comments_count", 0) + 
-            analytics_data.get("shares_count", 0)
-        )
-        impressions = analytics_data.get("impressions", 0)
-        engagement_rate = (total_engagement / impressions * 100) if impressions > 0 else 0
-        
-        analytics = PostAnalytics(
-            user_id=current_user.id,
-            post_id=post_id,
-            likes_count=analytics_data.get("likes_count", 0),
-            comments_count=analytics_data.get("comments_count", 0),
-            shares_count=analytics_data.get("shares_count", 0),
-            views_count=analytics_data.get("views_count", 0),
-            clicks_count=analytics_data.get("clicks_count", 0),
-            engagement_rate=f"{engagement_rate:.1f}%",
-            reach=analytics_data.get("reach", 0),
-            impressions=impressions,
-            audience_data=analytics_data.get("audience_data", {}),
-            top_countries=analytics_data.get("top_countries", [])
-        )
-        db.add(analytics)
+    # Coalesce bursts in memory; falls through to a direct write when the buffer is full
+    if ANALYTICS_WRITE_BEHIND:
+        pending = analytics_buffer.add(current_user.id, post_id, analytics_data)
+        if pending is not None:
+            return {
+                "success": True,
+                "message": "Analytics update queued",
+                "analytics": {
+                    "likes_count": pending.get("likes_count"),
+                    "engagement_rate": None,
+                    "impressions": pending.get("impressions")
+                }
+            }
     
+    # Update or create in one upsert (also keeps topic/hashtag engagement stats in step)
+    fields = {
+        k: v for k, v in analytics_data.items()
+        if k in METRIC_FIELDS or k in ("audience_data", "top_countries")
+    }
+    upsert_post_metrics(db, [{"post_id": post_id, "user_id": current_user.id, **fields}])
     db.commit()
-    db.refresh(analytics)
+    analytics = db.query(PostAnalytics).filter(PostAnalytics.post_id == post_id).first()
     
     return {
         "success": True,
@@ -162,37 +277,79 @@ async def update_post_analytics(
         }
     }
 
-@router.get("/performance-trends")
+@router.post("/bulk-update", response_model=BulkAnalyticsResponse)
+async def bulk_update_post_analytics(
+    request: BulkAnalyticsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upsert metrics for many posts in one transaction (for sync jobs)"""
+    
+    requested_ids = {item.post_id for item in request.items}
+    
+    # One set-based ownership check for the whole batch
+    owned_ids = {
+        post_id for (post_id,) in db.query(Post.id).filter(
+            Post.id.in_(requested_ids),
+            Post.user_id == current_user.id
+        )
+    }
+    
+    rows = [
+        {**item.model_dump(exclude_none=True), "user_id": current_user.id}
+        for item in request.items
+        if item.post_id in owned_ids
+    ]
+    updated = upsert_post_metrics(db, rows)
+    db.commit()
+    
+    return {
+        "success": True,
+        "updated": updated,
+        "rejected_post_ids": sorted(requested_ids - owned_ids)
+    }
+
+@router.get("/performance-trends", response_model=PerformanceTrendsResponse)
 async def get_performance_trends(
     days: int = 30,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get performance trends over time"""
     
     start_date = datetime.utcnow() - timedelta(days=days)
     
-    posts_with_analytics = db.query(Post, PostAnalytics).join(
+    # Only the columns the response needs, as plain row tuples
+    rows = db.query(
+        Post.published_time,
+        PostAnalytics.impressions,
+        PostAnalytics.engagement_rate,
+        PostAnalytics.likes_count,
+        PostAnalytics.comments_count,
+        PostAnalytics.shares_count,
+        Post.post_type,
+    ).join(
         PostAnalytics, Post.id == PostAnalytics.post_id
     ).filter(
         Post.user_id == current_user.id,
         Post.published_time >= start_date
     ).order_by(Post.published_time).all()
     
-    trends_data = []
-    for post, analytics in posts_with_analytics:
-        trends_data.append({
-            "date": post.published_time.date(),
-            "impressions": analytics.impressions,
-            "engagement_rate": analytics.engagement_rate,
-            "likes": analytics.likes_count,
-            "comments": analytics.comments_count,
-            "shares": analytics.shares_count,
-            "post_type": post.post_type
-        })
+    trends_data = [
+        {
+            "date": published_time.date(),
+            "impressions": impressions,
+            "engagement_rate": engagement_rate,
+            "likes": likes,
+            "comments": comments,
+            "shares": shares,
+            "post_type": post_type
+        }
+        for published_time, impressions, engagement_rate, likes, comments, shares, post_type in rows
+    ]
     
-    return {
+    return ORJSONResponse({
         "period": f"Last {days} days",
         "data_points": len(trends_data),
         "trends": trends_data
-    }
+    })
@@ -0,0 +1,110 @@
+# backend/app/api/conditional.py
+"""
+Conditional GET support (ETag / Last-Modified, 304 Not Modified).
+
+Endpoints compute a cheap version stamp first (counts and latest
+timestamps, served from indexes), derive validators from it and answer
+304 when the client's copy is current, before running their real query.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.analytics import PostAnalytics
+from ..models.post import Post
+from ..models.settings import UserSettings
+
+# Per-user payloads: browsers may keep them but must revalidate every time
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps (sqlite) are UTC; HTTP dates have one-second resolution
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def latest(*values: Optional[datetime]) -> Optional[datetime]:
+    """Most recent of the non-null timestamps, in UTC"""
+    present = [_utc(v) for v in values if v is not None]
+    return max(present) if present else None
+
+
+def stamp_last_modified(stamp: Tuple) -> Optional[datetime]:
+    """Latest timestamp in a version stamp, for Last-Modified"""
+    return latest(*(value for value in stamp if isinstance(value, datetime)))
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over a version stamp (the body is derived from it, not hashed)"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None,
+                      cache_control: str = PRIVATE_CACHE_CONTROL) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    if cache_control.startswith("private"):
+        headers["Vary"] = "Authorization"
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate If-None-Match (weak comparison) or, only when that is absent,
+    If-Modified-Since, as RFC 9110 orders them.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _utc(last_modified) <= _utc(since)
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def post_stamp(db: Session, user_id: int) -> Tuple:
+    """
+    (count, latest created_at, latest updated_at) over all of a user's
+    posts. Any insert, edit or status change moves it, including a draft
+    leaving the draft list.
+    """
+    return tuple(
+        db.query(func.count(Post.id), func.max(Post.created_at), func.max(Post.updated_at))
+        .filter(Post.user_id == user_id)
+        .one()
+    )
+
+
+def dashboard_stamp(db: Session, user_id: int) -> Tuple:
+    """post_stamp plus the user's analytics and posting-time refreshes"""
+    analytics_count, analytics_changed = (
+        db.query(
+            func.count(PostAnalytics.id),
+            func.max(func.coalesce(PostAnalytics.last_updated, PostAnalytics.first_tracked)),
+        )
+        .filter(PostAnalytics.user_id == user_id)
+        .one()
+    )
+    posting_times_computed_at = db.query(UserSettings.posting_times_computed_at).filter(
+        UserSettings.user_id == user_id
+    ).scalar()
+    return post_stamp(db, user_id) + (analytics_count, analytics_changed, posting_times_computed_at)
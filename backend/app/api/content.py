@@ -2,19 +2,40 @@
 
 
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import logging
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
-from ..database import get_db
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from ..database import SessionLocal, get_db, get_read_db
 from ..models.user import User
 from ..models.post import Post
+from ..models.generation_job import GenerationJob
+from ..auth.auth_utils import get_current_user_from_token
 from ..services.gemini_content_service import GeminiContentService
+from ..services.post_terms import add_post_terms
+from ..services.hashtag_recommender import hashtag_recommender
+from ..services.topic_suggestions import topic_suggestion_cache
+from ..services.generation_jobs import (
+    TERMINAL_STATUSES, GenerationQueueFull, Progress, generation_queue, job_payload, no_progress
+)
 from ..api.users import get_current_user
+from ..api.idempotency import idempotency_claim, replay_response
+from ..services.idempotency import IdempotencyClaim
+from ..api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PostFields, parse_fields, paginate_posts
+from ..api.conditional import (
+    is_not_modified, make_etag, not_modified, post_stamp, stamp_last_modified, validator_headers
+)
 from datetime import datetime
 from ..models.post import Post
 
 router = APIRouter(prefix="/api/content", tags=["content"])
+logger = logging.getLogger(__name__)
 ai_service = GeminiContentService()
 
 class ContentGenerationRequest(BaseModel):
@@ -31,6 +52,12 @@ class SaveDraftRequest(BaseModel):
     hashtags: List[str]
     topic: str
 
+class HashtagRecommendationRequest(BaseModel):
+    content: str
+    hashtags: List[str] = []
+    industry: Optional[str] = None
+    k: int = Field(5, ge=1, le=20)
+
 class GeneratedContentResponse(BaseModel):
     content: str
     hashtags: List[str]
@@ -41,6 +68,42 @@ class GeneratedContentResponse(BaseModel):
     estimated_engagement: dict
     character_count: Optional[int] = None
     post_id: int  
+    status: str = "success"
+    warnings: List[str] = []
+
+class ContentVariationsResponse(BaseModel):
+    topic: str
+    variations: List[Dict[str, Any]]
+    total: int
+
+class HashtagRecommendation(BaseModel):
+    hashtag: str
+    score: float
+    lift: float
+
+class HashtagRecommendationResponse(BaseModel):
+    recommendations: List[HashtagRecommendation]
+
+class SaveDraftResponse(BaseModel):
+    message: str
+    post_id: int
+    status: str
+
+class DraftsPage(BaseModel):
+    drafts: List[PostFields]
+    total: int
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+class PostsPage(BaseModel):
+    posts: List[PostFields]
+    total: int
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+class TopicSuggestionsResponse(BaseModel):
+    industry: str
+    suggestions: List[str]
 
 
 # @router.post("/generate", response_model=GeneratedContentResponse)
@@ -160,14 +223,35 @@ def trim_content_to_limit(content: str, hashtags: list[str], max_characters: int
 async def generate_content(
     request: ContentGenerationRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Optional[IdempotencyClaim] = Depends(idempotency_claim)
 ):
-    """Generate AI-powered LinkedIn content using Google Gemini with strict character enforcement"""
+    """
+    Generate AI-powered LinkedIn content using Google Gemini with strict character enforcement.
+    Retries that send the same Idempotency-Key get the first response back (no new call or Post).
+    """
+    
+    if idempotency and idempotency.replay:
+        return replay_response(idempotency)
     
+    response = await _generate_post(db, current_user, request)
+    if idempotency:
+        idempotency.complete(response)
+    db.commit()
+    return response
+
+
+async def _generate_post(db: Session, current_user: User, request: ContentGenerationRequest,
+                         progress: Progress = no_progress) -> Dict[str, Any]:
+    """
+    The /generate pipeline, shared with generation jobs. Adds the post to
+    the session (flushed, not committed) and returns the response body.
+    """
     warnings = []
     max_chars = getattr(request, "max_characters", None) or 3000
 
     # Step 0: Ask Gemini to generate content
+    await progress("generating")
     result = await ai_service.generate_linkedin_post(
         user=current_user,
         topic=request.topic,
@@ -189,6 +273,7 @@ async def generate_content(
 
     # Step 2: Retry with stricter AI prompt if needed
     if status == "exceeds_limit":
+        await progress("rewriting")
         retry_prompt = (
             f"Rewrite this LinkedIn post as a detailed long-form LinkedIn article. "
             f"Target between {int(max_chars*0.9)} and {max_chars} characters "
@@ -211,9 +296,18 @@ async def generate_content(
             _, _, total_chars = calculate_character_limit_status(content, hashtags, max_chars)
             warnings.append("Fallback trimming applied to enforce character limit")
 
-
+    # Step 3: Swap weak hashtags for better performers in the user's industry (no extra LLM call)
+    await progress("hashtags")
+    content, hashtags, swaps = hashtag_recommender.improve_hashtags(
+        db, request.industry or current_user.industry, content, hashtags,
+        fits=lambda c, h: calculate_character_limit_status(c, h, max_chars)[0] != "exceeds_limit"
+    )
+    if swaps:
+        total_chars = calculate_character_limit_status(content, hashtags, max_chars)[2]
+        warnings.append("Replaced low-performing hashtags: " + ", ".join(f"#{old} → #{new}" for old, new in swaps))
 
     # Step 4: Save to DB
+    await progress("saving")
     new_post = Post(
         user_id=current_user.id,
         content=content,
@@ -227,10 +321,9 @@ async def generate_content(
     )
     
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    add_post_terms(db, new_post)  # flushes, so new_post.id is set
     
-    # Step 5: Final response
+    # Step 5: Final response; callers store it (idempotency, job result) in the same transaction as the post
     return {
         "content": content,
         "hashtags": hashtags,
@@ -247,14 +340,14 @@ async def generate_content(
 
 
 
-@router.post("/generate-variations")
+@router.post("/generate-variations", response_model=ContentVariationsResponse)
 async def generate_content_variations(
     topic: str,
     current_user: User = Depends(get_current_user)
 ):
     """Generate multiple content variations for A/B testing"""
     
-    variations = ai_service.generate_multiple_variations(current_user, topic, count=3)
+    variations = await ai_service.generate_multiple_variations(current_user, topic, count=3)
     
     return {
         "topic": topic,
@@ -262,7 +355,20 @@ async def generate_content_variations(
         "total": len(variations)
     }
 
-@router.post("/save-draft")
+@router.post("/hashtags/recommend", response_model=HashtagRecommendationResponse)
+async def recommend_hashtags(
+    request: HashtagRecommendationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Top-k hashtags for a draft, from co-occurrence and engagement in the user's industry"""
+    return {
+        "recommendations": hashtag_recommender.recommend(
+            db, request.industry or current_user.industry, request.content, request.hashtags, request.k
+        )
+    }
+
+@router.post("/save-draft", response_model=SaveDraftResponse)
 async def save_draft(
     request: SaveDraftRequest,
     current_user: User = Depends(get_current_user),
@@ -280,6 +386,7 @@ async def save_draft(
     )
     
     db.add(draft_post)
+    add_post_terms(db, draft_post)
     db.commit()
     db.refresh(draft_post)
     
@@ -289,26 +396,93 @@ async def save_draft(
         "status": "draft"
     }
 
-@router.get("/drafts")
+@router.get("/drafts", response_model=DraftsPage)
 async def get_user_drafts(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get all drafts for current user"""
+    """Get drafts for current user, newest first, one page at a time"""
     
-    drafts = db.query(Post).filter(
-        Post.user_id == current_user.id,
-        Post.status == "draft"
-    ).order_by(Post.created_at.desc()).all()
+    selected = parse_fields(fields)
     
-    return {
+    # Polls with a current ETag are answered from the version stamp alone
+    stamp = post_stamp(db, current_user.id)
+    last_modified = stamp_last_modified(stamp)
+    etag = make_etag("drafts", current_user.id, stamp, cursor, limit, selected)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+    
+    drafts, next_cursor = paginate_posts(
+        db,
+        [Post.user_id == current_user.id, Post.status == "draft"],
+        selected,
+        cursor=cursor,
+        limit=limit
+    )
+    
+    # Rows go straight to orjson; returning the response skips re-validating each one
+    return ORJSONResponse({
         "drafts": drafts,
-        "total": len(drafts)
+        "total": len(drafts),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }, headers=headers)
+
+@router.get("/posts", response_model=PostsPage)
+async def list_user_posts(
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """List current user's posts, optionally filtered by status"""
+    
+    filters = [Post.user_id == current_user.id]
+    if status:
+        filters.append(Post.status == status)
+    
+    selected = parse_fields(fields)
+    posts, next_cursor = paginate_posts(db, filters, selected, cursor=cursor, limit=limit)
+    
+    return ORJSONResponse({
+        "posts": posts,
+        "total": len(posts),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    })
+
+@router.get("/suggestions/{industry}", response_model=TopicSuggestionsResponse)
+async def get_topic_suggestions(industry: str, request: Request, response: Response):
+    """
+    Get AI-generated trending topic suggestions for industry.
+    They are the same for every user, so they are cached per industry and
+    marked cacheable by shared caches until the entry expires.
+    """
+    
+    cached = await topic_suggestion_cache.get(industry, generate_topic_suggestions)
+    etag = make_etag("suggestions", industry, cached.generated_at, cached.suggestions)
+    headers = validator_headers(etag, cached.generated_at, f"public, max-age={cached.max_age()}")
+    if is_not_modified(request, etag, cached.generated_at):
+        return not_modified(headers)
+    
+    response.headers.update(headers)
+    return {
+        "industry": industry,
+        "suggestions": cached.suggestions
     }
 
-@router.get("/suggestions/{industry}")
-async def get_topic_suggestions(industry: str):
-    """Get AI-generated trending topic suggestions for industry"""
+async def generate_topic_suggestions(industry: str):
+    """
+    Returns:
+        (suggestions, is_fallback)
+    """
     
     try:
         # Use your existing AI service to generate suggestions
@@ -323,26 +497,21 @@ async def get_topic_suggestions(industry: str):
         ai_response = await ai_service.generate_content(ai_prompt)
         
         # Parse the AI response into a list of suggestions
-        if ai_response and 'content' in ai_response:
+        if ai_response and ai_response.get('content') and 'error' not in ai_response:
             suggestions_text = ai_response['content']
             suggestions_list = [
                 line.strip() 
                 for line in suggestions_text.split('\n') 
                 if line.strip() and not line.strip().startswith('-')
             ][:5]  # Limit to 5 suggestions
-        else:
-            # Fallback to hardcoded if AI fails
-            suggestions_list = get_fallback_suggestions(industry)
+            if suggestions_list:
+                return suggestions_list, False
         
     except Exception as e:
-        print(f"AI suggestion generation failed: {e}")
-        # Fallback to hardcoded suggestions
-        suggestions_list = get_fallback_suggestions(industry)
+        logger.warning("AI suggestion generation failed", extra={"industry": industry, "error": str(e)})
     
-    return {
-        "industry": industry,
-        "suggestions": suggestions_list
-    }
+    # Fallback to hardcoded suggestions if AI fails
+    return get_fallback_suggestions(industry), True
 
 def get_fallback_suggestions(industry: str):
     """Fallback hardcoded suggestions if AI fails"""
@@ -392,20 +561,44 @@ class SchedulePostRequest(BaseModel):
     post_id: int
     scheduled_time: datetime
 
-@router.post("/schedule-post")
+class SchedulePostResponse(BaseModel):
+    success: bool
+    message: str
+    post_id: int
+    scheduled_time: datetime
+
+@router.post("/schedule-post", response_model=SchedulePostResponse)
 async def schedule_post(
     request: SchedulePostRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    # Published by app.workers.scheduler; clear any lease from an earlier schedule.
+    # Conditional, so a post already published or being published is never re-armed.
+    scheduled = db.execute(
+        update(Post)
+        .where(
+            Post.id == request.post_id,
+            Post.user_id == current_user.id,
+            Post.status.notin_(("published", "publishing")),
+            Post.linkedin_post_id.is_(None),
+        )
+        .values(
+            scheduled_time=request.scheduled_time,
+            status="scheduled",
+            publish_lease_until=None,
+            publish_worker_id=None,
+            publish_attempts=0,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+
     post = db.query(Post).filter_by(id=request.post_id, user_id=current_user.id).first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    post.scheduled_time = request.scheduled_time
-    post.status = "scheduled"
-    db.commit()
-    db.refresh(post)
+    if not scheduled:
+        raise HTTPException(status_code=409, detail="Post is already published or being published")
     
     return {
         "success": True,
@@ -415,9 +608,11 @@ async def schedule_post(
     }
 
 # Add this new Pydantic model
+SUGGESTION_TYPES = ("improve", "shorten", "expand", "tone_change", "custom")
+
 class ContentSuggestionRequest(BaseModel):
     current_content: str
-    suggestion_type: str = "improve"  # improve, shorten, expand, tone_change, custom
+    suggestion_type: str = "improve"  # one of SUGGESTION_TYPES
     target_tone: Optional[str] = None
     specific_request: Optional[str] = None
     max_characters: Optional[int] = 3000
@@ -436,10 +631,27 @@ class ContentSuggestionResponse(BaseModel):
 async def improve_content(
     request: ContentSuggestionRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Optional[IdempotencyClaim] = Depends(idempotency_claim)
 ):
-    """Rewrite LinkedIn content by applying improvements directly with character limit enforcement"""
+    """
+    Rewrite LinkedIn content by applying improvements directly with character limit enforcement.
+    Honours Idempotency-Key like /generate.
+    """
+    
+    if idempotency and idempotency.replay:
+        return replay_response(idempotency)
     
+    response = await _improve_post(db, current_user, request)
+    if idempotency:
+        idempotency.complete(response)
+    db.commit()
+    return response
+
+
+async def _improve_post(db: Session, current_user: User, request: ContentSuggestionRequest,
+                        progress: Progress = no_progress) -> Dict[str, Any]:
+    """The /improve pipeline, shared with generation jobs (see _generate_post)"""
     warnings = []
     max_chars = getattr(request, "max_characters", None) or 3000
 
@@ -507,6 +719,7 @@ async def improve_content(
         raise HTTPException(status_code=400, detail="Invalid suggestion type")
 
     # Step 1: Ask Gemini to rewrite
+    await progress("generating")
     result = await ai_service.generate_content(ai_prompt)
 
     if "error" in result:
@@ -520,6 +733,7 @@ async def improve_content(
     status, _, total_chars = calculate_character_limit_status(content, hashtags, max_chars)
 
     if status == "exceeds_limit":
+        await progress("rewriting")
         retry_prompt = (
             f"Rewrite this LinkedIn post to stay within {max_chars} characters. "
             f"Do not drop the main ideas, just make it concise:\n\n{content}"
@@ -541,6 +755,7 @@ async def improve_content(
             warnings.append("Fallback trimming applied to enforce character limit")
 
     # Step 3: Save improved post to DB
+    await progress("saving")
     new_post = Post(
         user_id=current_user.id,
         content=content,
@@ -553,8 +768,7 @@ async def improve_content(
         predicted_engagement=engagement
     )
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    add_post_terms(db, new_post)  # flushes, so new_post.id is set
 
     # Step 4: Final structured response
     return {
@@ -570,3 +784,153 @@ async def improve_content(
         "warnings": warnings,
         "post_id": new_post.id
     }
+
+
+# --- Generation jobs: /generate and /improve without holding the request open ---
+
+class GenerationJobResponse(BaseModel):
+    job_id: int
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    stage: Optional[str] = None  # while running: starting, generating, rewriting, hashtags, saving
+    result: Optional[GeneratedContentResponse] = None
+    error: Optional[str] = None
+    post_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    status_url: str
+    ws_url: str
+
+# Clients poll this often at most; WebSocket watchers re-read the job on this interval too,
+# for jobs run by another process (or by Celery) that this one can't notify about
+JOB_POLL_INTERVAL_SECONDS = 1
+
+generation_queue.register("generate", ContentGenerationRequest, _generate_post)
+generation_queue.register("improve", ContentSuggestionRequest, _improve_post)
+
+
+def _submit_generation_job(db: Session, current_user: User, kind: str, request: BaseModel,
+                           idempotency: Optional[IdempotencyClaim]):
+    try:
+        job = generation_queue.submit(db, current_user.id, kind, request)
+    except GenerationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    response = job_payload(job)
+    if idempotency:
+        idempotency.complete(jsonable_encoder(response), status_code=202)
+    # The job and its idempotency key commit together, and only then can a worker see it
+    db.commit()
+    generation_queue.enqueue(response["job_id"])
+    return ORJSONResponse(response, status_code=202, headers={
+        "Location": response["status_url"], "Retry-After": str(JOB_POLL_INTERVAL_SECONDS)
+    })
+
+
+@router.post("/generation-jobs/generate", status_code=202, response_model=GenerationJobResponse)
+async def submit_generate_job(
+    request: ContentGenerationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    idempotency: Optional[IdempotencyClaim] = Depends(idempotency_claim)
+):
+    """Queue a /generate run and return its job right away; poll status_url or watch ws_url"""
+    if idempotency and idempotency.replay:
+        return replay_response(idempotency)
+    return _submit_generation_job(db, current_user, "generate", request, idempotency)
+
+
+@router.post("/generation-jobs/improve", status_code=202, response_model=GenerationJobResponse)
+async def submit_improve_job(
+    request: ContentSuggestionRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    idempotency: Optional[IdempotencyClaim] = Depends(idempotency_claim)
+):
+    """Queue an /improve run and return its job right away"""
+    if idempotency and idempotency.replay:
+        return replay_response(idempotency)
+    if request.suggestion_type not in SUGGESTION_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid suggestion type")
+    return _submit_generation_job(db, current_user, "improve", request, idempotency)
+
+
+@router.get("/generation-jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the status (and, once succeeded, the result) of a generation job"""
+    job = db.query(GenerationJob).filter_by(id=job_id, user_id=current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    payload = job_payload(job)
+    if job.status in TERMINAL_STATUSES:
+        return payload
+    return ORJSONResponse(payload, headers={"Retry-After": str(JOB_POLL_INTERVAL_SECONDS)})
+
+
+def _load_job_payload(job_id: int, user_id: int) -> Optional[Dict]:
+    db = SessionLocal()
+    try:
+        job = db.query(GenerationJob).filter_by(id=job_id, user_id=user_id).first()
+        return job_payload(job) if job else None
+    finally:
+        db.close()
+
+
+def _websocket_user_id(websocket: WebSocket, token: Optional[str]) -> Optional[int]:
+    # Browsers can't set headers on a WebSocket handshake, so the token may come as ?token=
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        return None
+    db = SessionLocal()
+    try:
+        user = get_current_user_from_token(token, db)
+        return user.id if user else None
+    finally:
+        db.close()
+
+
+@router.websocket("/generation-jobs/{job_id}/ws")
+async def watch_generation_job(websocket: WebSocket, job_id: int, token: Optional[str] = Query(None)):
+    """
+    Push a generation job's state (as JSON, same shape as the polling
+    endpoint) every time it changes stage, then close once it has finished.
+    """
+    user_id = await asyncio.to_thread(_websocket_user_id, websocket, token)
+    if user_id is None:
+        await websocket.close(code=1008, reason="Invalid authentication credentials")
+        return
+
+    await websocket.accept()
+    with generation_queue.watch(job_id) as changed:
+        # Only here to notice the client going away; clients don't send anything
+        receiver = asyncio.create_task(websocket.receive())
+        try:
+            last = None
+            while True:
+                changed.clear()
+                payload = await asyncio.to_thread(_load_job_payload, job_id, user_id)
+                if payload is None:
+                    await websocket.close(code=1008, reason="Generation job not found")
+                    return
+                if payload != last:
+                    await websocket.send_text(orjson.dumps(payload).decode())
+                    last = payload
+                if payload["status"] in TERMINAL_STATUSES:
+                    await websocket.close()
+                    return
+
+                waiter = asyncio.create_task(changed.wait())
+                done, _ = await asyncio.wait({waiter, receiver}, timeout=JOB_POLL_INTERVAL_SECONDS,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if receiver in done:
+                    # Disconnected (or sent something, which we don't expect)
+                    return
+        finally:
+            receiver.cancel()
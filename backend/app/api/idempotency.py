@@ -0,0 +1,40 @@
+# backend/app/api/idempotency.py
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User
+from ..api.users import get_current_user
+from ..services.idempotency import IdempotencyClaim, IdempotencyError, idempotency_store, request_fingerprint
+
+
+async def idempotency_claim(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Dependency for endpoints that honour the Idempotency-Key header.
+    Yields None without the header; otherwise a claim that either replays
+    a stored response or must be completed before the endpoint commits.
+    """
+    if idempotency_key is None:
+        yield None
+        return
+
+    fingerprint = request_fingerprint(request.method, request.url.path, await request.body())
+    try:
+        claim = await idempotency_store.claim(db, current_user.id, idempotency_key, fingerprint)
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    try:
+        yield claim
+    finally:
+        claim.finish()
+
+
+def replay_response(claim: IdempotencyClaim) -> ORJSONResponse:
+    status_code, body = claim.replay
+    return ORJSONResponse(body, status_code=status_code, headers={"Idempotent-Replayed": "true"})
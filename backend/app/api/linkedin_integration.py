@@ -1,21 +1,23 @@
 # backend/app/api/linkedin_integration.py
-from app.models.analytics import PostAnalytics
 from ..models.post import Post
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User
 from ..api.users import get_current_user
+from ..auth.user_cache import invalidate_user
 from ..services.linkedin_oauth_service import LinkedInOAuthService
-from ..services.linkedin_publisher import LinkedInPublisher
-from pydantic import BaseModel
+from ..services.linkedin_tokens import apply_token_response, token_usable
+from ..services.publish_queue import PostNotPublishable, publish_queue, job_payload
+from ..services.bulk_publish import MAX_BULK_PUBLISH, bulk_publish
+from ..models.publish_job import PublishJob
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 import os
 
 router = APIRouter(prefix="/api/linkedin", tags=["linkedin"])
-oauth_service = LinkedInOAuthService()
-publisher = LinkedInPublisher()
 
 class PublishRequest(BaseModel):
     content: str
@@ -23,8 +25,65 @@ class PublishRequest(BaseModel):
 class ExchangeTokenRequest(BaseModel):
     code: str
 
+class ConnectResponse(BaseModel):
+    authorization_url: str
+    message: str
+
+class PublishJobResponse(BaseModel):
+    job_id: int
+    post_id: int
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    linkedin_post_id: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    status_url: str
+
+class PublishQueuedResponse(PublishJobResponse):
+    success: bool
+    message: str
+
+class BulkPublishResult(BaseModel):
+    post_id: int
+    status: str
+    job_id: Optional[int] = None
+    linkedin_post_id: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkPublishResponse(BaseModel):
+    success: bool
+    published: int
+    total: int
+    results: List[BulkPublishResult]
+
+class ConnectionStatusResponse(BaseModel):
+    connected: bool
+    linkedin_id: Optional[str] = None
+    message: str
+
+class ConfigDebugResponse(BaseModel):
+    client_id_loaded: bool
+    client_secret_loaded: bool
+    redirect_uri: Optional[str] = None
+
+class LinkedInProfile(BaseModel):
+    name: Optional[str] = None
+    headline: Optional[str] = None
+    industry: Optional[str] = None
+
+class ExchangeTokenResponse(BaseModel):
+    success: bool
+    message: str
+    profile: LinkedInProfile
+
+class DisconnectResponse(BaseModel):
+    success: bool
+    message: str
+
 # In backend/app/api/linkedin_integration.py
-@router.get("/connect")
+@router.get("/connect", response_model=ConnectResponse)
 async def connect_linkedin(current_user: User = Depends(get_current_user)):
     """Start LinkedIn OAuth flow"""
     
@@ -72,69 +131,86 @@ class PublishRequest(BaseModel):
     post_id: int
     content: str
 
+class BulkPublishRequest(BaseModel):
+    post_ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_PUBLISH)
+
 
-@router.post("/publish")
+@router.post("/publish", status_code=202, response_model=PublishQueuedResponse)
 async def publish_to_linkedin(
     request: PublishRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Publish content to LinkedIn"""
+    """Queue content for publishing to LinkedIn; poll the returned job for the result"""
     
     # 1. Check LinkedIn connection
-    if not current_user.access_token:
+    if not token_usable(current_user):
+        raise HTTPException(
+            status_code=400,
+            detail="LinkedIn not connected or token expired. Please connect your LinkedIn account."
+        )
+
+    post = db.query(Post).filter_by(id=request.post_id, user_id=current_user.id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    # 2. Create or reuse the post's publish job (idempotent per post)
+    try:
+        job = publish_queue.submit(db, current_user.id, post.id, request.content)
+    except PostNotPublishable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {
+        "success": True,
+        "message": "Post queued for publishing",
+        **job_payload(job)
+    }
+
+
+# Results only carry the keys that apply to their outcome
+@router.post("/publish/bulk", response_model=BulkPublishResponse, response_model_exclude_unset=True)
+async def bulk_publish_to_linkedin(
+    request: BulkPublishRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Publish several approved posts at once, with a result per post"""
+    
+    if not token_usable(current_user):
         raise HTTPException(
             status_code=400,
-            detail="LinkedIn not connected. Please connect your LinkedIn account first."
+            detail="LinkedIn not connected or token expired. Please connect your LinkedIn account."
         )
+    
+    results = await bulk_publish(db, current_user, request.post_ids)
+    
+    return {
+        "success": True,
+        "published": sum(1 for r in results if r["status"] == "published"),
+        "total": len(results),
+        "results": results
+    }
 
-    person_urn = f"urn:li:person:{current_user.linkedin_id}"
-
-    # 2. Publish to LinkedIn (AI/LinkedIn logic)
-    result = await publisher.publish_post(
-        access_token=current_user.access_token,
-        person_urn=person_urn,
-        content=request.content
-    )
-
-    # 3. If LinkedIn publish succeeded, update local post and create analytics
-    if result.get("success"):
-        post = db.query(Post).filter_by(id=request.post_id, user_id=current_user.id).first()
-        if post:
-            post.status = "published"
-            post.published_time = datetime.utcnow()
-            # Optionally, save LinkedIn URL/ID if result contains it
-            post.linkedin_url = result.get("post_url")
-            db.commit()
-            db.refresh(post)
-
-            # Create initial analytics record if not present
-            if not post.analytics:
-                analytics = PostAnalytics(
-                    user_id=current_user.id,
-                    post_id=post.id,
-                    likes_count=0,
-                    comments_count=0,
-                    shares_count=0,
-                    views_count=0,
-                    clicks_count=0,
-                    engagement_rate="0%",
-                    reach=0,
-                    impressions=0,
-                )
-                db.add(analytics)
-                db.commit()
-
-    return result
-
-
-
-@router.get("/status")
+
+@router.get("/publish-jobs/{job_id}", response_model=PublishJobResponse)
+async def get_publish_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the status of a publish job"""
+    job = db.query(PublishJob).filter_by(id=job_id, user_id=current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Publish job not found")
+    return job_payload(job)
+
+
+
+@router.get("/status", response_model=ConnectionStatusResponse)
 async def linkedin_connection_status(current_user: User = Depends(get_current_user)):
     """Check LinkedIn connection status"""
     
-    # Use the linkedin_connected boolean field
-    is_connected = current_user.linkedin_connected and bool(current_user.access_token)
+    is_connected = token_usable(current_user)
     
     return {
         "connected": is_connected,
@@ -144,7 +220,7 @@ async def linkedin_connection_status(current_user: User = Depends(get_current_us
 
 
 
-@router.get("/debug")
+@router.get("/debug", response_model=ConfigDebugResponse)
 async def debug_linkedin_config():
     """Debug endpoint to check LinkedIn configuration"""
     return {
@@ -157,7 +233,7 @@ async def debug_linkedin_config():
 
 
 
-@router.post("/exchange-token")
+@router.post("/exchange-token", response_model=ExchangeTokenResponse)
 async def exchange_linkedin_token(
     request: ExchangeTokenRequest,
     current_user: User = Depends(get_current_user),
@@ -169,14 +245,14 @@ async def exchange_linkedin_token(
         oauth_service = LinkedInOAuthService()
         
         # Get access token
-        token_result = oauth_service.exchange_code_for_token(request.code)
+        token_result = await oauth_service.exchange_code_for_token(request.code)
         if "error" in token_result:
             raise HTTPException(status_code=400, detail=token_result["error"])
         
         access_token = token_result.get("access_token")
         
         # Fetch LinkedIn profile
-        profile_data = oauth_service.get_linkedin_profile(access_token)
+        profile_data = await oauth_service.get_linkedin_profile(access_token)
         if "error" in profile_data:
             raise HTTPException(status_code=400, detail=profile_data["error"])
         
@@ -196,14 +272,11 @@ async def exchange_linkedin_token(
         
         current_user.location = profile_data.get("location", current_user.location)
         
-        # OAuth fields
-        current_user.access_token = access_token
-        current_user.linkedin_connected = True
-        
-        from datetime import datetime, timedelta
-        current_user.token_expiry = datetime.utcnow() + timedelta(days=60)
+        # OAuth fields (expiry from expires_in; refresh token when the app is allowed one)
+        apply_token_response(current_user, token_result)
         
         db.commit()
+        invalidate_user(current_user.id)
         db.refresh(current_user)
         
         return {
@@ -224,7 +297,7 @@ async def exchange_linkedin_token(
 
 
 
-@router.post("/disconnect")
+@router.post("/disconnect", response_model=DisconnectResponse)
 async def disconnect_linkedin(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -233,10 +306,13 @@ async def disconnect_linkedin(
     current_user.linkedin_connected = False
     current_user.access_token = None
     current_user.token_expiry = None
+    current_user.refresh_token = None
+    current_user.refresh_token_expiry = None
     current_user.linkedin_id = None
     # Optionally clear other LinkedIn-specific profile fields if you want strict privacy
 
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
 
     return {
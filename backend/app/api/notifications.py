@@ -0,0 +1,70 @@
+# backend/app/api/notifications.py
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from ..database import get_db, get_read_db
+from ..models.user import User
+from ..models.notification import Notification
+from ..api.users import get_current_user
+
+router = APIRouter(prefix="/api/notifications", tags=["notifications"])
+
+
+class NotificationResponse(BaseModel):
+    id: int
+    kind: str
+    message: str
+    read: bool
+    created_at: datetime
+
+
+class NotificationList(BaseModel):
+    notifications: List[NotificationResponse]
+
+
+def _notification_payload(notification) -> dict:
+    """Works for Notification objects and (id, kind, message, read_at, created_at) rows"""
+    return {
+        "id": notification.id,
+        "kind": notification.kind,
+        "message": notification.message,
+        "read": notification.read_at is not None,
+        "created_at": notification.created_at,
+    }
+
+
+@router.get("", response_model=NotificationList)
+async def list_notifications(
+    unread_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Most recent notifications for the current user"""
+    query = db.query(
+        Notification.id, Notification.kind, Notification.message, Notification.read_at, Notification.created_at
+    ).filter(Notification.user_id == current_user.id)
+    if unread_only:
+        query = query.filter(Notification.read_at.is_(None))
+    rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit).all()
+    # Serialized straight from the row tuples
+    return ORJSONResponse({"notifications": [_notification_payload(row) for row in rows]})
+
+
+@router.post("/{notification_id}/read", response_model=NotificationResponse)
+async def mark_notification_read(
+    notification_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark one notification as read"""
+    notification = db.query(Notification).filter_by(id=notification_id, user_id=current_user.id).first()
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    if notification.read_at is None:
+        notification.read_at = datetime.utcnow()
+        db.commit()
+    return _notification_payload(notification)
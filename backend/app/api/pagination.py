@@ -0,0 +1,136 @@
+# backend/app/api/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import func, tuple_
+from ..models.post import Post
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+PREVIEW_LENGTH = 200
+
+# Columns a client may ask for through ?fields=...
+POST_FIELDS = {
+    "id": Post.id,
+    "content": Post.content,
+    "post_type": Post.post_type,
+    "hashtags": Post.hashtags,
+    "mentions": Post.mentions,
+    "media_urls": Post.media_urls,
+    "carousel_data": Post.carousel_data,
+    "scheduled_time": Post.scheduled_time,
+    "published_time": Post.published_time,
+    "status": Post.status,
+    "linkedin_post_id": Post.linkedin_post_id,
+    "linkedin_url": Post.linkedin_url,
+    "ai_prompt_used": Post.ai_prompt_used,
+    "generation_model": Post.generation_model,
+    "topics_used": Post.topics_used,
+    "predicted_engagement": Post.predicted_engagement,
+    "created_at": Post.created_at,
+    "updated_at": Post.updated_at,
+    "preview": func.substr(Post.content, 1, PREVIEW_LENGTH),
+}
+
+# Lightweight default projection: no full content, prompt or JSON blobs
+POST_SUMMARY_FIELDS = [
+    "id", "status", "post_type", "preview", "hashtags",
+    "scheduled_time", "published_time", "created_at", "updated_at",
+]
+
+
+class PostFields(BaseModel):
+    """A post row as listed; only the columns picked with ?fields= are present"""
+    id: int
+    content: Optional[str] = None
+    post_type: Optional[str] = None
+    hashtags: Optional[List[str]] = None
+    mentions: Optional[List[str]] = None
+    media_urls: Optional[List[str]] = None
+    carousel_data: Optional[Dict[str, Any]] = None
+    scheduled_time: Optional[datetime] = None
+    published_time: Optional[datetime] = None
+    status: Optional[str] = None
+    linkedin_post_id: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    ai_prompt_used: Optional[str] = None
+    generation_model: Optional[str] = None
+    topics_used: Optional[List[str]] = None
+    predicted_engagement: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    preview: Optional[str] = None
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """Encode the (created_at, id) keyset position of the last row on a page"""
+    raw = json.dumps([created_at.isoformat(), post_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Resolve the ?fields= parameter into a validated list of column names"""
+    if not fields:
+        return list(POST_SUMMARY_FIELDS)
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in POST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    # id is always returned so clients can act on the rows
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
+def paginate_posts(db, filters: list, fields: List[str], cursor: Optional[str] = None,
+                   limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Keyset-paginate posts newest first on (created_at, id).
+    Only the requested columns are selected, so large columns are never loaded.
+
+    Returns:
+        (items, next_cursor)
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    # created_at is needed to build the next cursor even if not requested
+    columns = [POST_FIELDS[f].label(f) for f in fields]
+    columns.append(Post.created_at.label("cursor_created_at"))
+
+    query = db.query(*columns).filter(*filters)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Post.created_at, Post.id) < tuple_(cursor_created_at, cursor_id)
+        )
+
+    rows = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.cursor_created_at, last.id)
+
+    # Rows are plain tuples in select order; the trailing cursor column is dropped by zip
+    items = [dict(zip(fields, row)) for row in rows]
+    return items, next_cursor
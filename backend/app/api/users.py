@@ -1,5 +1,5 @@
 # backend/app/api/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
@@ -7,11 +7,12 @@ from typing import Optional
 from ..database import get_db
 from ..models.user import User
 from ..auth.auth_utils import (
-    get_password_hash, 
-    create_access_token, 
+    create_user_access_token, 
     authenticate_user,
     get_current_user_from_token
 )
+from ..auth.password_hashing import password_hasher
+from ..auth.user_cache import invalidate_user
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 security = HTTPBearer()
@@ -50,7 +51,8 @@ class Token(BaseModel):
     user: UserResponse
 
 # Get current user dependency
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), 
+def get_current_user(request: Request,
+                    credentials: HTTPAuthorizationCredentials = Depends(security), 
                     db: Session = Depends(get_db)):
     token = credentials.credentials
     user = get_current_user_from_token(token, db)
@@ -60,6 +62,8 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Lets read sessions route this user's reads and tracks their writes
+    request.state.user_id = user.id
     return user
 
 @router.post("/register", response_model=Token)
@@ -73,8 +77,9 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Create new user (the connection goes back to the pool while bcrypt runs)
+    db.rollback()
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
@@ -90,7 +95,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     db.refresh(db_user)
     
     # Create access token
-    access_token = create_access_token(data={"sub": db_user.email})
+    access_token = create_user_access_token(db_user)
     
     return {
         "access_token": access_token,
@@ -101,7 +106,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Login user and return access token"""
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -109,7 +114,7 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_user_access_token(user)
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -136,5 +141,6 @@ async def update_current_user_profile(
             setattr(current_user, field, value)
     
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
     return current_user
@@ -2,17 +2,19 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from ..models.user import User
+from .password_hashing import password_context, password_hasher
+from .user_cache import invalidate_user, user_cache
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = password_context()
 
+# Blocking versions, for scripts; request handlers use password_hasher
 def verify_password(plain_password, hashed_password):
     """Verify a plain password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -32,24 +34,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Session, email: str, password: str):
-    """Authenticate user by email and password"""
+def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None):
+    """Create a JWT carrying the user id and auth version, so lookups can go straight to the user cache"""
+    return create_access_token(
+        data={"sub": user.email, "uid": user.id, "ver": user.auth_version},
+        expires_delta=expires_delta
+    )
+
+async def authenticate_user(db: Session, email: str, password: str):
+    """Authenticate user by email and password (bcrypt runs on the hashing pool)"""
     user = db.query(User).filter(User.email == email).first()
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    # Detach the loaded user and give the connection back to the pool while
+    # bcrypt runs; otherwise a burst of logins holds every pooled connection
+    db.expunge(user)
+    db.rollback()
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        # Stored with an old cost factor: upgrade it while we have the plain password
+        db.query(User).filter(User.id == user.id).update(
+            {User.hashed_password: new_hash}, synchronize_session=False
+        )
+        db.commit()
+        user.hashed_password = new_hash
+        invalidate_user(user.id)
     return user
 
+def revoke_user_tokens(db: Session, user_id: int):
+    """
+    Revoke every access token issued to the user so far. Call it on a
+    password change or deactivation, not on LinkedIn token updates.
+    Does not commit.
+    """
+    db.query(User).filter(User.id == user_id).update(
+        {User.auth_version: User.auth_version + 1}, synchronize_session=False
+    )
+    invalidate_user(user_id)
+
 def get_current_user_from_token(token: str, db: Session):
-    """Get current user from JWT token"""
+    """
+    Get current user from JWT token, served from the user cache when possible.
+    The token's auth version must match the user's (see revoke_user_tokens).
+    A token newer than the cached row reloads it; other processes also pick
+    up a revocation when their cache entry expires (USER_CACHE_TTL_SECONDS).
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        user_id = payload.get("uid")
+        # Tokens issued before the claim existed count as the first version
+        version = payload.get("ver", 1)
+        if email is None and user_id is None:
             return None
     except JWTError:
         return None
     
-    user = db.query(User).filter(User.email == email).first()
-    return user
+    # Tokens issued before uid was added fall back to the email lookup
+    if user_id is None:
+        return db.query(User).filter(User.email == email).first()
+    
+    cached = user_cache.get(user_id)
+    if cached is None or cached.auth_version != version:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None or user.auth_version != version or user.is_active is False:
+            return None
+        # Keep a detached, clean copy and hand out a session-bound one
+        db.expunge(user)
+        user_cache.put(user)
+        cached = user
+    
+    return db.merge(cached, load=False)
@@ -0,0 +1,103 @@
+# backend/app/auth/password_hashing.py
+"""
+bcrypt off the event loop.
+
+Hashing and verification run on a small process pool, so a burst of
+logins costs CPU on other cores instead of freezing every other request.
+The cost factor comes from BCRYPT_ROUNDS. Hashes made with a different
+cost are flagged on verify, and login rewrites them transparently.
+
+    BCRYPT_ROUNDS=12               cost factor for new hashes
+    PASSWORD_HASH_WORKERS=2        pool size (0 runs on threads instead)
+    PASSWORD_HASH_MAX_PENDING=64   calls queued before callers wait
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+@lru_cache(maxsize=None)
+def password_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    # desired_rounds on both sides: any other cost (higher or lower) needs an update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_desired_rounds=rounds,
+        bcrypt__max_desired_rounds=rounds,
+    )
+
+
+# These run inside pool workers, so they take the cost explicitly instead
+# of trusting the worker's environment
+
+def _hash(password: str, rounds: int) -> str:
+    return password_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    try:
+        return password_context(rounds).verify_and_update(password, hashed)
+    except ValueError:
+        # Malformed or unknown hash format
+        return False, None
+
+
+def _warm(rounds: int):
+    password_context(rounds)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, rounds: int = BCRYPT_ROUNDS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # bcrypt releases the GIL, so threads still keep the loop free
+                self._executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                    thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when the stored hash used a different cost"""
+        return await self._run(_verify_and_update, password, hashed, self.rounds)
+
+    async def start(self):
+        """Spawn the pool workers up front so the first login doesn't pay for it"""
+        pool = self._pool()
+        if isinstance(pool, ProcessPoolExecutor):
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(pool, _warm, self.rounds)
+                                   for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,69 @@
+# backend/app/auth/user_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from ..models.user import User
+
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+
+class UserCache:
+    """
+    TTL + LRU cache of detached User objects keyed by user id.
+    Cached objects are never handed out directly: callers merge them into
+    their own session, so the cached copy stays clean and shareable.
+
+    The cache is per process. invalidate_user() only drops the entry in the
+    process that calls it; other API workers (and anything changed by a
+    separate worker process, such as the token sweeper) are seen once the
+    entry's TTL runs out. Tokens carry the user's auth_version, and one whose
+    version differs from the cached row's reloads the row, so a revocation
+    (auth_utils.revoke_user_tokens) applies in a process as soon as it sees
+    a token issued after it, and within the TTL otherwise. Code that must
+    not act on stale LinkedIn credentials (the publish queue, bulk publish,
+    the scheduler) reads them from the database instead.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_MAX_SIZE, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: User):
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(user_id: int):
+    """Drop a user from this process's cache after any change to their row"""
+    user_cache.invalidate(user_id)
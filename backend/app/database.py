@@ -1,45 +1,171 @@
 # backend/app/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import text
+from collections import OrderedDict
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+# How long a user's reads stay on the primary after they write
+REPLICA_LAG_WINDOW_SECONDS = float(os.getenv("REPLICA_LAG_WINDOW_SECONDS", "5"))
+RECENT_WRITERS_MAX = 100_000
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL not found in environment variables")
+def _engine_options(url: str) -> dict:
+    options = {
+        "pool_pre_ping": True,     # Enable connection health checks
+        "pool_recycle": 3600,      # Recycle connections every hour
+        "echo": False,             # Set to True for SQL query debugging
+    }
+    if url.startswith("sqlite"):
+        # Sessions are used from FastAPI's threadpool
+        options["connect_args"] = {"check_same_thread": False}
+    return options
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,        # Enable connection health checks
-    pool_recycle=3600,         # Recycle connections every hour
-    echo=False                 # Set to True for SQL query debugging
-)
+# SQLAlchemy engines, created on first use so importing the app needs no
+# database settings (scripts, workers and tools import it too)
+_engine = None
+_replica_engine = None
+_replica_resolved = False
+_engines_lock = threading.Lock()
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engines_lock:
+            if _engine is None:
+                database_url = os.getenv("DATABASE_URL")
+                if not database_url:
+                    raise ValueError("DATABASE_URL not found in environment variables")
+                _engine = create_engine(database_url, **_engine_options(database_url))
+    return _engine
+
+def get_replica_engine():
+    """Engine for REPLICA_DATABASE_URL, or None when there is no replica"""
+    global _replica_engine, _replica_resolved
+    if not _replica_resolved:
+        with _engines_lock:
+            if not _replica_resolved:
+                replica_url = os.getenv("REPLICA_DATABASE_URL")
+                if replica_url:
+                    _replica_engine = create_engine(replica_url, **_engine_options(replica_url))
+                _replica_resolved = True
+    return _replica_engine
+
+def __getattr__(name):
+    # `from app.database import engine` keeps working, resolved lazily
+    if name == "engine":
+        return get_engine()
+    if name == "replica_engine":
+        return get_replica_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def warm_pool(connections: int) -> int:
+    """Open (and return to the pool) up to `connections` connections ahead of traffic"""
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+# Users who committed recently, so their reads skip a possibly lagging replica
+_recent_writers: "OrderedDict[int, float]" = OrderedDict()
+_recent_writers_lock = threading.Lock()
+
+def record_write(user_id: int):
+    with _recent_writers_lock:
+        _recent_writers[user_id] = time.monotonic()
+        _recent_writers.move_to_end(user_id)
+        while len(_recent_writers) > RECENT_WRITERS_MAX:
+            _recent_writers.popitem(last=False)
+
+def wrote_recently(user_id: int) -> bool:
+    with _recent_writers_lock:
+        written_at = _recent_writers.get(user_id)
+    return written_at is not None and time.monotonic() - written_at < REPLICA_LAG_WINDOW_SECONDS
+
+
+class PrimarySession(Session):
+    """Session on the primary, bound when it first needs a connection"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        return get_engine()
+
+
+class ReadSession(Session):
+    """Read-only session routed to the replica unless the user just wrote"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica_engine = get_replica_engine()
+        if replica_engine is None:
+            return get_engine()
+        if "bind" not in self.info:
+            # Resolved at first query, after get_current_user has run
+            user_id = getattr(self.info.get("request_state"), "user_id", None)
+            if user_id is not None and wrote_recently(user_id):
+                self.info["bind"] = get_engine()
+            else:
+                self.info["bind"] = replica_engine
+        return self.info["bind"]
+
+
+# Create session classes
+SessionLocal = sessionmaker(class_=PrimarySession, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(class_=ReadSession, autocommit=False, autoflush=False)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _track_user_write(session):
+    user_id = getattr(session.info.get("request_state"), "user_id", None)
+    if user_id is not None:
+        record_write(user_id)
+
+@event.listens_for(ReadSession, "before_flush")
+def _reject_writes(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-only session")
 
 # Create Base class
 Base = declarative_base()
 
 # Dependency for FastAPI
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    db = SessionLocal(info={"request_state": request.state})
     try:
         yield db
     finally:
         db.close()
 
+# Read-only dependency for endpoints that never write
+def get_read_db(request: Request):
+    db = ReadSessionLocal(info={"request_state": request.state})
+    try:
+        yield db
+    finally:
+        db.close()
+
+# INSERT ... ON CONFLICT construct for whichever backend the session is bound to
+def dialect_insert(db, table):
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
 # Test database connection function
 def test_connection():
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             result = conn.execute(text("SELECT version();"))
             version = result.fetchone()[0]
             print(f"✅ Connected to: {version}")
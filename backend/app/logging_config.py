@@ -0,0 +1,226 @@
+# backend/app/logging_config.py
+"""
+Structured, non-blocking logging.
+
+setup_logging() routes every record through a QueueHandler: the calling
+thread (usually the event loop) only samples DEBUG records, stamps the
+request id and enqueues the record. A QueueListener thread does the
+redaction, JSON formatting and the actual write to stderr.
+
+    LOG_LEVEL=INFO               root level
+    LOG_FORMAT=json              or "text" for local development
+    LOG_DEBUG_SAMPLE_RATE=0.01   share of requests whose DEBUG records are kept
+
+Sampling is decided per request id, so a sampled request keeps its whole
+DEBUG trace. INFO and above are never sampled. It runs before the record
+is enqueued, so a burst of unsampled DEBUG records never takes queue slots
+(a full queue drops records, INFO and ERROR included).
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Requests slower than this are logged at INFO; the rest at DEBUG (sampled)
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+REDACTED = "[REDACTED]"
+SECRET_KEYS = re.compile(r"secret|token|password|authorization|api[_-]?key|^code$", re.IGNORECASE)
+SECRET_PATTERNS = [
+    # key=value and "key": "value" pairs, e.g. form bodies and JSON response text
+    re.compile(
+        r"""(?P<key>["']?\b(?:client_secret|access_token|refresh_token|id_token|password|code)["']?\s*[:=]\s*["']?)"""
+        r"""(?P<value>[^"'&,\s}]+)""",
+        re.IGNORECASE,
+    ),
+    re.compile(r"(?P<key>Bearer\s+)(?P<value>[A-Za-z0-9._~+/=-]+)", re.IGNORECASE),
+]
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact(value):
+    """Mask secrets in strings, dicts and lists (by key name and by pattern)"""
+    if isinstance(value, str):
+        for pattern in SECRET_PATTERNS:
+            value = pattern.sub(lambda m: m.group("key") + REDACTED, value)
+        return value
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if isinstance(k, str) and SECRET_KEYS.search(k) else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+class RequestContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records as they are. The stock prepare() formats the message in
+    the calling thread; here formatting is left to the listener thread and
+    only the request id (a context variable) is captured up front.
+    """
+
+    def prepare(self, record):
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block the event loop on logging; drop instead
+            pass
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep DEBUG records for a sample of requests; everything at INFO and above passes.
+    Installed on the queue handler, where it runs in the thread that logs,
+    before prepare(), so the request id is read from the context variable.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(rate * 10_000)
+
+    def filter(self, record):
+        if record.levelno >= logging.INFO:
+            return True
+        request_id = getattr(record, "request_id", None) or request_id_var.get()
+        if request_id:
+            return zlib.crc32(request_id.encode()) % 10_000 < self.threshold
+        return random.random() * 10_000 < self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key != "request_id":
+                entry[key] = REDACTED if SECRET_KEYS.search(key) else redact(value)
+        if record.exc_info:
+            entry["exc"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class RedactingTextFormatter(logging.Formatter):
+    def format(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = None
+        return redact(super().format(record))
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT,
+                  debug_sample_rate: float = LOG_DEBUG_SAMPLE_RATE) -> logging.handlers.QueueListener:
+    """Install the queue handler on the root logger and start the writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream = logging.StreamHandler()
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(RedactingTextFormatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = RequestContextQueueHandler(log_queue)
+    # Sample before enqueueing, so dropped DEBUG records cost no queue slot
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    # Route uvicorn's loggers through the same queue
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # httpx logs every request at INFO; that's per-call noise, not an event
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware: takes X-Request-ID from the client (if sane) or
+    makes one, exposes it to logging through a context variable and echoes
+    it on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger("app.requests")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            level = logging.INFO if status >= 500 or elapsed_ms >= LOG_SLOW_REQUEST_MS else logging.DEBUG
+            if self.logger.isEnabledFor(level):
+                self.logger.log(level, "request completed", extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(elapsed_ms, 1),
+                })
+            request_id_var.reset(token)
@@ -1,7 +1,11 @@
 # backend/app/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
+from pydantic import BaseModel
+from typing import Optional
 import os
 from .database import get_db
 from .api import users  # Import user routes
@@ -10,33 +14,100 @@ from sqlalchemy import text
 from .api import content
 from .api import linkedin_integration
 from .api.analytics import router as analytics_router
+from .api.notifications import router as notifications_router
+from .logging_config import RequestIdMiddleware, setup_logging
+from .rate_limiting import RATE_LIMIT_ENABLED, RateLimitMiddleware
+from .profiling import PROFILING_ENABLED, ProfilingMiddleware
+from .auth.password_hashing import password_hasher
+from .services.analytics_buffer import ANALYTICS_WRITE_BEHIND, analytics_buffer
+from .services.http_client import open_http_client, close_http_client
+from .services.publish_queue import publish_queue
+from .services.generation_jobs import generation_queue
+from .warmup import WARM_UP_ON_STARTUP, warm_up
 import uvicorn
 
 # Load environment variables
 load_dotenv()
+setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARM_UP_ON_STARTUP:
+        await warm_up()
+    await open_http_client()
+    await password_hasher.start()
+    await publish_queue.start()
+    await generation_queue.start()
+    if ANALYTICS_WRITE_BEHIND:
+        await analytics_buffer.start()
+    yield
+    await generation_queue.stop()
+    await publish_queue.stop()
+    if ANALYTICS_WRITE_BEHIND:
+        # Flush whatever is still buffered before the process exits
+        await analytics_buffer.stop()
+    await close_http_client()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="LinkedIn AI Agent API",
     description="AI-powered LinkedIn content generation and automation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson encodes datetimes and nested dicts natively, far faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
+if PROFILING_ENABLED:
+    # Innermost, so a profile covers the request's own work, not the middlewares
+    app.add_middleware(ProfilingMiddleware)
+
+if RATE_LIMIT_ENABLED:
+    # Innermost of the three, so 429s still get CORS headers and a request id
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:8080"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Request-ID", "ETag", "Last-Modified", "Location", "Retry-After",
+        "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy",
+        "X-Profile-Id",
+    ],
 )
+# Outermost, so the request id covers everything below (including CORS)
+app.add_middleware(RequestIdMiddleware)
 
 # Include routers
 app.include_router(users.router)
 app.include_router(content.router)
 app.include_router(linkedin_integration.router)
 app.include_router(analytics_router)
+app.include_router(notifications_router)
+if PROFILING_ENABLED:
+    from .api.admin import router as admin_router
+    app.include_router(admin_router)
+
+
+class RootResponse(BaseModel):
+    message: str
+    environment: str
+    status: str
+
+class HealthResponse(BaseModel):
+    status: str
+    service: str
+
+class DatabaseTestResponse(BaseModel):
+    status: str
+    postgres_version: Optional[str] = None
+    error: Optional[str] = None
 
 
-@app.get("/")
+@app.get("/", response_model=RootResponse)
 async def root():
     env = os.getenv("ENVIRONMENT", "unknown")
     return {
@@ -45,11 +116,11 @@ async def root():
         "status": "running"
     }
 
-@app.get("/health")
+@app.get("/health", response_model=HealthResponse)
 async def health_check():
     return {"status": "healthy", "service": "linkedin-ai-agent"}
 
-@app.get("/db-test")
+@app.get("/db-test", response_model=DatabaseTestResponse, response_model_exclude_none=True)
 async def test_database_connection(db: Session = Depends(get_db)):
     """Test database connection and show PostgreSQL version"""
     try:
@@ -6,6 +6,12 @@ from .calendar import ContentCalendar
 from .trends import IndustryTrends
 from .versions import PostVersion
 from .settings import UserSettings
+from .publish_job import PublishJob
+from .post_terms import PostTopic, PostHashtag, UserTopicStats, UserHashtagStats
+from .hashtag_graph import IndustryHashtagStats, HashtagCooccurrence
+from .notification import Notification
+from .idempotency import IdempotencyRecord
+from .generation_job import GenerationJob
 
 __all__ = [
     "User",
@@ -14,5 +20,15 @@ __all__ = [
     "ContentCalendar",
     "IndustryTrends",
     "PostVersion",
-    "UserSettings"
+    "UserSettings",
+    "PublishJob",
+    "PostTopic",
+    "PostHashtag",
+    "UserTopicStats",
+    "UserHashtagStats",
+    "IndustryHashtagStats",
+    "HashtagCooccurrence",
+    "Notification",
+    "IdempotencyRecord",
+    "GenerationJob"
 ]
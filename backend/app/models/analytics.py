@@ -1,11 +1,17 @@
 # backend/app/models/analytics.py
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
 class PostAnalytics(Base):
     __tablename__ = "post_analytics"
+    __table_args__ = (
+        # Sync worker picks rows whose next_sync_at has passed
+        Index("ix_post_analytics_next_sync_at", "next_sync_at"),
+        # Posting-time job finds users with analytics newer than their last run
+        Index("ix_post_analytics_user_updated", "user_id", "last_updated"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -35,6 +41,10 @@ class PostAnalytics(Base):
     first_tracked = Column(DateTime(timezone=True), server_default=func.now())
     last_updated = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # LinkedIn sync schedule (backs off as the post ages)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    next_sync_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Relationships
     user = relationship("User")
     post = relationship("Post")
@@ -0,0 +1,31 @@
+# backend/app/models/generation_job.py
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy.sql import func
+from ..database import Base
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # generate, improve
+    kind = Column(String(20), nullable=False)
+    # The validated request body, replayed by whichever worker runs the job
+    request = Column(JSON, nullable=False)
+    
+    # queued, running, succeeded, failed
+    status = Column(String(20), default="queued", index=True)
+    # Progress within a running job: generating, rewriting, hashtags, saving
+    stage = Column(String(20), nullable=True)
+    
+    # Same body the synchronous endpoint returns
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,34 @@
+# backend/app/models/hashtag_graph.py
+from sqlalchemy import Column, Integer, String, BigInteger, UniqueConstraint
+from ..database import Base
+
+# Per-industry hashtag usage and co-occurrence over published posts, stored
+# sparsely: only hashtags and pairs that have actually appeared get a row.
+# Industry is "" for users without one, so the unique constraints hold.
+
+class IndustryHashtagStats(Base):
+    __tablename__ = "industry_hashtag_stats"
+    __table_args__ = (
+        UniqueConstraint("industry", "hashtag", name="uq_industry_hashtag_stats_industry_hashtag"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    industry = Column(String(100), nullable=False, default="")
+    hashtag = Column(String(100), nullable=False)
+    post_count = Column(Integer, nullable=False, default=0)
+    total_engagement = Column(BigInteger, nullable=False, default=0)
+
+
+class HashtagCooccurrence(Base):
+    __tablename__ = "hashtag_cooccurrence"
+    __table_args__ = (
+        # Both (a, b) and (b, a) are stored, so neighbours of a tag are one index range
+        UniqueConstraint("industry", "hashtag", "related_hashtag", name="uq_hashtag_cooccurrence_pair"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    industry = Column(String(100), nullable=False, default="")
+    hashtag = Column(String(100), nullable=False)
+    related_hashtag = Column(String(100), nullable=False)
+    post_count = Column(Integer, nullable=False, default=0)
+    total_engagement = Column(BigInteger, nullable=False, default=0)
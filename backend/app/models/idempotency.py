@@ -0,0 +1,30 @@
+# backend/app/models/idempotency.py
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_records"
+    __table_args__ = (
+        # Keys are scoped per user, so one user can never replay another's response
+        UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Client-supplied Idempotency-Key header
+    key = Column(String(255), nullable=False)
+    # Hash of method, path and body; reusing a key for another request is an error
+    fingerprint = Column(String(64), nullable=False)
+
+    # in_progress, completed
+    status = Column(String(20), nullable=False, default="in_progress")
+    # The request that owns an in_progress record holds it until then
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Purged after this; bounds the table to roughly a day of write traffic
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
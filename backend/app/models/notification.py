@@ -0,0 +1,22 @@
+# backend/app/models/notification.py
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+class Notification(Base):
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # e.g. linkedin_token_expiring, linkedin_disconnected
+    kind = Column(String(50), nullable=False)
+    message = Column(Text, nullable=False)
+    # Same key is only ever stored once, so background jobs can notify idempotently
+    dedupe_key = Column(String(200), nullable=True, unique=True)
+    
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,11 +1,18 @@
 # backend/app/models/post.py
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination for per-user listings, optionally filtered by status
+        Index("ix_posts_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("ix_posts_user_created", "user_id", "created_at", "id"),
+        # Scheduler claims due posts in scheduled_time order
+        Index("ix_posts_status_scheduled_time", "status", "scheduled_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -25,6 +32,11 @@ class Post(Base):
     published_time = Column(DateTime(timezone=True), nullable=True)
     status = Column(String(20), default="draft")
     
+    # Scheduler lease: a worker owns the post until publish_lease_until
+    publish_lease_until = Column(DateTime(timezone=True), nullable=True)
+    publish_worker_id = Column(String(100), nullable=True)
+    publish_attempts = Column(Integer, default=0)
+    
     # LinkedIn integration
     linkedin_post_id = Column(String(100), nullable=True, unique=True)
     linkedin_url = Column(String(500), nullable=True)
@@ -0,0 +1,61 @@
+# backend/app/models/post_terms.py
+from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, Index, UniqueConstraint
+from ..database import Base
+
+# Normalized copies of Post.topics_used / Post.hashtags, so "which topics
+# perform best" is an indexed lookup instead of a scan over every post's JSON
+
+class PostTopic(Base):
+    __tablename__ = "post_topics"
+    __table_args__ = (
+        UniqueConstraint("post_id", "topic", name="uq_post_topics_post_topic"),
+        Index("ix_post_topics_user_topic", "user_id", "topic"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic = Column(String(100), nullable=False)
+
+
+class PostHashtag(Base):
+    __tablename__ = "post_hashtags"
+    __table_args__ = (
+        UniqueConstraint("post_id", "hashtag", name="uq_post_hashtags_post_hashtag"),
+        Index("ix_post_hashtags_user_hashtag", "user_id", "hashtag"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    hashtag = Column(String(100), nullable=False)
+
+
+# Per-user running totals, bumped when posts are created and when analytics change
+
+class UserTopicStats(Base):
+    __tablename__ = "user_topic_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "topic", name="uq_user_topic_stats_user_topic"),
+        Index("ix_user_topic_stats_user_engagement", "user_id", "total_engagement"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic = Column(String(100), nullable=False)
+    post_count = Column(Integer, nullable=False, default=0)
+    total_engagement = Column(BigInteger, nullable=False, default=0)
+
+
+class UserHashtagStats(Base):
+    __tablename__ = "user_hashtag_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "hashtag", name="uq_user_hashtag_stats_user_hashtag"),
+        Index("ix_user_hashtag_stats_user_engagement", "user_id", "total_engagement"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    hashtag = Column(String(100), nullable=False)
+    post_count = Column(Integer, nullable=False, default=0)
+    total_engagement = Column(BigInteger, nullable=False, default=0)
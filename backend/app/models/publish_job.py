@@ -0,0 +1,37 @@
+# backend/app/models/publish_job.py
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+class PublishJob(Base):
+    __tablename__ = "publish_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    
+    # Derived from post_id, so a post can only ever have one publish job
+    idempotency_key = Column(String(100), nullable=False, unique=True)
+    content = Column(Text, nullable=False)
+    
+    # queued, running, retrying, succeeded, failed, unknown (LinkedIn may have the post)
+    status = Column(String(20), default="queued", index=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    # LinkedIn result
+    linkedin_post_id = Column(String(100), nullable=True)
+    linkedin_url = Column(String(500), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set by the worker that claims it; a 'running' job older than the lease was orphaned
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    user = relationship("User")
+    post = relationship("Post")
@@ -19,6 +19,8 @@ class UserSettings(Base):
     auto_post = Column(Boolean, default=False)
     review_before_posting = Column(Boolean, default=True)
     optimal_posting_times = Column(JSON, default=list)
+    # When optimal_posting_times was last computed from analytics
+    posting_times_computed_at = Column(DateTime(timezone=True), nullable=True)
     posting_frequency = Column(String(50), default="3-times-weekly")
     
     # Content preferences
@@ -32,7 +32,13 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     linkedin_connected = Column(Boolean, default=False)
     access_token = Column(Text, nullable=True)
-    token_expiry = Column(DateTime(timezone=True), nullable=True)
+    # Indexed so the token sweeper can range-scan soon-to-expire tokens
+    token_expiry = Column(DateTime(timezone=True), nullable=True, index=True)
+    refresh_token = Column(Text, nullable=True)
+    refresh_token_expiry = Column(DateTime(timezone=True), nullable=True)
+    # Stamped into JWTs; bumped only on password change or deactivation
+    # (never on LinkedIn token updates), which revokes every token issued before
+    auth_version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,231 @@
+# backend/app/profiling.py
+"""
+On-demand per-request profiling.
+
+ProfilingMiddleware (pure ASGI) runs cProfile around a single request when
+
+    - it carries X-Profile: <expires>.<signature>, an HMAC of the expiry
+      made with PROFILING_SECRET (see profile_header()), or
+    - it carries X-Profile: 1 together with X-Admin-Token, or
+    - it is the 1 in PROFILING_SAMPLE_EVERY picked at random.
+
+Each profile is saved as a pstats file plus a small JSON summary in
+PROFILING_DIR, a ring buffer that keeps the newest PROFILING_MAX_PROFILES.
+The response carries X-Profile-Id; GET /api/admin/profiles lists the
+buffer and /api/admin/profiles/{id} returns the stats (X-Admin-Token).
+
+    PROFILING_ENABLED=false           nothing below is installed unless true
+    PROFILING_SECRET=                 key for signed X-Profile headers
+    PROFILING_ADMIN_TOKEN=            admin flag and admin endpoints; unset disables both
+    PROFILING_SAMPLE_EVERY=0          profile 1 in N requests (0: only on request)
+    PROFILING_DIR=/tmp/linkedin-profiles
+    PROFILING_MAX_PROFILES=50
+
+cProfile hooks the event loop thread, so a profile also contains whatever
+other requests ran on the loop meanwhile, and misses work handed to
+threads (asyncio.to_thread, sync endpoints). Only one request per process
+is profiled at a time; a trigger that arrives meanwhile is skipped. When
+PROFILING_ENABLED is false neither the middleware nor the admin router is
+added to the app, so the disabled cost is zero.
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from .logging_config import request_id_var
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+PROFILING_SAMPLE_EVERY = int(os.getenv("PROFILING_SAMPLE_EVERY", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "linkedin-profiles"))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+
+PROFILE_ID = re.compile(r"^[0-9]{19}-[0-9a-f]{8}$")
+
+
+def _sign(expires: int, secret: str) -> str:
+    return hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def profile_header(ttl_seconds: int = 3600, secret: str = PROFILING_SECRET) -> str:
+    """An X-Profile value valid for ttl_seconds, to hand to whoever reproduces a slow request"""
+    if not secret:
+        raise ValueError("PROFILING_SECRET is not set")
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_sign(expires, secret)}"
+
+
+def verify_profile_header(value: str, secret: str = PROFILING_SECRET) -> bool:
+    expires, _, signature = value.partition(".")
+    if not secret or not expires.isdigit() or not signature:
+        return False
+    if int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires), secret))
+
+
+def is_admin_token(value: Optional[str], admin_token: str = PROFILING_ADMIN_TOKEN) -> bool:
+    return bool(admin_token and value) and hmac.compare_digest(value.encode(), admin_token.encode())
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring buffer: <id>.prof (pstats) and <id>.json (summary).
+    Ids start with a nanosecond timestamp, so name order is age order.
+    """
+
+    def __init__(self, directory: str = PROFILING_DIR, max_profiles: int = PROFILING_MAX_PROFILES):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def new_id(self) -> str:
+        return f"{time.time_ns():019d}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, profile: cProfile.Profile, summary: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so a listing never sees half a profile
+        tmp = self._path(profile_id, "prof.tmp")
+        profile.dump_stats(tmp)
+        os.replace(tmp, self._path(profile_id, "prof"))
+        tmp = self._path(profile_id, "json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(dict(summary, id=profile_id), f)
+        os.replace(tmp, self._path(profile_id, "json"))
+        self._trim()
+
+    def _ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith(".json") and PROFILE_ID.match(name[:-5]))
+
+    def _trim(self):
+        ids = self._ids()
+        for profile_id in ids[:max(0, len(ids) - self.max_profiles)]:
+            for ext in ("json", "prof"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:
+                    pass  # another worker sharing the directory got there first
+
+    def list(self) -> List[Dict]:
+        """Summaries, newest first"""
+        summaries = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, "json")) as f:
+                    summaries.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return summaries
+
+    def stats_path(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = self._path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+
+    def stats_text(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        path = self.stats_path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware; see the module docstring for the triggers.
+    Sits innermost, so the profile covers routing, dependencies and the
+    endpoint rather than the other middlewares.
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store, sample_every: int = PROFILING_SAMPLE_EVERY,
+                 secret: str = PROFILING_SECRET, admin_token: str = PROFILING_ADMIN_TOKEN):
+        self.app = app
+        self.store = store
+        self.sample_every = sample_every
+        self.secret = secret
+        self.admin_token = admin_token
+        self._active = False
+
+    def _trigger(self, scope) -> Optional[str]:
+        flag = token = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-profile":
+                flag = value.decode("latin-1")
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        if flag:
+            if flag == "1" and is_admin_token(token, self.admin_token):
+                return "admin"
+            if verify_profile_header(flag, self.secret):
+                return "signed"
+        if self.sample_every > 0 and random.randrange(self.sample_every) == 0:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            return await self.app(scope, receive, send)
+        trigger = self._trigger(scope)
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile_id = self.store.new_id()
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        # One profiler per thread can be active; concurrent triggers are skipped above
+        self._active = True
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.disable()
+            self._active = False
+            summary = {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "trigger": trigger,
+                "request_id": request_id_var.get(),
+            }
+            try:
+                # The response has gone out; only the disk write is left
+                await asyncio.to_thread(self.store.save, profile_id, profile, summary)
+            except Exception as e:
+                logger.error(f"Could not save profile {profile_id}: {e}")
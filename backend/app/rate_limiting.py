@@ -0,0 +1,294 @@
+# backend/app/rate_limiting.py
+"""
+Per-user API rate limiting.
+
+RateLimitMiddleware (pure ASGI) gives every caller a token bucket per
+route class:
+
+    llm     model-backed endpoints (generate, improve, variations, generation jobs)
+    write   any other POST/PUT/PATCH/DELETE
+    read    GET/HEAD
+
+Callers are identified by the user id in their bearer token (verified
+once per token, then cached) or, without one, by client address
+(scope["client"]). Unauthenticated routes such as login and register are
+therefore keyed by IP: behind a load balancer or reverse proxy, run
+uvicorn with --proxy-headers and --forwarded-allow-ips set to the proxy's
+address, or every anonymous caller shares the proxy's single write bucket
+(120/min by default).
+Responses carry RateLimit-Limit / -Remaining / -Reset / -Policy headers;
+refused requests get 429 with Retry-After.
+
+    RATE_LIMIT_ENABLED=true
+    RATE_LIMIT_BACKEND=memory           or "redis" to share buckets across nodes
+    RATE_LIMIT_REDIS_URL=redis://localhost:6379/0
+    RATE_LIMIT_LLM=10/60:5              10 requests per 60s, bursts of up to 5
+    RATE_LIMIT_WRITE=120/60:30
+    RATE_LIMIT_READ=600/60:120
+
+The memory backend is a dict lookup and some arithmetic on the event loop,
+well under the 50 µs per request budget (see benchmarks/rate_limit_bench.py).
+The Redis backend adds one round trip (a Lua script, so the bucket update
+is atomic); if Redis is unreachable, requests are let through.
+"""
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+from jose import JWTError, jwt
+from .auth.auth_utils import ALGORITHM, SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+MAX_TRACKED_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_TRACKED", "100000"))
+MAX_CACHED_TOKENS = 10_000
+
+# Model-backed routes (POST); everything else is classed by method
+LLM_PATHS = {
+    "/api/content/generate",
+    "/api/content/improve",
+    "/api/content/generate-variations",
+}
+LLM_PREFIXES = ("/api/content/generation-jobs/",)
+# Liveness checks, docs and CORS preflights are never limited
+EXEMPT_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json"}
+SAFE_METHODS = {"GET", "HEAD"}
+
+
+class RateLimitPolicy(NamedTuple):
+    name: str
+    limit: int       # requests per window
+    window: float    # seconds
+    burst: int       # bucket capacity
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.window
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimitPolicy":
+        """'10/60:5' -> 10 per 60 seconds, bursts of 5 (burst defaults to the limit)"""
+        rate, _, burst = spec.partition(":")
+        limit, _, window = rate.partition("/")
+        return cls(name, int(limit), float(window or 60), int(burst or limit))
+
+
+POLICIES = {
+    "llm": RateLimitPolicy.parse("llm", os.getenv("RATE_LIMIT_LLM", "10/60:5")),
+    "write": RateLimitPolicy.parse("write", os.getenv("RATE_LIMIT_WRITE", "120/60:30")),
+    "read": RateLimitPolicy.parse("read", os.getenv("RATE_LIMIT_READ", "600/60:120")),
+}
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset: float        # seconds until the bucket is full again
+    retry_after: float  # seconds until a request would be allowed (0 when allowed)
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """llm, write or read; None for requests that are never limited"""
+    if method == "OPTIONS" or path in EXEMPT_PATHS:
+        return None
+    if method in SAFE_METHODS:
+        return "read"
+    if path in LLM_PATHS or path.startswith(LLM_PREFIXES):
+        return "llm"
+    return "write"
+
+
+class MemoryRateLimitBackend:
+    """Token buckets in a bounded LRU dict; updates never await, so they're atomic on the event loop"""
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_BUCKETS):
+        self.max_tracked = max_tracked
+        # key -> [tokens, updated_at]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        return self.hit_now(key, policy, time.monotonic())
+
+    def hit_now(self, key: str, policy: RateLimitPolicy, now: float) -> RateLimitResult:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(policy.burst), now]
+            if len(self._buckets) > self.max_tracked:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+            bucket[1] = now
+
+        tokens = bucket[0]
+        if tokens >= 1:
+            tokens = bucket[0] = tokens - 1
+            return RateLimitResult(True, int(tokens), (policy.burst - tokens) / policy.rate, 0.0)
+        return RateLimitResult(False, 0, (policy.burst - tokens) / policy.rate, (1 - tokens) / policy.rate)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+# KEYS[1] bucket; ARGV rate (tokens/s), burst. Returns {allowed, tokens left * 1000}
+# Redis' own clock is used so every node agrees on refill times.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = burst
+else
+  tokens = math.min(burst, tokens + (now - ts) * rate)
+end
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return {allowed, math.floor(tokens * 1000)}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Buckets shared by every node, updated atomically by a Lua script.
+    Takes any redis.asyncio-compatible client (e.g. fakeredis' FakeRedis
+    in tests); keys expire once their bucket would be full again.
+    """
+
+    def __init__(self, client=None, url: str = RATE_LIMIT_REDIS_URL, prefix: str = "ratelimit:"):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        allowed, milli_tokens = await self._script(keys=[self.prefix + key], args=[policy.rate, policy.burst])
+        tokens = int(milli_tokens) / 1000
+        reset = (policy.burst - tokens) / policy.rate
+        if allowed:
+            return RateLimitResult(True, int(tokens), reset, 0.0)
+        return RateLimitResult(False, 0, reset, (1 - tokens) / policy.rate)
+
+
+def build_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "redis":
+        return RedisRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+class _TokenIdentities:
+    """Bearer token -> user key, verified once per token and cached until it expires"""
+
+    def __init__(self, max_size: int = MAX_CACHED_TOKENS):
+        self.max_size = max_size
+        self._cache: Dict[str, Tuple[Optional[str], float]] = {}
+
+    def user_key(self, token: str) -> Optional[str]:
+        cached = self._cache.get(token)
+        now = time.time()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            subject = payload.get("uid") or payload.get("sub")
+            key = f"user:{subject}" if subject is not None else None
+            expires = float(payload.get("exp") or now + 300)
+        except JWTError:
+            # Invalid tokens are limited by address (and get a 401 further in)
+            key, expires = None, now + 300
+        if len(self._cache) >= self.max_size:
+            self._cache.clear()
+        self._cache[token] = (key, expires)
+        return key
+
+
+def _header_value(seconds: float) -> bytes:
+    return str(max(0, math.ceil(seconds))).encode()
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying POLICIES per caller and route class.
+    Runs inside CORS, so 429s carry the CORS headers browsers need to read them.
+    """
+
+    def __init__(self, app, backend=None, policies: Dict[str, RateLimitPolicy] = POLICIES):
+        self.app = app
+        self.backend = backend if backend is not None else build_backend()
+        self.policies = policies
+        self.identities = _TokenIdentities()
+        # Static per-policy header values, encoded once
+        self._static_headers = {
+            name: [
+                (b"ratelimit-limit", str(policy.burst).encode()),
+                (b"ratelimit-policy", f"{policy.limit};w={policy.window:g};burst={policy.burst};comment=\"{name}\"".encode()),
+            ]
+            for name, policy in policies.items()
+        }
+
+    def _caller(self, scope) -> str:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    key = self.identities.user_key(token)
+                    if key is not None:
+                        return key
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        kind = route_class(scope["method"], scope["path"])
+        if kind is None:
+            return await self.app(scope, receive, send)
+
+        policy = self.policies[kind]
+        try:
+            result = await self.backend.hit(f"{kind}:{self._caller(scope)}", policy)
+        except Exception as e:
+            # Fail open: a limiter outage shouldn't take the API down with it
+            logger.error(f"Rate limit backend unavailable: {e}")
+            return await self.app(scope, receive, send)
+
+        headers = self._static_headers[kind] + [
+            (b"ratelimit-remaining", str(result.remaining).encode()),
+            (b"ratelimit-reset", _header_value(result.reset)),
+        ]
+        if not result.allowed:
+            body = b'{"detail":"Rate limit exceeded"}'
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", _header_value(result.retry_after)),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,214 @@
+# backend/app/services/analytics_buffer.py
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.exc import OperationalError
+from ..database import SessionLocal
+from ..models.analytics import PostAnalytics
+from .analytics_store import METRIC_FIELDS, upsert_post_metrics
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_WRITE_BEHIND = os.getenv("ANALYTICS_WRITE_BEHIND", "false").lower() == "true"
+
+# Flush once this many posts are pending, or every interval, whichever comes first
+FLUSH_SIZE = int(os.getenv("ANALYTICS_BUFFER_FLUSH_SIZE", "1000"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("ANALYTICS_BUFFER_FLUSH_INTERVAL", "5"))
+# Hard cap on pending posts; past this, callers write directly
+MAX_PENDING_POSTS = int(os.getenv("ANALYTICS_BUFFER_MAX_PENDING", "10000"))
+# Rows per flush transaction
+FLUSH_BATCH_SIZE = 500
+# Failed writes of a post on its own before its pending update is dropped
+MAX_WRITE_ATTEMPTS = int(os.getenv("ANALYTICS_BUFFER_MAX_WRITE_ATTEMPTS", "3"))
+# Snapshots kept per post between flushes and in metrics_history overall
+MAX_PENDING_SNAPSHOTS = 20
+METRICS_HISTORY_MAX = 500
+
+
+class AnalyticsWriteBuffer:
+    """
+    In-process write-behind buffer for PostAnalytics updates.
+    Updates for the same post_id are merged in memory (latest counters win,
+    each update is kept as a metrics_history snapshot) and written in batched
+    upserts when the size or time trigger fires, and on shutdown.
+    A batch that fails is retried one post at a time, so one bad row can't
+    hold back the rest; a post that keeps failing on its own is dropped
+    (and logged) after MAX_WRITE_ATTEMPTS flushes. While the database is
+    unreachable everything is kept for the next flush.
+    """
+
+    def __init__(self, flush_size: int = FLUSH_SIZE, flush_interval: float = FLUSH_INTERVAL_SECONDS,
+                 max_pending: int = MAX_PENDING_POSTS):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, user_id: int, post_id: int, metrics: Dict) -> Optional[Dict]:
+        """
+        Merge an update into the buffer.
+
+        Returns:
+            the merged pending counters, or None if the buffer is full and
+            the caller should write directly
+        """
+        counters = {k: v for k, v in metrics.items() if k in METRIC_FIELDS and v is not None}
+        snapshot = {"timestamp": datetime.utcnow().isoformat(), **counters}
+
+        with self._lock:
+            entry = self._pending.get(post_id)
+            if entry is None:
+                if len(self._pending) >= self.max_pending:
+                    return None
+                entry = self._pending[post_id] = {"user_id": user_id, "counters": {}, "snapshots": []}
+
+            entry["counters"].update(counters)
+            for key in ("audience_data", "top_countries"):
+                if metrics.get(key) is not None:
+                    entry["counters"][key] = metrics[key]
+            entry["snapshots"].append(snapshot)
+            del entry["snapshots"][:-MAX_PENDING_SNAPSHOTS]
+
+            pending_count = len(self._pending)
+            merged = dict(entry["counters"])
+
+        if pending_count >= self.flush_size:
+            self._signal_flush()
+        return merged
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write everything pending in batched transactions (blocking)"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            post_ids = list(pending)
+            written = 0
+            for start in range(0, len(post_ids), FLUSH_BATCH_SIZE):
+                batch = {pid: pending[pid] for pid in post_ids[start:start + FLUSH_BATCH_SIZE]}
+                try:
+                    written += self._write_batch(batch)
+                    continue
+                except OperationalError:
+                    unwritten = batch
+                except Exception as e:
+                    logger.error(f"Analytics buffer flush failed for {len(batch)} posts, writing them one by one: {e}")
+                    count, unwritten = self._write_each(batch)
+                    written += count
+                    if not unwritten:
+                        continue
+                # Database unreachable: keep the rest for the next flush, not counted against the posts
+                rest = {pid: pending[pid] for pid in post_ids[start + FLUSH_BATCH_SIZE:]}
+                self._requeue({**unwritten, **rest})
+                logger.error(f"Analytics buffer flush stopped, database unreachable; {len(unwritten) + len(rest)} posts kept")
+                break
+            return written
+
+    def _write_each(self, batch: Dict[int, Dict]) -> Tuple[int, Dict[int, Dict]]:
+        """
+        Write a failed batch one post at a time; a post failing on its own
+        counts an attempt. Returns (written, posts left when the database
+        became unreachable).
+        """
+        written = 0
+        post_ids = list(batch)
+        for i, post_id in enumerate(post_ids):
+            entry = batch[post_id]
+            try:
+                written += self._write_batch({post_id: entry})
+            except OperationalError:
+                return written, {pid: batch[pid] for pid in post_ids[i:]}
+            except Exception as e:
+                entry["attempts"] = entry.get("attempts", 0) + 1
+                if entry["attempts"] < MAX_WRITE_ATTEMPTS:
+                    self._requeue({post_id: entry})
+                    continue
+                logger.error(
+                    f"Analytics buffer dropped post {post_id} after {entry['attempts']} failed writes: {e}",
+                    extra={"post_id": post_id, "user_id": entry["user_id"], "counters": entry["counters"]},
+                )
+        return written, {}
+
+    def _write_batch(self, batch: Dict[int, Dict]) -> int:
+        db = SessionLocal()
+        try:
+            # One read of the existing histories so snapshots can be appended
+            histories = dict(
+                db.query(PostAnalytics.post_id, PostAnalytics.metrics_history)
+                .filter(PostAnalytics.post_id.in_(list(batch)))
+                .all()
+            )
+            rows = []
+            for post_id, entry in batch.items():
+                history = list(histories.get(post_id) or []) + entry["snapshots"]
+                rows.append({
+                    "post_id": post_id,
+                    "user_id": entry["user_id"],
+                    **entry["counters"],
+                    "metrics_history": history[-METRICS_HISTORY_MAX:],
+                })
+            written = upsert_post_metrics(db, rows)
+            db.commit()
+            return written
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _requeue(self, batch: Dict[int, Dict]):
+        """Put a failed batch back without overwriting newer updates"""
+        with self._lock:
+            for post_id, entry in batch.items():
+                newer = self._pending.get(post_id)
+                if newer is None:
+                    self._pending[post_id] = entry
+                else:
+                    newer["counters"] = {**entry["counters"], **newer["counters"]}
+                    newer["snapshots"] = (entry["snapshots"] + newer["snapshots"])[-MAX_PENDING_SNAPSHOTS:]
+                    newer["attempts"] = entry.get("attempts", 0)
+
+    def _signal_flush(self):
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await asyncio.to_thread(self.flush)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+analytics_buffer = AnalyticsWriteBuffer()
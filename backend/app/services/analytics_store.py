@@ -0,0 +1,137 @@
+# backend/app/services/analytics_store.py
+from datetime import datetime
+from typing import Dict, Iterable, List
+from sqlalchemy import String, Numeric, case, cast, func, update
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models.analytics import PostAnalytics
+from ..models.post import Post
+from .hashtag_recommender import apply_hashtag_engagement
+from .post_terms import apply_engagement_deltas
+
+METRIC_FIELDS = (
+    "likes_count",
+    "comments_count",
+    "shares_count",
+    "views_count",
+    "clicks_count",
+    "reach",
+    "impressions",
+)
+ENGAGEMENT_FIELDS = ("likes_count", "comments_count", "shares_count")
+EXTRA_FIELDS = ("audience_data", "top_countries", "metrics_history", "last_synced_at", "next_sync_at")
+# Sync bookkeeping: writing only these is not new analytics, so last_updated stays
+SYNC_FIELDS = ("last_synced_at", "next_sync_at")
+
+# Keeps each statement well under PostgreSQL's 65535 bind parameter limit
+UPSERT_CHUNK_SIZE = 1000
+
+
+def _engagement_total():
+    return PostAnalytics.likes_count + PostAnalytics.comments_count + PostAnalytics.shares_count
+
+
+def _engagement_rate_expression():
+    """(likes + comments + shares) / impressions as an 'x.x%' string, computed in SQL"""
+    total = _engagement_total()
+    rate = func.round(cast(total * 100.0 / PostAnalytics.impressions, Numeric(12, 1)), 1)
+    return case(
+        (PostAnalytics.impressions > 0, cast(rate, String) + "%"),
+        else_=PostAnalytics.engagement_rate
+    )
+
+
+def upsert_post_metrics(db: Session, rows: Iterable[Dict]) -> int:
+    """
+    Insert or update PostAnalytics rows in bulk with INSERT ... ON CONFLICT (post_id).
+    Each row needs post_id and user_id; metric fields left out keep their stored value.
+    Engagement changes are folded into the per-user topic/hashtag stats and
+    the industry hashtag graph. last_updated (what posting-time recomputes
+    and dashboard ETags key on) only moves for rows that carry analytics,
+    not for rows that only carry SYNC_FIELDS.
+    Ownership must already be checked by the caller. Does not commit.
+
+    Returns:
+        number of distinct posts written
+    """
+    # Last write wins for duplicate post_ids (one statement can't touch a row twice)
+    merged: Dict[int, Dict] = {}
+    for row in rows:
+        merged.setdefault(row["post_id"], {}).update(row)
+    if not merged:
+        return 0
+
+    # Engagement before the write. Every writer locks the parent posts rows first
+    # (in id order, so writers can't deadlock): locking post_analytics itself
+    # would lock nothing for a post's first write, and two concurrent first
+    # writes would both read 0 and apply the full total twice.
+    tracks_engagement = any(field in row for row in merged.values() for field in ENGAGEMENT_FIELDS)
+    before = {}
+    if tracks_engagement:
+        db.query(Post.id).filter(Post.id.in_(list(merged))).order_by(Post.id).with_for_update().all()
+        before = dict(
+            db.query(PostAnalytics.post_id, _engagement_total())
+            .filter(PostAnalytics.post_id.in_(list(merged)))
+        )
+
+    # Multi-row VALUES needs the same columns on every row, so group by field set
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in merged.values():
+        keys = tuple(sorted(k for k, v in row.items() if v is not None))
+        groups.setdefault(keys, []).append({k: row[k] for k in keys})
+
+    changed = set()
+    for keys, group in groups.items():
+        updatable = [k for k in keys if k in METRIC_FIELDS or k in EXTRA_FIELDS]
+        has_analytics = any(k not in SYNC_FIELDS for k in updatable)
+        if has_analytics:
+            changed.update(row["post_id"] for row in group)
+        for start in range(0, len(group), UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(db, PostAnalytics).values(group[start:start + UPSERT_CHUNK_SIZE])
+            set_ = {k: getattr(stmt.excluded, k) for k in updatable}
+            if has_analytics:
+                set_["last_updated"] = func.now()
+            if set_:
+                db.execute(stmt.on_conflict_do_update(index_elements=["post_id"], set_=set_))
+            else:
+                db.execute(stmt.on_conflict_do_nothing(index_elements=["post_id"]))
+
+    if not changed:
+        return len(merged)
+    # One set-based pass recomputes the rate for every row whose analytics changed
+    after = db.execute(
+        update(PostAnalytics)
+        .where(PostAnalytics.post_id.in_(list(changed)))
+        .values(engagement_rate=_engagement_rate_expression())
+        .returning(PostAnalytics.post_id, _engagement_total())
+        .execution_options(synchronize_session=False)
+    )
+    if tracks_engagement:
+        deltas = {post_id: (total or 0) - (before.get(post_id) or 0) for post_id, total in after}
+        apply_engagement_deltas(db, deltas)
+        apply_hashtag_engagement(db, deltas)
+    return len(merged)
+
+
+def reschedule_syncs(db: Session, next_sync: Dict[int, datetime]) -> int:
+    """
+    Move next_sync_at forward for posts whose sync brought no new analytics
+    (e.g. a failed fetch). A plain UPDATE, grouped by due time, that leaves
+    last_updated alone. Does not commit.
+
+    Returns:
+        number of rows updated
+    """
+    by_due: Dict[datetime, List[int]] = {}
+    for post_id, due in next_sync.items():
+        by_due.setdefault(due, []).append(post_id)
+    updated = 0
+    for due, post_ids in by_due.items():
+        updated += db.execute(
+            update(PostAnalytics)
+            .where(PostAnalytics.post_id.in_(post_ids))
+            # Spelled out, or the column's onupdate would stamp last_updated
+            .values(next_sync_at=due, last_updated=PostAnalytics.last_updated)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return updated
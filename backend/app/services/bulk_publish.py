@@ -0,0 +1,213 @@
+# backend/app/services/bulk_publish.py
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import update
+from sqlalchemy.orm import Session, selectinload
+from ..database import dialect_insert
+from ..models.post import Post
+from ..models.publish_job import PublishJob
+from ..models.user import User
+from .linkedin_tokens import token_usable
+from .post_publishing import mark_post_published
+from .publish_queue import (
+    PublishQueue, claim_posts_for_publishing, idempotency_key_for, publish_queue, release_failed_post
+)
+
+logger = logging.getLogger(__name__)
+
+BULK_PUBLISH_CONCURRENCY = int(os.getenv("BULK_PUBLISH_CONCURRENCY", "5"))
+MAX_BULK_PUBLISH = 100
+
+
+async def bulk_publish(db: Session, user: User, post_ids: List[int],
+                       queue: PublishQueue = publish_queue) -> List[Dict]:
+    """
+    Publish many of a user's posts concurrently and return one result per post.
+
+    Posts are read in one query and claimed in one conditional UPDATE (the
+    same one the publish queue uses), so a post already published or in
+    flight, whichever path sent it, is never sent again. Calls run under a
+    semaphore and the shared rate limiter; posts that hit the limit (or a
+    retryable error) are handed to the publish queue. A post is only
+    claimed together with its job; the claim is committed before the
+    LinkedIn calls, so no transaction stays open across them. All outcomes
+    are written in a single transaction, and one call blowing up only ends
+    its own post as 'unknown'.
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    rows = {
+        row.id: row for row in
+        db.query(Post.id, Post.content, Post.status, Post.linkedin_post_id)
+        .filter(Post.id.in_(post_ids), Post.user_id == user.id)
+    }
+    results = {pid: {"post_id": pid, "status": "not_found"} for pid in post_ids if pid not in rows}
+    if not rows:
+        return [results[pid] for pid in post_ids]
+    contents = {post_id: row.content for post_id, row in rows.items()}
+
+    # The cached current user may predate a token refresh or a disconnect
+    credentials = (
+        db.query(User.access_token, User.linkedin_id, User.linkedin_connected, User.token_expiry)
+        .filter(User.id == user.id)
+        .first()
+    )
+    if not token_usable(credentials):
+        for post_id in rows:
+            results[post_id] = {"post_id": post_id, "status": "failed",
+                                "error": "LinkedIn not connected or token expired"}
+        return [results[pid] for pid in post_ids]
+
+    # Only posts without a job, or whose job definitely failed, may be sent again
+    jobs = {job.post_id: job for job in db.query(PublishJob).filter(PublishJob.post_id.in_(list(rows)))}
+    candidates = [pid for pid in rows if pid not in jobs or jobs[pid].status == "failed"]
+    claimable = claim_posts_for_publishing(db, candidates) if candidates else set()
+    claimed: Dict[int, int] = {}
+    if claimable:
+        for post_id in claimable:
+            job = jobs.get(post_id)
+            if job is not None:
+                # Start over, as resubmitting through the publish queue does
+                job.status = "queued"
+                job.attempts = 0
+                job.last_error = None
+                job.next_attempt_at = None
+                job.completed_at = None
+                job.content = contents[post_id]
+        db.flush()
+        # One job per post (existing jobs are kept), then claim them all in one statement
+        db.execute(
+            dialect_insert(db, PublishJob)
+            .values([
+                {"user_id": user.id, "post_id": post_id, "idempotency_key": idempotency_key_for(post_id),
+                 "content": contents[post_id], "status": "queued", "attempts": 0}
+                for post_id in claimable
+            ])
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        )
+        claimed = {
+            post_id: job_id for job_id, post_id in db.execute(
+                update(PublishJob)
+                .where(PublishJob.post_id.in_(list(claimable)), PublishJob.status == "queued")
+                .values(status="running", attempts=PublishJob.attempts + 1, started_at=datetime.utcnow())
+                .returning(PublishJob.id, PublishJob.post_id)
+                .execution_options(synchronize_session=False)
+            )
+        }
+        # A post whose job another path got to first goes back to where it was
+        for post_id in claimable - set(claimed):
+            db.execute(
+                update(Post)
+                .where(Post.id == post_id, Post.status == "publishing")
+                .values(status=rows[post_id].status)
+                .execution_options(synchronize_session=False)
+            )
+
+    unclaimed = [post_id for post_id in rows if post_id not in claimed]
+    if unclaimed:
+        # Re-read: a concurrent publish may have created or moved a job since the read above
+        jobs = {
+            job.post_id: job for job in
+            db.query(PublishJob).filter(PublishJob.post_id.in_(unclaimed)).populate_existing()
+        }
+    for post_id in unclaimed:
+        row = rows[post_id]
+        job = jobs.get(post_id)
+        if job is None:
+            # Published or being published without a job, e.g. by the scheduler
+            published = row.status == "published" or row.linkedin_post_id is not None
+            results[post_id] = {
+                "post_id": post_id,
+                "status": "already_published" if published else row.status,
+                "linkedin_post_id": row.linkedin_post_id,
+            }
+            continue
+        results[post_id] = {
+            "post_id": post_id,
+            "job_id": job.id,
+            "status": "already_published" if job.status == "succeeded" else job.status,
+            "linkedin_post_id": job.linkedin_post_id,
+        }
+    # Nothing stays open across the LinkedIn calls below
+    db.commit()
+
+    person_urn = f"urn:li:person:{credentials.linkedin_id}"
+    semaphore = asyncio.Semaphore(BULK_PUBLISH_CONCURRENCY)
+
+    async def publish_one(post_id: int):
+        async with semaphore:
+            wait = queue.rate_limiter.try_acquire(person_urn)
+            if wait > 0:
+                return post_id, {"success": False, "deferred": wait}
+            try:
+                return post_id, await queue.publisher.publish_post(
+                    access_token=credentials.access_token,
+                    person_urn=person_urn,
+                    content=contents[post_id]
+                )
+            except Exception as e:
+                # The request may have reached LinkedIn: 'unknown', never retried
+                logger.exception(f"Bulk publish of post {post_id} crashed: {e}")
+                return post_id, {"success": False, "error": f"Publish crashed: {e}", "request_sent": True}
+
+    outcomes = await asyncio.gather(*(publish_one(post_id) for post_id in claimed))
+    if not outcomes:
+        return [results[pid] for pid in post_ids]
+
+    # Single batched write for every outcome
+    jobs = {job.id: job for job in db.query(PublishJob).filter(PublishJob.id.in_(list(claimed.values())))}
+    posts = {
+        post.id: post for post in db.query(Post)
+        .options(selectinload(Post.analytics))
+        .filter(Post.id.in_(list(claimed)))
+    }
+    now = datetime.utcnow()
+    requeue = []
+    for post_id, result in outcomes:
+        job = jobs[claimed[post_id]]
+        if result.get("success"):
+            job.status = "succeeded"
+            job.linkedin_post_id = result.get("post_id")
+            job.linkedin_url = result.get("linkedin_url")
+            job.last_error = None
+            job.completed_at = now
+            mark_post_published(db, posts[job.post_id], result)
+            results[job.post_id] = {
+                "post_id": job.post_id,
+                "job_id": job.id,
+                "status": "published",
+                "linkedin_post_id": job.linkedin_post_id,
+                "linkedin_url": job.linkedin_url,
+            }
+            continue
+
+        if "deferred" in result:
+            # Rate limited locally: nothing was sent, so the attempt doesn't count
+            status, delay, error = "retrying", result["deferred"], "Rate limited, queued for later"
+            job.attempts -= 1
+        else:
+            status, delay, error = queue.classify_failure(result, person_urn, job.attempts)
+
+        job.status = status
+        job.last_error = error
+        if status == "retrying":
+            job.next_attempt_at = now + timedelta(seconds=delay)
+            requeue.append((job.id, delay))
+        else:
+            job.completed_at = now
+            if status == "failed":
+                release_failed_post(db, job.post_id)
+        results[job.post_id] = {
+            "post_id": job.post_id,
+            "job_id": job.id,
+            "status": "queued" if status == "retrying" else status,
+            "error": error,
+        }
+
+    db.commit()
+    for job_id, delay in requeue:
+        queue.enqueue(job_id, delay)
+
+    return [results[pid] for pid in post_ids]
@@ -1,10 +1,10 @@
-import google.generativeai as genai
 import os
 import re
 import time
 import random
 import asyncio
 import logging
+import threading
 from functools import lru_cache
 from typing import List, Dict, Optional
 from ..models.user import User
@@ -12,15 +12,140 @@ from ..models.user import User
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+GEMINI_MODEL = "gemini-1.5-flash"
+# "fake" answers from devtools.fake_gemini instead (load tests, local runs)
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "google").lower()
+
+# Prompt building blocks, built once at import rather than on every prompt
+INDUSTRY_CONTEXTS = {
+    "Technology": """Focus: AI/ML, digital transformation, cybersecurity, startups.
+Key themes: Disruption, scalability, UX, data-driven decisions, emerging tech.
+Audience: Future-focused, practical insights, credible commentary.""",
+    "Marketing": """Focus: Digital strategies, branding, automation, ROI.
+Key themes: Customer journey, personalization, omnichannel, storytelling.
+Audience: Actionable tactics, case studies, performance metrics.""",
+    "Finance": """Focus: Investment, fintech, regulation, trends.
+Key themes: Market volatility, diversification, digital banking, crypto.
+Audience: Data-backed insights, predictions, compliance updates.""",
+    "Healthcare": """Focus: Digital health, telemedicine, patient care, policy.
+Key themes: Outcomes, accessibility, innovation, compliance, prevention.
+Audience: Evidence-based, safety-focused, tech adoption insights.""",
+    "Education": """Focus: EdTech, learning methods, online education.
+Key themes: Personalized learning, accessibility, skills development.
+Audience: Pedagogical insights, tech integration, student success stories."""
+}
+
+CONTENT_STRUCTURES = {
+    "professional": {
+        "short": {
+            "length_instruction": "50-100 words, concise and impactful",
+            "structure": """1. Strong opening
+2. Key insight or data
+3. Brief perspective
+4. Call-to-action"""
+        },
+        "medium": {
+            "length_instruction": "100-200 words, balanced depth and engagement",
+            "structure": """1. Attention hook
+2. Context (2-3 sentences)
+3. Main insight with support
+4. Personal example
+5. Engaging CTA"""
+        },
+        "long": {
+            "length_instruction": "200-300 words, comprehensive storytelling",
+            "structure": """1. Story opener
+2. Background context
+3. Detailed analysis
+4. Case study
+5. Takeaways
+6. CTA"""
+        }
+    },
+    "casual": {
+        "short": {
+            "length_instruction": "50-100 words, conversational",
+            "structure": """1. Personal anecdote
+2. Relatable insight
+3. Light humor
+4. Question"""
+        },
+        "medium": {
+            "length_instruction": "100-200 words, conversational and relatable",
+            "structure": """1. Casual opener
+2. Relevant story
+3. Lesson or insight
+4. Friendly CTA"""
+        },
+        "long": {
+            "length_instruction": "200-300 words, informal storytelling",
+            "structure": """1. Story-driven intro
+2. Detailed narrative
+3. Relatable lesson
+4. Sign-off + question"""
+        }
+    },
+    "thought_leadership": {
+        "short": {
+            "length_instruction": "50-100 words, authoritative",
+            "structure": """1. Bold view
+2. Supporting rationale
+3. Implication
+4. Starter question"""
+        },
+        "medium": {
+            "length_instruction": "100-200 words, insightful",
+            "structure": """1. Trend/challenge
+2. Unique perspective
+3. Evidence
+4. Question for leaders"""
+        },
+        "long": {
+            "length_instruction": "200-300 words, broad analysis",
+            "structure": """1. Strategic observation
+2. Evaluation
+3. Bold stance
+4. Future vision + CTA"""
+        }
+    }
+}
+
 
 class GeminiContentService:
+    """
+    The Gemini SDK is heavy to import (about half a second), so it is
+    imported and configured on first use, in a worker thread, or ahead of
+    traffic by warm_up().
+    """
+
     def __init__(self):
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None and GEMINI_BACKEND == "fake":
+                    from devtools.fake_gemini import FakeGenerativeModel
+                    self._model = FakeGenerativeModel(GEMINI_MODEL)
+                elif self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                    self._model = genai.GenerativeModel(GEMINI_MODEL)
+        return self._model
+
+    def warm_up(self):
+        """Import the SDK and build the model client now (blocking; run it in a thread)"""
+        return self.model
+
+    def _generate(self, prompt: str):
+        # Resolves the model inside the calling thread, never on the event loop
+        return self.model.generate_content(prompt)
 
     async def generate_content(self, prompt: str) -> dict:
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
+            response = await asyncio.to_thread(self._generate, prompt)
             return {"content": response.text.strip()}
         except Exception as e:
             logger.error(f"Gemini content generation failed: {e}")
@@ -40,7 +165,7 @@ class GeminiContentService:
         try:
             response = await asyncio.to_thread(
                 self._retry_request,
-                self.model.generate_content,
+                self._generate,
                 prompt
             )
             content = response.text.strip()
@@ -239,24 +364,7 @@ Reference their expertise and use language that matches their {user.brand_voice}
         return prompt
 
     def _get_industry_context(self, industry: str) -> str:
-        industry_contexts = {
-            "Technology": """Focus: AI/ML, digital transformation, cybersecurity, startups.
-Key themes: Disruption, scalability, UX, data-driven decisions, emerging tech.
-Audience: Future-focused, practical insights, credible commentary.""",
-            "Marketing": """Focus: Digital strategies, branding, automation, ROI.
-Key themes: Customer journey, personalization, omnichannel, storytelling.
-Audience: Actionable tactics, case studies, performance metrics.""",
-            "Finance": """Focus: Investment, fintech, regulation, trends.
-Key themes: Market volatility, diversification, digital banking, crypto.
-Audience: Data-backed insights, predictions, compliance updates.""",
-            "Healthcare": """Focus: Digital health, telemedicine, patient care, policy.
-Key themes: Outcomes, accessibility, innovation, compliance, prevention.
-Audience: Evidence-based, safety-focused, tech adoption insights.""",
-            "Education": """Focus: EdTech, learning methods, online education.
-Key themes: Personalized learning, accessibility, skills development.
-Audience: Pedagogical insights, tech integration, student success stories."""
-        }
-        return industry_contexts.get(industry, industry_contexts["Technology"])
+        return INDUSTRY_CONTEXTS.get(industry, INDUSTRY_CONTEXTS["Technology"])
 
     @lru_cache(maxsize=10)
     def _get_trending_topics(self, industry: str) -> str:
@@ -270,80 +378,6 @@ Audience: Pedagogical insights, tech integration, student success stories."""
         return f"Current trending topics in {industry}: {trending_topics.get(industry, trending_topics['Technology'])}"
 
     def _get_content_structure(self, post_type: str, length: str) -> Dict:
-        structures = {
-            "professional": {
-                "short": {
-                    "length_instruction": "50-100 words, concise and impactful",
-                    "structure": """1. Strong opening
-2. Key insight or data
-3. Brief perspective
-4. Call-to-action"""
-                },
-                "medium": {
-                    "length_instruction": "100-200 words, balanced depth and engagement",
-                    "structure": """1. Attention hook
-2. Context (2-3 sentences)
-3. Main insight with support
-4. Personal example
-5. Engaging CTA"""
-                },
-                "long": {
-                    "length_instruction": "200-300 words, comprehensive storytelling",
-                    "structure": """1. Story opener
-2. Background context
-3. Detailed analysis
-4. Case study
-5. Takeaways
-6. CTA"""
-                }
-            },
-            "casual": {
-                "short": {
-                    "length_instruction": "50-100 words, conversational",
-                    "structure": """1. Personal anecdote
-2. Relatable insight
-3. Light humor
-4. Question"""
-                },
-                "medium": {
-                    "length_instruction": "100-200 words, conversational and relatable",
-                    "structure": """1. Casual opener
-2. Relevant story
-3. Lesson or insight
-4. Friendly CTA"""
-                },
-                "long": {
-                    "length_instruction": "200-300 words, informal storytelling",
-                    "structure": """1. Story-driven intro
-2. Detailed narrative
-3. Relatable lesson
-4. Sign-off + question"""
-                }
-            },
-            "thought_leadership": {
-                "short": {
-                    "length_instruction": "50-100 words, authoritative",
-                    "structure": """1. Bold view
-2. Supporting rationale
-3. Implication
-4. Starter question"""
-                },
-                "medium": {
-                    "length_instruction": "100-200 words, insightful",
-                    "structure": """1. Trend/challenge
-2. Unique perspective
-3. Evidence
-4. Question for leaders"""
-                },
-                "long": {
-                    "length_instruction": "200-300 words, broad analysis",
-                    "structure": """1. Strategic observation
-2. Evaluation
-3. Bold stance
-4. Future vision + CTA"""
-                }
-            }
-        }
-        return structures.get(post_type, structures["professional"]).get(
-            length, structures["professional"]["medium"]
+        return CONTENT_STRUCTURES.get(post_type, CONTENT_STRUCTURES["professional"]).get(
+            length, CONTENT_STRUCTURES["professional"]["medium"]
         )
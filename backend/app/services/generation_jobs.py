@@ -0,0 +1,289 @@
+# backend/app/services/generation_jobs.py
+"""
+Asynchronous content generation jobs.
+
+POST /api/content/generation-jobs/{generate,improve} stores a job and
+returns 202 straight away; the model calls, retries and rewrite pass run
+on a bounded pool of workers instead of holding the request open.
+Clients poll the job or watch it over a WebSocket, which also reports
+the stage the job is in.
+
+    GENERATION_BACKEND=local        workers run in the API process (default)
+    GENERATION_BACKEND=celery       workers run under Celery, see app.workers.generation_tasks
+    GENERATION_WORKERS=4            concurrent jobs per API process (local backend)
+    GENERATION_QUEUE_MAX=200        jobs waiting beyond this are refused with 503
+    GENERATION_JOB_TIMEOUT_SECONDS=300
+    GENERATION_JOB_TTL_HOURS=24     finished jobs are purged after this
+
+Jobs live in generation_jobs, so status and results are visible to every
+API worker whichever process ran them. A job's result is written in the
+same transaction as the Post it creates.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.generation_job import GenerationJob
+from ..models.user import User
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "local").lower()
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "4"))
+GENERATION_QUEUE_MAX = int(os.getenv("GENERATION_QUEUE_MAX", "200"))
+GENERATION_JOB_TIMEOUT_SECONDS = float(os.getenv("GENERATION_JOB_TIMEOUT_SECONDS", "300"))
+GENERATION_JOB_TTL = timedelta(hours=float(os.getenv("GENERATION_JOB_TTL_HOURS", "24")))
+GENERATION_PURGE_INTERVAL_SECONDS = 300
+# Shutdown waits this long for running jobs; the rest are put back as queued
+GENERATION_DRAIN_TIMEOUT_SECONDS = float(os.getenv("GENERATION_DRAIN_TIMEOUT_SECONDS", "10"))
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# runner(db, user, request, progress) -> response body; progress(stage) is awaited
+Progress = Callable[[str], Awaitable[None]]
+Runner = Callable[[Session, User, BaseModel, Progress], Awaitable[Dict[str, Any]]]
+
+
+class GenerationQueueFull(Exception):
+    """Too many jobs waiting; the client should retry later"""
+
+
+def job_payload(job: GenerationJob) -> Dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "stage": job.stage,
+        "result": job.result,
+        "error": job.error,
+        "post_id": job.post_id,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "completed_at": job.completed_at,
+        "status_url": f"/api/content/generation-jobs/{job.id}",
+        "ws_url": f"/api/content/generation-jobs/{job.id}/ws",
+    }
+
+
+async def no_progress(stage: str):
+    pass
+
+
+class GenerationQueue(JobQueue):
+    """
+    Bounded worker pool for generation jobs. The API registers a runner per
+    job kind (the same code the synchronous endpoints run); workers claim
+    a job by flipping it from queued to running, so a job recovered by
+    two processes still runs once.
+    """
+
+    model = GenerationJob
+    name = "Generation"
+
+    def __init__(self, backend: str = GENERATION_BACKEND, workers: int = GENERATION_WORKERS,
+                 max_queued: int = GENERATION_QUEUE_MAX, timeout: float = GENERATION_JOB_TIMEOUT_SECONDS):
+        # A job still 'running' after twice its timeout lost its worker
+        super().__init__(workers, lease_seconds=2 * timeout, drain_timeout=GENERATION_DRAIN_TIMEOUT_SECONDS,
+                         max_queued=max_queued)
+        self.backend = backend
+        self.timeout = timeout
+        self._runners: Dict[str, Tuple[Type[BaseModel], Runner]] = {}
+        self._watchers: Dict[int, Set[asyncio.Event]] = {}
+        self._last_purge = 0.0
+
+    def register(self, kind: str, request_model: Type[BaseModel], runner: Runner):
+        self._runners[kind] = (request_model, runner)
+
+    # --- Submission ---
+
+    def submit(self, db: Session, user_id: int, kind: str, request: BaseModel) -> GenerationJob:
+        """
+        Stage a queued job in the caller's transaction; raises GenerationQueueFull when saturated.
+        The caller commits (together with anything recorded alongside, such as
+        the request's idempotency key) and then calls enqueue(job.id), so a
+        crash in between never leaves a job its retry can't find.
+        """
+        if kind not in self._runners:
+            raise ValueError(f"Unknown generation job kind: {kind}")
+        if self._saturated(db):
+            raise GenerationQueueFull("Too many generation jobs queued, try again shortly")
+
+        if time.monotonic() - self._last_purge > GENERATION_PURGE_INTERVAL_SECONDS:
+            self._last_purge = time.monotonic()
+            self.sweep(db)
+
+        job = GenerationJob(user_id=user_id, kind=kind, request=request.model_dump(mode="json"), status="queued")
+        db.add(job)
+        db.flush()
+        return job
+
+    def _saturated(self, db: Session) -> bool:
+        if self.backend == "celery":
+            # The broker is unbounded; count what is still waiting instead
+            queued = db.query(GenerationJob.id).filter(GenerationJob.status == "queued").limit(self.max_queued).count()
+            return queued >= self.max_queued
+        return self._queue is not None and self._queue.full()
+
+    def enqueue(self, job_id: int, delay: float = 0):
+        if self.backend == "celery":
+            from ..workers.generation_tasks import run_generation_job
+            run_generation_job.delay(job_id)
+            return
+        super().enqueue(job_id, delay)
+
+    def sweep(self, db: Session):
+        """Purge old finished jobs and fail ones whose worker died mid-run"""
+        now = datetime.utcnow()
+        db.execute(
+            delete(GenerationJob).where(
+                GenerationJob.status.in_(TERMINAL_STATUSES),
+                GenerationJob.completed_at < now - GENERATION_JOB_TTL,
+            )
+        )
+        self.expire_orphaned(db)
+        db.commit()
+
+    def _orphaned_values(self) -> Dict:
+        return {"stage": None, "error": "Generation worker stopped"}
+
+    # --- Progress notifications (in-process; other processes are polled) ---
+
+    @contextmanager
+    def watch(self, job_id: int):
+        """Event set whenever this process moves the job on"""
+        event = asyncio.Event()
+        self._watchers.setdefault(job_id, set()).add(event)
+        try:
+            yield event
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(event)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    def _notify(self, job_id: int):
+        for event in self._watchers.get(job_id, ()):
+            event.set()
+
+    # --- Database steps (run in threads) ---
+
+    def _claim(self, job_id: int) -> Optional[Tuple[str, Dict, User]]:
+        db = SessionLocal()
+        try:
+            claimed = self._transition(db, job_id, ("queued",), status="running", stage="starting",
+                                       started_at=datetime.utcnow())
+            if not claimed:
+                db.rollback()
+                return None
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            user = db.query(User).filter(User.id == job.user_id).first()
+            kind, request = job.kind, job.request
+            # Detached with its columns loaded (before the commit expires them); the runner only reads the profile
+            db.expunge(user)
+            db.commit()
+            return kind, request, user
+        finally:
+            db.close()
+
+    def _set_stage(self, job_id: int, stage: str):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id, GenerationJob.status == "running")
+                .values(stage=stage)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, status: str, error: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            values = {"status": status, "error": error, "stage": None}
+            if status in TERMINAL_STATUSES:
+                values["completed_at"] = datetime.utcnow()
+            else:
+                values["started_at"] = None
+            self._transition(db, job_id, ("running",), **values)
+            db.commit()
+        finally:
+            db.close()
+
+    # --- Processing ---
+
+    async def _execute(self, job_id: int, kind: str, payload: Dict, user: User):
+        request_model, runner = self._runners[kind]
+        request = request_model.model_validate(payload)
+
+        async def progress(stage: str):
+            await asyncio.to_thread(self._set_stage, job_id, stage)
+            self._notify(job_id)
+
+        # Session marked with the user, so their next reads go to the primary
+        db = SessionLocal(info={"request_state": SimpleNamespace(user_id=user.id)})
+        try:
+            response = await runner(db, user, request, progress)
+            # Stored with the post the runner added, in one transaction
+            db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .values(status="succeeded", stage=None, result=response, post_id=response.get("post_id"),
+                        completed_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_job(self, job_id: int):
+        """Run one job to completion; shared by the local workers and the Celery task"""
+        claim = await asyncio.to_thread(self._claim, job_id)
+        if claim is None:
+            return
+        kind, payload, user = claim
+        self._notify(job_id)
+
+        error = None
+        try:
+            await asyncio.wait_for(self._execute(job_id, kind, payload, user), self.timeout)
+        except HTTPException as e:
+            error = str(e.detail)
+        except asyncio.TimeoutError:
+            error = f"Generation timed out after {self.timeout:.0f}s"
+        except asyncio.CancelledError:
+            # Shutting down: put it back for the next start
+            await asyncio.shield(asyncio.to_thread(self._finish, job_id, "queued"))
+            raise
+        except Exception as e:
+            logger.exception(f"Generation job {job_id} crashed: {e}")
+            error = "Generation failed"
+
+        if error is not None:
+            await asyncio.to_thread(self._finish, job_id, "failed", error)
+        self._notify(job_id)
+
+    async def _process(self, job_id: int):
+        await self.run_job(job_id)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        # Under Celery the jobs run in the Celery workers, not here
+        if self.backend != "celery":
+            await super().start()
+
+
+generation_queue = GenerationQueue()
@@ -0,0 +1,264 @@
+# backend/app/services/hashtag_recommender.py
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from itertools import permutations
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models.analytics import PostAnalytics
+from ..models.hashtag_graph import HashtagCooccurrence, IndustryHashtagStats
+from ..models.post import Post
+from ..models.post_terms import PostHashtag
+from ..models.user import User
+from .post_terms import normalize_hashtags
+
+# Only the first few tags of a post count, which bounds pairs per post
+MAX_TAGS_PER_POST = 10
+# Pairs seen fewer times than this are left out of the in-memory graph
+MIN_PAIR_SUPPORT = 2
+MIN_TAG_SUPPORT = 3
+# Pseudo-posts at the industry mean when estimating a tag's engagement lift
+LIFT_PRIOR_POSTS = 5.0
+# Tags below this lift (or without enough history) are candidates for replacement
+LOW_VALUE_LIFT = 0.8
+GRAPH_TTL_SECONDS = int(os.getenv("HASHTAG_GRAPH_TTL_SECONDS", "300"))
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9_]+")
+
+
+def _industry_key(industry: Optional[str]) -> str:
+    return (industry or "")[:100]
+
+
+def _bump(db: Session, model, rows: Dict[tuple, List[int]], key_columns: Tuple[str, ...]):
+    """Additive upsert of (post_count, total_engagement) increments"""
+    if not rows:
+        return
+    stmt = dialect_insert(db, model).values([
+        {**dict(zip(key_columns, key)), "post_count": posts, "total_engagement": engagement}
+        for key, (posts, engagement) in rows.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={
+            "post_count": model.post_count + stmt.excluded.post_count,
+            "total_engagement": model.total_engagement + stmt.excluded.total_engagement,
+        },
+    ))
+
+
+def _increments(tagged_posts, engagement: Callable, posts: int):
+    """Tag and pair increments for [(industry, [tags])]; engagement(i) gives each post's share"""
+    tags, pairs = defaultdict(lambda: [0, 0]), defaultdict(lambda: [0, 0])
+    for i, (industry, post_tags) in enumerate(tagged_posts):
+        post_tags = post_tags[:MAX_TAGS_PER_POST]
+        for tag in post_tags:
+            tags[(industry, tag)][0] += posts
+            tags[(industry, tag)][1] += engagement(i)
+        for a, b in permutations(post_tags, 2):
+            pairs[(industry, a, b)][0] += posts
+            pairs[(industry, a, b)][1] += engagement(i)
+    return tags, pairs
+
+
+def record_published_post(db: Session, post: Post, industry: Optional[str]):
+    """Count a newly published post in its industry's hashtag graph. Does not commit."""
+    tagged = [(_industry_key(industry), normalize_hashtags(post.hashtags))]
+    tags, pairs = _increments(tagged, lambda i: 0, posts=1)
+    _bump(db, IndustryHashtagStats, tags, ("industry", "hashtag"))
+    _bump(db, HashtagCooccurrence, pairs, ("industry", "hashtag", "related_hashtag"))
+
+
+def apply_hashtag_engagement(db: Session, deltas: Dict[int, int]):
+    """Fold per-post engagement changes of published posts into the graph. Does not commit."""
+    deltas = {post_id: delta for post_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    rows = (
+        db.query(PostHashtag.post_id, PostHashtag.hashtag, User.industry)
+        .join(Post, Post.id == PostHashtag.post_id)
+        .join(User, User.id == Post.user_id)
+        .filter(PostHashtag.post_id.in_(list(deltas)), Post.status == "published")
+        .order_by(PostHashtag.post_id, PostHashtag.id)
+    )
+    by_post = {}
+    for post_id, hashtag, industry in rows:
+        by_post.setdefault(post_id, (_industry_key(industry), []))[1].append(hashtag)
+    post_ids = list(by_post)
+    tags, pairs = _increments(list(by_post.values()), lambda i: deltas[post_ids[i]], posts=0)
+    _bump(db, IndustryHashtagStats, tags, ("industry", "hashtag"))
+    _bump(db, HashtagCooccurrence, pairs, ("industry", "hashtag", "related_hashtag"))
+
+
+def rebuild_hashtag_graph(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rebuild the graph from every published post and its current analytics.
+    Commits.
+
+    Returns:
+        number of posts counted
+    """
+    db.query(HashtagCooccurrence).delete(synchronize_session=False)
+    db.query(IndustryHashtagStats).delete(synchronize_session=False)
+
+    engagement = PostAnalytics.likes_count + PostAnalytics.comments_count + PostAnalytics.shares_count
+    last_id, counted = 0, 0
+    while True:
+        batch = (
+            db.query(Post.id, Post.hashtags, User.industry, engagement)
+            .join(User, User.id == Post.user_id)
+            .outerjoin(PostAnalytics, PostAnalytics.post_id == Post.id)
+            .filter(Post.status == "published", Post.id > last_id)
+            .order_by(Post.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        tagged = [(_industry_key(industry), normalize_hashtags(hashtags)) for _, hashtags, industry, _ in batch]
+        tags, pairs = _increments(tagged, lambda i: batch[i][3] or 0, posts=1)
+        _bump(db, IndustryHashtagStats, tags, ("industry", "hashtag"))
+        _bump(db, HashtagCooccurrence, pairs, ("industry", "hashtag", "related_hashtag"))
+        last_id = batch[-1][0]
+        counted += len(batch)
+    db.commit()
+    return counted
+
+
+class HashtagGraph:
+    """In-memory sparse view of one industry: tag stats plus dict-of-dicts co-occurrence counts"""
+
+    def __init__(self, tags: Dict[str, Tuple[int, int]], neighbours: Dict[str, Dict[str, int]]):
+        self.tags = tags
+        self.neighbours = neighbours
+        posts = sum(count for count, _ in tags.values())
+        self.mean = sum(engagement for _, engagement in tags.values()) / posts if posts else 0.0
+        self.popular = sorted(
+            (tag for tag, (count, _) in tags.items() if count >= MIN_TAG_SUPPORT),
+            key=lambda tag: -self.lift(tag) * math.log1p(tags[tag][0]),
+        )[:50]
+
+    def lift(self, tag: str) -> float:
+        """Smoothed mean engagement of posts using the tag, relative to the industry mean"""
+        count, engagement = self.tags.get(tag, (0, 0))
+        if not self.mean:
+            return 1.0
+        return (engagement + LIFT_PRIOR_POSTS * self.mean) / (count + LIFT_PRIOR_POSTS) / self.mean
+
+    def value(self, tag: str) -> Optional[float]:
+        """Lift for tags with enough history, None otherwise"""
+        if self.tags.get(tag, (0, 0))[0] < MIN_TAG_SUPPORT:
+            return None
+        return self.lift(tag)
+
+    def recommend(self, content: str, current: List[str], k: int) -> List[Tuple[str, float]]:
+        current_set = set(current)
+        words = set(_WORD.findall(content.lower()))
+        seeds = current_set | {word for word in words if word in self.tags}
+
+        scores = defaultdict(float)
+        for seed in seeds:
+            seed_count = self.tags.get(seed, (0, 0))[0]
+            for tag, together in self.neighbours.get(seed, {}).items():
+                if tag not in current_set:
+                    # P(tag | seed), weighted by how well the tag performs
+                    scores[tag] += together / max(seed_count, 1) * self.lift(tag)
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        # Not enough related tags: fill with the industry's best performers
+        for tag in self.popular:
+            if len(ranked) >= k:
+                break
+            if tag not in current_set and tag not in scores:
+                ranked.append((tag, 0.0))
+        return ranked
+
+
+class HashtagRecommender:
+    def __init__(self, ttl_seconds: int = GRAPH_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._graphs: Dict[str, Tuple[float, HashtagGraph]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, industry: str) -> HashtagGraph:
+        tags = {
+            hashtag: (count, engagement or 0)
+            for hashtag, count, engagement in db.query(
+                IndustryHashtagStats.hashtag, IndustryHashtagStats.post_count, IndustryHashtagStats.total_engagement
+            ).filter(IndustryHashtagStats.industry == industry)
+        }
+        neighbours = defaultdict(dict)
+        for hashtag, related, count in db.query(
+            HashtagCooccurrence.hashtag, HashtagCooccurrence.related_hashtag, HashtagCooccurrence.post_count
+        ).filter(
+            HashtagCooccurrence.industry == industry,
+            HashtagCooccurrence.post_count >= MIN_PAIR_SUPPORT,
+        ):
+            neighbours[hashtag][related] = count
+        return HashtagGraph(tags, dict(neighbours))
+
+    def graph(self, db: Session, industry: Optional[str]) -> HashtagGraph:
+        key = _industry_key(industry)
+        with self._lock:
+            cached = self._graphs.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        graph = self._load(db, key)
+        with self._lock:
+            self._graphs[key] = (time.monotonic(), graph)
+        return graph
+
+    def recommend(self, db: Session, industry: Optional[str], content: str,
+                  hashtags: List[str], k: int = 5) -> List[Dict]:
+        """Top-k hashtags for a draft, best first (without the leading '#')"""
+        graph = self.graph(db, industry)
+        return [
+            {"hashtag": tag, "score": round(score, 4), "lift": round(graph.lift(tag), 3)}
+            for tag, score in graph.recommend(content, normalize_hashtags(hashtags), k)
+        ]
+
+    def improve_hashtags(self, db: Session, industry: Optional[str], content: str, hashtags: List[str],
+                         fits: Callable[[str, List[str]], bool]) -> Tuple[str, List[str], List[Tuple[str, str]]]:
+        """
+        Swap low-value hashtags for better recommended ones, in both the
+        hashtag list and the content text. A swap is only kept if
+        fits(content, hashtags) still holds.
+
+        Returns:
+            (content, hashtags, [(old, new), ...])
+        """
+        graph = self.graph(db, industry)
+        if not graph.tags or not hashtags:
+            return content, hashtags, []
+
+        current = normalize_hashtags(hashtags)
+        candidates = [tag for tag, _ in graph.recommend(content, current, k=2 * len(current) + 3)]
+        low_value = sorted(
+            (tag for tag in current if (graph.value(tag) or 0.0) < LOW_VALUE_LIFT),
+            key=lambda tag: graph.value(tag) or 0.0,
+        )
+
+        hashtags, swaps = list(hashtags), []
+        for old in low_value:
+            floor = max(graph.value(old) or 0.0, LOW_VALUE_LIFT)
+            while candidates:
+                new = candidates.pop(0)
+                if graph.value(new) is None or graph.value(new) <= floor:
+                    continue
+                new_hashtags = [
+                    ("#" + new if tag.startswith("#") else new) if normalize_hashtags([tag]) == [old] else tag
+                    for tag in hashtags
+                ]
+                new_content = re.sub(rf"#{re.escape(old)}\b", f"#{new}", content, flags=re.IGNORECASE)
+                if fits(new_content, new_hashtags):
+                    content, hashtags = new_content, new_hashtags
+                    swaps.append((old, new))
+                break
+        return content, hashtags, swaps
+
+
+hashtag_recommender = HashtagRecommender()
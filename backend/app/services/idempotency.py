@@ -0,0 +1,223 @@
+# backend/app/services/idempotency.py
+"""
+Idempotency-Key support for endpoints that cost an LLM call and a write.
+
+The first request with a key claims a record (INSERT ... ON CONFLICT DO
+NOTHING) and runs. It stores its response in the same transaction as its
+own writes, so a Post and the response that names it commit together.
+Duplicates replay the stored response. Duplicates that arrive while the
+first request is still running wait for it, woken in-process or by
+polling the record when the owner is another worker.
+
+    IDEMPOTENCY_TTL_HOURS=24        records are purged after this
+    IDEMPOTENCY_LOCK_SECONDS=180    an owner silent for longer can be taken over
+    IDEMPOTENCY_WAIT_SECONDS=120    duplicates give up after this (409)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models.idempotency import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+IDEMPOTENCY_LOCK = timedelta(seconds=float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "180")))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+IDEMPOTENCY_POLL_SECONDS = 0.25
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = 300
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyError(Exception):
+    status_code = 400
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """Same key, different request"""
+    status_code = 422
+
+
+class IdempotencyInProgress(IdempotencyError):
+    """The original request is still running after the wait"""
+    status_code = 409
+
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """Hash of the request; JSON bodies are canonicalised so key order doesn't matter"""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    return hashlib.sha256(method.encode() + b" " + path.encode() + b"\n" + body).hexdigest()
+
+
+class IdempotencyClaim:
+    """
+    Result of claiming a key: either this request owns it (run, then
+    complete() before committing) or `replay` holds the stored response
+    as (status_code, body).
+    """
+
+    def __init__(self, store: "IdempotencyStore", db: Session, user_id: int, key: str,
+                 record_id: Optional[int] = None, replay: Optional[Tuple[int, dict]] = None):
+        self.store = store
+        self.db = db
+        self.user_id = user_id
+        self.key = key
+        self.record_id = record_id
+        self.replay = replay
+        self.completed = False
+
+    @property
+    def owner(self) -> bool:
+        return self.record_id is not None
+
+    def complete(self, body: dict, status_code: int = 200):
+        """Stage the response in the caller's transaction; it is stored when they commit"""
+        if not self.owner:
+            return
+        self.db.execute(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.id == self.record_id)
+            .values(status="completed", response_status=status_code, response_body=body, locked_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.completed = True
+
+    def finish(self):
+        """
+        Called once the request is over. An owner that never completed
+        (error, or rolled back) gives the key up so a retry can run.
+        """
+        if self.owner and not self.completed:
+            try:
+                self.db.rollback()
+                self.db.execute(
+                    delete(IdempotencyRecord).where(
+                        IdempotencyRecord.id == self.record_id,
+                        IdempotencyRecord.status == "in_progress",
+                    )
+                )
+                self.db.commit()
+            except Exception as e:
+                # The lock expires on its own; retries take over after IDEMPOTENCY_LOCK_SECONDS
+                logger.error(f"Could not release idempotency key: {e}")
+        if self.owner:
+            self.store._wake(self.user_id, self.key)
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: timedelta = IDEMPOTENCY_TTL, lock: timedelta = IDEMPOTENCY_LOCK,
+                 wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS):
+        self.ttl = ttl
+        self.lock = lock
+        self.wait_seconds = wait_seconds
+        self._events: Dict[Tuple[int, str], asyncio.Event] = {}
+        self._last_purge = 0.0
+
+    def _wake(self, user_id: int, key: str):
+        event = self._events.pop((user_id, key), None)
+        if event is not None:
+            event.set()
+
+    def _try_insert(self, db: Session, user_id: int, key: str, fingerprint: str, now: datetime) -> Optional[int]:
+        stmt = (
+            dialect_insert(db, IdempotencyRecord)
+            .values(
+                user_id=user_id, key=key, fingerprint=fingerprint, status="in_progress",
+                locked_until=now + self.lock, expires_at=now + self.ttl,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "key"])
+            .returning(IdempotencyRecord.id)
+        )
+        record_id = db.execute(stmt).scalar()
+        db.commit()
+        return record_id
+
+    def _try_take_over(self, db: Session, record, now: datetime) -> bool:
+        """Claim an in_progress record whose owner went quiet (crashed or stuck)"""
+        taken = db.execute(
+            update(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.id == record.id,
+                IdempotencyRecord.status == "in_progress",
+                IdempotencyRecord.locked_until == record.locked_until,
+            )
+            .values(locked_until=now + self.lock)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return taken == 1
+
+    def purge_expired(self, db: Session) -> int:
+        purged = db.execute(
+            delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < datetime.utcnow())
+        ).rowcount
+        db.commit()
+        return purged
+
+    async def claim(self, db: Session, user_id: int, key: str, fingerprint: str) -> IdempotencyClaim:
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+        if time.monotonic() - self._last_purge > IDEMPOTENCY_PURGE_INTERVAL_SECONDS:
+            self._last_purge = time.monotonic()
+            self.purge_expired(db)
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            now = datetime.utcnow()
+            record_id = self._try_insert(db, user_id, key, fingerprint, now)
+            if record_id is not None:
+                return IdempotencyClaim(self, db, user_id, key, record_id=record_id)
+
+            # Plain row, so nothing reloads after the commit below releases the connection
+            record = db.query(
+                IdempotencyRecord.id, IdempotencyRecord.fingerprint, IdempotencyRecord.status,
+                IdempotencyRecord.locked_until, IdempotencyRecord.expires_at,
+                IdempotencyRecord.response_status, IdempotencyRecord.response_body,
+            ).filter_by(user_id=user_id, key=key).first()
+            db.commit()
+            if record is None:
+                # Released (or purged) between the insert and the read: claim again
+                continue
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+            if record.status == "completed" and _utc_naive(record.expires_at) > now:
+                return IdempotencyClaim(self, db, user_id, key, replay=(record.response_status, record.response_body))
+            if record.status == "completed":
+                # Expired but not yet purged: a fresh request
+                db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id == record.id))
+                db.commit()
+                continue
+            if record.locked_until is None or _utc_naive(record.locked_until) <= now:
+                if self._try_take_over(db, record, now):
+                    return IdempotencyClaim(self, db, user_id, key, record_id=record.id)
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgress("A request with this Idempotency-Key is still in progress")
+            # Woken right away by an owner in this process; otherwise poll for one elsewhere
+            event = self._events.setdefault((user_id, key), asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(IDEMPOTENCY_POLL_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,159 @@
+# backend/app/services/job_queue.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    In-process worker pool over a jobs table (publish_jobs, generation_jobs).
+
+    The table is the source of truth; the asyncio queue only carries ids.
+    A worker claims a job by flipping its status with a conditional UPDATE
+    (_transition), so an id enqueued twice, or recovered by two processes,
+    still runs once. Claims stamp started_at; a job 'running' longer than
+    lease_seconds lost its worker and is moved to orphaned_status on start.
+    stop() lets jobs in flight finish for up to drain_timeout.
+
+    Subclasses set model, implement _process(job_id) and may override
+    _recoverable_jobs() and _orphaned_values().
+    """
+
+    model = None
+    name = "job"
+    orphaned_status = "failed"
+
+    def __init__(self, workers: int, lease_seconds: float, drain_timeout: float, max_queued: int = 0):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.drain_timeout = drain_timeout
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    # --- Queueing ---
+
+    def enqueue(self, job_id: int, delay: float = 0):
+        if self._queue is None:
+            # Not started in this process; picked up by recovery on start
+            return
+        if delay > 0:
+            self._loop.call_later(delay, self._enqueue_now, job_id)
+        else:
+            self._enqueue_now(job_id)
+
+    def _enqueue_now(self, job_id: int):
+        # Timers may fire after stop(); the job stays queued in the database
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            logger.warning(f"{self.name} queue full, job {job_id} left queued")
+
+    # --- Database steps (run in threads) ---
+
+    def _transition(self, db: Session, job_id: int, from_statuses: Tuple[str, ...], *conditions, **values) -> bool:
+        """Move a job on only if it is still in one of from_statuses. Does not commit."""
+        model = self.model
+        return bool(db.execute(
+            update(model)
+            .where(model.id == job_id, model.status.in_(from_statuses), *conditions)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount)
+
+    def _orphaned_values(self) -> Dict:
+        return {}
+
+    def expire_orphaned(self, db: Session) -> int:
+        """Move 'running' jobs older than the lease to orphaned_status. Does not commit."""
+        model = self.model
+        now = datetime.utcnow()
+        return db.execute(
+            update(model)
+            .where(
+                model.status == "running",
+                or_(model.started_at.is_(None), model.started_at < now - timedelta(seconds=self.lease_seconds)),
+            )
+            .values(status=self.orphaned_status, completed_at=now, **self._orphaned_values())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def _recoverable_jobs(self) -> List[Tuple[int, float]]:
+        """(job_id, delay) of jobs waiting to run"""
+        db = SessionLocal()
+        try:
+            query = db.query(self.model.id).filter(self.model.status == "queued").order_by(self.model.id)
+            if self.max_queued:
+                query = query.limit(self.max_queued)
+            return [(job_id, 0) for job_id, in query.all()]
+        finally:
+            db.close()
+
+    def _recover(self) -> List[Tuple[int, float]]:
+        db = SessionLocal()
+        try:
+            expired = self.expire_orphaned(db)
+            db.commit()
+        finally:
+            db.close()
+        if expired:
+            logger.warning(f"{expired} {self.name} job(s) orphaned mid-run marked {self.orphaned_status}")
+        return self._recoverable_jobs()
+
+    # --- Processing ---
+
+    async def _process(self, job_id: int):
+        raise NotImplementedError
+
+    async def _worker(self, queue: asyncio.Queue):
+        while not self._stopping:
+            job_id = await queue.get()
+            task = asyncio.current_task()
+            self._busy.add(task)
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} job {job_id} crashed: {e}")
+            finally:
+                self._busy.discard(task)
+                queue.task_done()
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker(self._queue)) for _ in range(self.workers)]
+
+        # Recover jobs left queued by a previous run; the claim step de-duplicates
+        for job_id, delay in await asyncio.to_thread(self._recover):
+            self.enqueue(job_id, delay)
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Let jobs in flight finish (up to timeout); queued jobs wait in the database"""
+        self._queue = None
+        self._stopping = True
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+        if self._tasks:
+            timeout = self.drain_timeout if timeout is None else timeout
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,51 @@
+# backend/app/services/linkedin_analytics.py
+from typing import Dict, List
+from urllib.parse import quote
+import httpx
+from .http_client import get_http_client
+from .linkedin_oauth_service import LINKEDIN_API_BASE
+
+# Rest.li batch-get accepts a bounded number of ids per request
+BATCH_GET_MAX_IDS = 50
+
+
+class LinkedInAnalyticsClient:
+    def __init__(self):
+        self.api_base = LINKEDIN_API_BASE
+
+    async def batch_get_social_actions(self, access_token: str, post_urns: List[str]) -> Dict:
+        """
+        Fetch like/comment summaries for up to BATCH_GET_MAX_IDS posts in one call
+        (GET /socialActions?ids=List(...)).
+
+        Returns:
+            {"success": True, "stats": {urn: {"likes_count": n, "comments_count": n}}}
+            or {"success": False, "error": ..., "status_code": ...}
+        """
+        ids = ",".join(quote(urn, safe="") for urn in post_urns[:BATCH_GET_MAX_IDS])
+        url = f"{self.api_base}/socialActions?ids=List({ids})"
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "X-Restli-Protocol-Version": "2.0.0"
+        }
+
+        try:
+            response = await get_http_client().get(url, headers=headers)
+            response.raise_for_status()
+            results = response.json().get("results", {})
+        except httpx.HTTPStatusError as e:
+            return {
+                "success": False,
+                "error": f"LinkedIn analytics fetch failed: {str(e)}",
+                "status_code": e.response.status_code
+            }
+        except httpx.HTTPError as e:
+            return {"success": False, "error": f"LinkedIn analytics fetch failed: {str(e)}"}
+
+        stats = {}
+        for urn, actions in results.items():
+            stats[urn] = {
+                "likes_count": actions.get("likesSummary", {}).get("totalLikes", 0),
+                "comments_count": actions.get("commentsSummary", {}).get("aggregatedTotalComments", 0),
+            }
+        return {"success": True, "stats": stats}
@@ -1,15 +1,24 @@
+import logging
 import os
 import secrets
-import requests
+import httpx
 from urllib.parse import urlencode
+from .http_client import get_http_client
+
+LINKEDIN_OAUTH_BASE = os.getenv('LINKEDIN_OAUTH_BASE', 'https://www.linkedin.com/oauth/v2')
+LINKEDIN_API_BASE = os.getenv('LINKEDIN_API_BASE', 'https://api.linkedin.com/v2')
+
+# Request/response details go out at DEBUG (sampled, secrets redacted by the log formatter)
+logger = logging.getLogger(__name__)
 
 class LinkedInOAuthService:
     def __init__(self):
         self.client_id = os.getenv('LINKEDIN_CLIENT_ID')
         self.client_secret = os.getenv('LINKEDIN_CLIENT_SECRET')
         self.redirect_uri = os.getenv('LINKEDIN_REDIRECT_URI', 'http://localhost:3000/linkedin/callback')
-        self.auth_url = 'https://www.linkedin.com/oauth/v2/authorization'
-        self.token_url = 'https://www.linkedin.com/oauth/v2/accessToken'
+        self.auth_url = f'{LINKEDIN_OAUTH_BASE}/authorization'
+        self.token_url = f'{LINKEDIN_OAUTH_BASE}/accessToken'
+        self.userinfo_url = f'{LINKEDIN_API_BASE}/userinfo'
 
     def get_authorization_url(self, state: str = None) -> str:
         if not state:
@@ -24,10 +33,10 @@ class LinkedInOAuthService:
         }
 
         url = f"{self.auth_url}?{urlencode(params)}"
-        print(f"DEBUG: LinkedIn auth URL = {url}")
+        logger.debug("LinkedIn auth URL built", extra={"url": url})
         return url
 
-    def exchange_code_for_token(self, authorization_code: str) -> dict:
+    async def exchange_code_for_token(self, authorization_code: str) -> dict:
         data = {
             'grant_type': 'authorization_code',
             'code': authorization_code,
@@ -37,32 +46,55 @@ class LinkedInOAuthService:
         }
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
 
-        print(f"DEBUG: Token exchange request data: {data}")
-        print(f"DEBUG: Redirect URI: {self.redirect_uri}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("LinkedIn token exchange request", extra={"data": data, "redirect_uri": self.redirect_uri})
 
         try:
-            response = requests.post(self.token_url, data=data, headers=headers)
-            print(f"DEBUG: LinkedIn response status: {response.status_code}")
-            print(f"DEBUG: LinkedIn response: {response.text}")
+            response = await get_http_client().post(self.token_url, data=data, headers=headers)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LinkedIn token exchange response", extra={
+                    "status": response.status_code, "body": response.text
+                })
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
-            print(f"DEBUG: Token exchange failed: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.warning("LinkedIn token exchange failed", extra={"error": str(e)})
             return {'error': f'Token exchange failed: {str(e)}'}
 
-    def get_linkedin_profile(self, access_token: str) -> dict:
+    async def get_linkedin_profile(self, access_token: str) -> dict:
         """Fetch LinkedIn user profile using new /userinfo endpoint"""
-        url = "https://api.linkedin.com/v2/userinfo"
+        url = self.userinfo_url
         headers = {"Authorization": f"Bearer {access_token}"}
 
         try:
-            print(f"DEBUG: Calling LinkedIn userinfo API: {url}")
-            response = requests.get(url, headers=headers)
-            print(f"DEBUG: Profile API response: {response.status_code}")
-            print(f"DEBUG: Profile API response body: {response.text[:200]}...")
+            response = await get_http_client().get(url, headers=headers)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LinkedIn userinfo response", extra={
+                    "url": url, "status": response.status_code, "body": response.text[:200]
+                })
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
-            print(f"DEBUG: Profile API failed: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.warning("LinkedIn userinfo request failed", extra={"error": str(e)})
             return {'error': f'Failed to fetch profile: {str(e)}'}
 
+    async def refresh_access_token(self, refresh_token: str) -> dict:
+        """Trade a refresh token for a new access token (programmatic refresh)"""
+        data = {
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+        try:
+            response = await get_http_client().post(self.token_url, data=data, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.warning("LinkedIn token refresh failed", extra={"status": e.response.status_code})
+            # 400/401 means the refresh token itself is no good
+            return {'error': f'Token refresh failed: {str(e)}', 'status_code': e.response.status_code}
+        except httpx.HTTPError as e:
+            return {'error': f'Token refresh failed: {str(e)}'}
@@ -1,11 +1,13 @@
 # backend/app/services/linkedin_publisher.py
-import requests
+import httpx
 from typing import Dict
 from ..models.user import User
+from .http_client import get_http_client
+from .linkedin_oauth_service import LINKEDIN_API_BASE
 
 class LinkedInPublisher:
     def __init__(self):
-        self.api_base = "https://api.linkedin.com/v2"
+        self.api_base = LINKEDIN_API_BASE
     
     async def publish_post(self, access_token: str, person_urn: str, content: str) -> Dict:
         """Publish content to LinkedIn using Posts API"""
@@ -35,7 +37,7 @@ class LinkedInPublisher:
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = await get_http_client().post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             result = response.json()
@@ -48,15 +50,25 @@ class LinkedInPublisher:
                 "message": "Post published successfully to LinkedIn!"
             }
             
-        except requests.RequestException as e:
+        except httpx.HTTPStatusError as e:
+            retry_after = e.response.headers.get("Retry-After")
             return {
                 "success": False,
-                "error": f"LinkedIn publishing failed: {str(e)}"
+                "error": f"LinkedIn publishing failed: {str(e)}",
+                "status_code": e.response.status_code,
+                "retry_after": float(retry_after) if retry_after and retry_after.isdigit() else None
+            }
+        except httpx.HTTPError as e:
+            return {
+                "success": False,
+                "error": f"LinkedIn publishing failed: {str(e)}",
+                # Connection failures never reached LinkedIn; read timeouts may have
+                "request_sent": not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
             }
     
     async def schedule_post(self, access_token: str, person_urn: str, content: str, scheduled_time: str) -> Dict:
         """Schedule a post for future publishing (requires LinkedIn API approval)"""
-        # For now, save to database and implement scheduling logic
+        # Scheduled posts are published by app.workers.scheduler
         return {
             "success": True,
             "message": f"Post scheduled for {scheduled_time}",
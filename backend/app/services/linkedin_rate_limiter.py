@@ -0,0 +1,101 @@
+# backend/app/services/linkedin_rate_limiter.py
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Per-member daily post allowance and per-app request rate
+MEMBER_POSTS_PER_DAY = float(os.getenv("LINKEDIN_MEMBER_POSTS_PER_DAY", "150"))
+MEMBER_BURST = float(os.getenv("LINKEDIN_MEMBER_BURST", "5"))
+APP_REQUESTS_PER_SECOND = float(os.getenv("LINKEDIN_APP_REQUESTS_PER_SECOND", "10"))
+APP_BURST = float(os.getenv("LINKEDIN_APP_BURST", "20"))
+MAX_TRACKED_MEMBERS = 50_000
+
+
+class TokenBucket:
+    """Classic token bucket that can also be blocked until a Retry-After deadline"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until a token is available (0 means one can be taken now)"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class LinkedInRateLimiter:
+    """Per-member and per-app token buckets shared by everything that calls LinkedIn"""
+
+    def __init__(self, member_rate: float = MEMBER_POSTS_PER_DAY / 86400, member_burst: float = MEMBER_BURST,
+                 app_rate: float = APP_REQUESTS_PER_SECOND, app_burst: float = APP_BURST):
+        self.member_rate = member_rate
+        self.member_burst = member_burst
+        self.app_bucket = TokenBucket(app_rate, app_burst)
+        self.members: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _member_bucket(self, member: str) -> TokenBucket:
+        bucket = self.members.get(member)
+        if bucket is None:
+            bucket = self.members[member] = TokenBucket(self.member_rate, self.member_burst)
+            while len(self.members) > MAX_TRACKED_MEMBERS:
+                self.members.popitem(last=False)
+        self.members.move_to_end(member)
+        return bucket
+
+    def try_acquire(self, member: str, member_limited: bool = True) -> float:
+        """
+        Take a token from both the member's and the app's bucket if available.
+        Runs without awaiting, so it is atomic on the event loop.
+
+        Returns:
+            0 if the call may proceed, otherwise seconds to wait before retrying
+        """
+        now = time.monotonic()
+        member_bucket = self._member_bucket(member) if member_limited else None
+        wait = self.app_bucket.wait_time(now)
+        if member_bucket is not None:
+            wait = max(wait, member_bucket.wait_time(now))
+        if wait > 0:
+            return wait
+        self.app_bucket.take()
+        if member_bucket is not None:
+            member_bucket.take()
+        return 0.0
+
+    async def acquire(self, member: str, member_limited: bool = True):
+        """Wait until both buckets allow one call"""
+        while True:
+            wait = self.try_acquire(member, member_limited)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def retry_after(self, member: str, seconds: float, app_wide: bool = False):
+        """Honor a 429 Retry-After for the member (or the whole app)"""
+        self._member_bucket(member).block_for(seconds)
+        if app_wide:
+            self.app_bucket.block_for(seconds)
+
+
+linkedin_rate_limiter = LinkedInRateLimiter()
@@ -0,0 +1,37 @@
+# backend/app/services/linkedin_tokens.py
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from ..models.user import User
+
+# LinkedIn access tokens live 60 days unless the token response says otherwise
+DEFAULT_TOKEN_LIFETIME = timedelta(days=60)
+
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def token_usable(user: Optional[User], now: Optional[datetime] = None) -> bool:
+    """Whether a LinkedIn call with this user's access token can succeed"""
+    if not user or not user.linkedin_connected or not user.access_token:
+        return False
+    if user.token_expiry is None:
+        return True
+    return _utc_naive(user.token_expiry) > (now or datetime.utcnow())
+
+
+def apply_token_response(user: User, token_result: Dict, now: Optional[datetime] = None):
+    """Store an OAuth token response (code exchange or refresh) on the user. Does not commit."""
+    now = now or datetime.utcnow()
+    expires_in = token_result.get("expires_in")
+    user.access_token = token_result["access_token"]
+    user.token_expiry = now + (timedelta(seconds=int(expires_in)) if expires_in else DEFAULT_TOKEN_LIFETIME)
+    user.linkedin_connected = True
+
+    # A refresh response may omit the refresh token, in which case the old one stays valid
+    if token_result.get("refresh_token"):
+        user.refresh_token = token_result["refresh_token"]
+        refresh_expires_in = token_result.get("refresh_token_expires_in")
+        user.refresh_token_expiry = now + timedelta(seconds=int(refresh_expires_in)) if refresh_expires_in else None
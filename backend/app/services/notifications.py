@@ -0,0 +1,17 @@
+# backend/app/services/notifications.py
+from typing import Optional
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models.notification import Notification
+
+
+def notify(db: Session, user_id: int, kind: str, message: str, dedupe_key: Optional[str] = None):
+    """
+    Store a notification for the user. With a dedupe_key, repeated calls
+    (e.g. from every pass of a background job) store it only once.
+    Does not commit.
+    """
+    stmt = dialect_insert(db, Notification).values(
+        user_id=user_id, kind=kind, message=message, dedupe_key=dedupe_key
+    )
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["dedupe_key"]))
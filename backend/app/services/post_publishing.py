@@ -0,0 +1,35 @@
+# backend/app/services/post_publishing.py
+from datetime import datetime
+from typing import Dict
+from sqlalchemy.orm import Session
+from ..models.post import Post
+from ..models.analytics import PostAnalytics
+from .hashtag_recommender import record_published_post
+
+
+def mark_post_published(db: Session, post: Post, result: Dict):
+    """
+    Record a successful LinkedIn publish on the post and create its
+    initial analytics row. Does not commit, so callers can batch it.
+    """
+    post.status = "published"
+    post.published_time = datetime.utcnow()
+    post.linkedin_post_id = result.get("post_id") or None
+    post.linkedin_url = result.get("linkedin_url")
+    post.publish_lease_until = None
+    post.publish_worker_id = None
+    record_published_post(db, post, post.user.industry)
+
+    if not post.analytics:
+        db.add(PostAnalytics(
+            user_id=post.user_id,
+            post_id=post.id,
+            likes_count=0,
+            comments_count=0,
+            shares_count=0,
+            views_count=0,
+            clicks_count=0,
+            engagement_rate="0%",
+            reach=0,
+            impressions=0,
+        ))
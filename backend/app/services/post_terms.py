@@ -0,0 +1,146 @@
+# backend/app/services/post_terms.py
+from collections import defaultdict
+from typing import Dict, Iterable, List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models.analytics import PostAnalytics
+from ..models.post import Post
+from ..models.post_terms import PostHashtag, PostTopic, UserHashtagStats, UserTopicStats
+
+MAX_TERM_LENGTH = 100
+
+
+def normalize_topics(topics: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(
+        topic.strip()[:MAX_TERM_LENGTH] for topic in topics or [] if topic and topic.strip()
+    ))
+
+
+def normalize_hashtags(hashtags: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(
+        tag.strip().lstrip("#").lower()[:MAX_TERM_LENGTH] for tag in hashtags or [] if tag and tag.strip("# ")
+    ))
+
+
+# (link table, stats table, term column, Post attribute, normalizer)
+TERM_KINDS = (
+    (PostTopic, UserTopicStats, "topic", "topics_used", normalize_topics),
+    (PostHashtag, UserHashtagStats, "hashtag", "hashtags", normalize_hashtags),
+)
+
+
+def _bump_stats(db: Session, stats_model, term_column: str, totals: Dict[tuple, List[int]]):
+    """Add (post_count, engagement) increments to per-user stats rows in one upsert"""
+    if not totals:
+        return
+    stmt = dialect_insert(db, stats_model).values([
+        {"user_id": user_id, term_column: term, "post_count": posts, "total_engagement": engagement}
+        for (user_id, term), (posts, engagement) in totals.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", term_column],
+        set_={
+            "post_count": stats_model.post_count + stmt.excluded.post_count,
+            "total_engagement": stats_model.total_engagement + stmt.excluded.total_engagement,
+        },
+    ))
+
+
+def add_post_terms(db: Session, post: Post):
+    """
+    Index a new post's topics and hashtags and count it in the user's stats.
+    Flushes to get the post id; does not commit.
+    """
+    if post.id is None:
+        db.flush()
+    for link_model, stats_model, term_column, attribute, normalize in TERM_KINDS:
+        values = normalize(getattr(post, attribute))
+        if not values:
+            continue
+        db.execute(link_model.__table__.insert(), [
+            {"post_id": post.id, "user_id": post.user_id, term_column: value} for value in values
+        ])
+        _bump_stats(db, stats_model, term_column, {(post.user_id, value): [1, 0] for value in values})
+
+
+def apply_engagement_deltas(db: Session, deltas: Dict[int, int]):
+    """
+    Fold per-post engagement changes ({post_id: delta}) into the topic and
+    hashtag stats of those posts. Does not commit.
+    """
+    deltas = {post_id: delta for post_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    for link_model, stats_model, term_column, _, _ in TERM_KINDS:
+        totals = defaultdict(lambda: [0, 0])
+        links = db.query(link_model.post_id, link_model.user_id, getattr(link_model, term_column)) \
+            .filter(link_model.post_id.in_(list(deltas)))
+        for post_id, user_id, term in links:
+            totals[(user_id, term)][1] += deltas[post_id]
+        _bump_stats(db, stats_model, term_column, totals)
+
+
+def top_terms(db: Session, user_id: int, stats_model, term_column: str, limit: int = 3) -> List[str]:
+    """A user's terms with the most total engagement (served from the (user_id, total_engagement) index)"""
+    term = getattr(stats_model, term_column)
+    rows = (
+        db.query(term)
+        .filter(stats_model.user_id == user_id, stats_model.total_engagement > 0)
+        .order_by(stats_model.total_engagement.desc())
+        .limit(limit)
+    )
+    return [value for (value,) in rows]
+
+
+def rebuild_post_terms(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rebuild the link tables and stats from Post.topics_used / Post.hashtags
+    and current analytics (for posts created before the tables existed).
+    Commits.
+
+    Returns:
+        number of posts indexed
+    """
+    for link_model, stats_model, *_ in TERM_KINDS:
+        db.query(stats_model).delete(synchronize_session=False)
+        db.query(link_model).delete(synchronize_session=False)
+
+    last_id, indexed = 0, 0
+    while True:
+        batch = (
+            db.query(Post.id, Post.user_id, Post.topics_used, Post.hashtags)
+            .filter(Post.id > last_id)
+            .order_by(Post.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for link_model, _, term_column, attribute, normalize in TERM_KINDS:
+            rows = [
+                {"post_id": post.id, "user_id": post.user_id, term_column: value}
+                for post in batch
+                for value in normalize(getattr(post, attribute))
+            ]
+            if rows:
+                db.execute(link_model.__table__.insert(), rows)
+        last_id = batch[-1].id
+        indexed += len(batch)
+
+    engagement = func.coalesce(
+        PostAnalytics.likes_count + PostAnalytics.comments_count + PostAnalytics.shares_count, 0
+    )
+    for link_model, stats_model, term_column, _, _ in TERM_KINDS:
+        term = getattr(link_model, term_column)
+        totals = (
+            select(link_model.user_id, term, func.count(), func.sum(engagement))
+            .select_from(link_model)
+            .outerjoin(PostAnalytics, PostAnalytics.post_id == link_model.post_id)
+            .group_by(link_model.user_id, term)
+        )
+        db.execute(stats_model.__table__.insert().from_select(
+            ["user_id", term_column, "post_count", "total_engagement"], totals
+        ))
+    db.commit()
+    return indexed
@@ -0,0 +1,207 @@
+# backend/app/services/posting_times.py
+from datetime import datetime
+from typing import Dict, List, Tuple
+import numpy as np
+from sqlalchemy import extract, func, or_
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models.analytics import PostAnalytics
+from ..models.post import Post
+from ..models.settings import UserSettings
+from ..models.user import User
+
+WEEKDAYS = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+SLOTS = 7 * 24
+
+# Pseudo-posts of prior evidence per slot: a user needs a few posts in a slot
+# before their own numbers outweigh the industry's
+USER_PRIOR_STRENGTH = 3.0
+INDUSTRY_PRIOR_STRENGTH = 10.0
+TOP_SLOTS = 5
+USER_CHUNK_SIZE = 2000
+
+
+def _engagement():
+    return PostAnalytics.likes_count + PostAnalytics.comments_count + PostAnalytics.shares_count
+
+
+def _slot_columns(db: Session):
+    # extract() compiles to EXTRACT on PostgreSQL and strftime on sqlite; both count Sunday as 0.
+    # published_time is timestamptz, which PostgreSQL extracts in the session time zone;
+    # convert to UTC first so the slots match hour_utc. sqlite stores the naive UTC value as is.
+    published = Post.published_time
+    if db.get_bind().dialect.name != "sqlite":
+        published = func.timezone("UTC", published)
+    return (
+        extract("dow", published).label("dow"),
+        extract("hour", published).label("hour"),
+    )
+
+
+def _published_posts(query):
+    return (
+        query.join(PostAnalytics, PostAnalytics.post_id == Post.id)
+        .filter(Post.status == "published", Post.published_time.isnot(None))
+    )
+
+
+def users_with_new_analytics(db: Session) -> List[int]:
+    """Users whose analytics changed after their posting times were last computed"""
+    last_change = func.max(func.coalesce(PostAnalytics.last_updated, PostAnalytics.first_tracked))
+    rows = (
+        db.query(PostAnalytics.user_id)
+        .outerjoin(UserSettings, UserSettings.user_id == PostAnalytics.user_id)
+        .group_by(PostAnalytics.user_id, UserSettings.posting_times_computed_at)
+        .having(or_(
+            UserSettings.posting_times_computed_at.is_(None),
+            last_change > UserSettings.posting_times_computed_at,
+        ))
+    )
+    return [user_id for (user_id,) in rows]
+
+
+def _histograms(keys: np.ndarray, dow: np.ndarray, hour: np.ndarray, engagement: np.ndarray,
+                posts: np.ndarray, n_keys: int):
+    """Scatter grouped (key, weekday, hour) rows into (n_keys, 168) engagement and post-count histograms"""
+    flat = keys * SLOTS + dow * 24 + hour
+    size = n_keys * SLOTS
+    engagement_hist = np.bincount(flat, weights=engagement, minlength=size).reshape(n_keys, SLOTS)
+    count_hist = np.bincount(flat, weights=posts, minlength=size).reshape(n_keys, SLOTS)
+    return engagement_hist, count_hist
+
+
+def _rows_to_arrays(rows):
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return [], empty, empty, np.zeros(0), np.zeros(0)
+    keys, dow, hour, engagement, posts = zip(*rows)
+    return (
+        list(keys),
+        np.asarray(dow, dtype=np.int64),
+        np.asarray(hour, dtype=np.int64),
+        np.asarray(engagement, dtype=np.float64),
+        np.asarray(posts, dtype=np.float64),
+    )
+
+
+def industry_priors(db: Session) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Mean engagement per post for every weekday/hour slot, per industry.
+    The None key holds the all-industry prior, used for users without a
+    known industry. Also returns which slots have any published post at
+    all; the others only carry the overall mean and say nothing.
+    """
+    dow, hour = _slot_columns(db)
+    rows = (
+        _published_posts(db.query(
+            User.industry, dow, hour,
+            func.sum(_engagement()), func.count(Post.id),
+        ))
+        .join(User, User.id == Post.user_id)
+        .group_by(User.industry, dow, hour)
+        .all()
+    )
+    industries, dow, hour, engagement, posts = _rows_to_arrays(rows)
+    names = sorted(set(industries), key=lambda name: name or "")
+    index = {name: i for i, name in enumerate(names)}
+    keys = np.asarray([index[name] for name in industries], dtype=np.int64)
+    engagement_hist, count_hist = _histograms(keys, dow, hour, engagement, posts, len(names))
+
+    # Slots are shrunk toward the all-industry rate for that slot, which is
+    # itself shrunk toward the overall mean engagement per post
+    total_engagement, total_posts = engagement_hist.sum(axis=0), count_hist.sum(axis=0)
+    overall_mean = total_engagement.sum() / total_posts.sum() if total_posts.sum() else 0.0
+    overall = (total_engagement + INDUSTRY_PRIOR_STRENGTH * overall_mean) / (total_posts + INDUSTRY_PRIOR_STRENGTH)
+    smoothed = (engagement_hist + INDUSTRY_PRIOR_STRENGTH * overall) / (count_hist + INDUSTRY_PRIOR_STRENGTH)
+    priors = {name: prior for name, prior in zip(names, smoothed) if name is not None}
+    priors[None] = overall
+    return priors, total_posts > 0
+
+
+def _top_slots(scores: np.ndarray, posts: np.ndarray, prior: np.ndarray, observed: np.ndarray) -> List[Dict]:
+    # Slots nobody has posted in are left out. Ties are common for users with
+    # little data, so they go to the slots with more of the user's own posts,
+    # then the better prior, rather than to whichever comes first in the week
+    order = np.lexsort((-prior, -posts, -np.round(scores, 6)))
+    best = [slot for slot in order if posts[slot] > 0 or observed[slot]][:TOP_SLOTS]
+    return [
+        {
+            "day": WEEKDAYS[slot // 24],
+            "hour_utc": int(slot % 24),
+            "score": round(float(scores[slot]), 2),
+            "posts": int(posts[slot]),
+        }
+        for slot in best
+    ]
+
+
+def compute_posting_times(db: Session, user_ids: List[int], priors: Dict[str, np.ndarray],
+                          observed: np.ndarray) -> Dict[int, List[Dict]]:
+    """Smoothed best weekday/hour slots (UTC) for each user, best first"""
+    if not user_ids:
+        return {}
+    dow, hour = _slot_columns(db)
+    rows = (
+        _published_posts(db.query(
+            Post.user_id, dow, hour,
+            func.sum(_engagement()), func.count(Post.id),
+        ))
+        .filter(Post.user_id.in_(user_ids))
+        .group_by(Post.user_id, dow, hour)
+        .all()
+    )
+    industries = dict(db.query(User.id, User.industry).filter(User.id.in_(user_ids)))
+
+    owners, dow, hour, engagement, posts = _rows_to_arrays(rows)
+    index = {user_id: i for i, user_id in enumerate(user_ids)}
+    keys = np.asarray([index[user_id] for user_id in owners], dtype=np.int64)
+    engagement_hist, count_hist = _histograms(keys, dow, hour, engagement, posts, len(user_ids))
+
+    prior = np.stack([priors.get(industries.get(user_id), priors[None]) for user_id in user_ids])
+    # Gamma-Poisson posterior mean: user evidence plus USER_PRIOR_STRENGTH pseudo-posts at the prior rate
+    scores = (engagement_hist + USER_PRIOR_STRENGTH * prior) / (count_hist + USER_PRIOR_STRENGTH)
+
+    return {
+        user_id: _top_slots(scores[i], count_hist[i], prior[i], observed)
+        for i, user_id in enumerate(user_ids)
+    }
+
+
+def save_posting_times(db: Session, results: Dict[int, List[Dict]], computed_at: datetime):
+    """Upsert optimal_posting_times for each user in one statement. Does not commit."""
+    if not results:
+        return
+    stmt = dialect_insert(db, UserSettings).values([
+        {"user_id": user_id, "optimal_posting_times": times, "posting_times_computed_at": computed_at}
+        for user_id, times in results.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "optimal_posting_times": stmt.excluded.optimal_posting_times,
+            "posting_times_computed_at": stmt.excluded.posting_times_computed_at,
+        },
+    ))
+
+
+def refresh_posting_times(db: Session, user_ids: List[int] = None) -> int:
+    """
+    Recompute optimal posting times for users with new analytics (or the given
+    users), a chunk at a time. Commits after each chunk.
+
+    Returns:
+        number of users updated
+    """
+    # Taken before reading, so analytics written during the run are picked up next time
+    computed_at = datetime.utcnow()
+    if user_ids is None:
+        user_ids = users_with_new_analytics(db)
+    if not user_ids:
+        return 0
+
+    priors, observed = industry_priors(db)
+    for start in range(0, len(user_ids), USER_CHUNK_SIZE):
+        chunk = user_ids[start:start + USER_CHUNK_SIZE]
+        save_posting_times(db, compute_posting_times(db, chunk, priors, observed), computed_at)
+        db.commit()
+    return len(user_ids)
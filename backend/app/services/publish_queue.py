@@ -0,0 +1,345 @@
+# backend/app/services/publish_queue.py
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from ..database import SessionLocal, dialect_insert
+from ..models.post import Post
+from ..models.publish_job import PublishJob
+from ..models.user import User
+from .job_queue import JobQueue
+from .linkedin_publisher import LinkedInPublisher
+from .linkedin_rate_limiter import LinkedInRateLimiter, linkedin_rate_limiter
+from .linkedin_tokens import token_usable
+from .post_publishing import mark_post_published
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_QUEUE_WORKERS = int(os.getenv("PUBLISH_QUEUE_WORKERS", "4"))
+MAX_ATTEMPTS = int(os.getenv("PUBLISH_MAX_ATTEMPTS", "5"))
+# A job 'running' longer than this lost its worker (crash, kill -9)
+PUBLISH_JOB_LEASE_SECONDS = int(os.getenv("PUBLISH_JOB_LEASE_SECONDS", "300"))
+# How long shutdown waits for publishes already in flight
+PUBLISH_DRAIN_TIMEOUT_SECONDS = float(os.getenv("PUBLISH_DRAIN_TIMEOUT_SECONDS", "30"))
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 300
+
+# Responses where LinkedIn did not create the post, so retrying is safe
+RETRYABLE_STATUS_CODES = {429, 503}
+# Gateway errors: LinkedIn may have created the post behind the gateway, as
+# with a read timeout, so these are 'unknown' and never retried
+AMBIGUOUS_STATUS_CODES = {502, 504}
+
+
+def idempotency_key_for(post_id: int) -> str:
+    return f"publish-post-{post_id}"
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff with jitter"""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return delay + random.uniform(0, delay / 4)
+
+
+class PostNotPublishable(Exception):
+    """The post is published, or being published by another path (e.g. the scheduler)"""
+
+
+def claim_posts_for_publishing(db: Session, post_ids: Iterable[int]) -> Set[int]:
+    """
+    Flip posts to 'publishing' unless they are already published or in
+    flight; returns the ids that were claimed. A pending schedule is
+    cancelled in the same statement (the scheduler only takes 'scheduled'
+    posts), so whichever path flips a post first is the only one that
+    sends it. Does not commit.
+    """
+    return set(db.execute(
+        update(Post)
+        .where(
+            Post.id.in_(list(post_ids)),
+            Post.status.notin_(("published", "publishing")),
+            Post.linkedin_post_id.is_(None),
+        )
+        .values(status="publishing", publish_lease_until=None, publish_worker_id=None)
+        .returning(Post.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def release_failed_post(db: Session, post_id: int):
+    """A definite failure hands the post back, so it can be published or scheduled again"""
+    db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.status == "publishing")
+        .values(status="failed")
+        .execution_options(synchronize_session=False)
+    )
+
+
+def job_payload(job: PublishJob) -> Dict:
+    return {
+        "job_id": job.id,
+        "post_id": job.post_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "next_attempt_at": job.next_attempt_at,
+        "linkedin_post_id": job.linkedin_post_id,
+        "linkedin_url": job.linkedin_url,
+        "status_url": f"/api/linkedin/publish-jobs/{job.id}",
+    }
+
+
+class PublishQueue(JobQueue):
+    """
+    Asynchronous LinkedIn publishing queue.
+    Jobs live in publish_jobs keyed by an idempotency key derived from the
+    post id, so resubmitting never creates a second publish. Workers honor
+    the shared per-member/per-app token buckets and Retry-After, and retry
+    with exponential backoff only when LinkedIn certainly did not create
+    the post. Ambiguous outcomes (e.g. a read timeout, a 502/504 from a
+    gateway, a crash after the request went out, a worker that died
+    mid-publish) end as 'unknown' instead of risking a duplicate.
+    """
+
+    model = PublishJob
+    name = "Publish"
+    # The LinkedIn call may have gone through before the worker died
+    orphaned_status = "unknown"
+
+    def __init__(self, publisher: Optional[LinkedInPublisher] = None,
+                 rate_limiter: LinkedInRateLimiter = linkedin_rate_limiter,
+                 workers: int = PUBLISH_QUEUE_WORKERS):
+        super().__init__(workers, lease_seconds=PUBLISH_JOB_LEASE_SECONDS,
+                         drain_timeout=PUBLISH_DRAIN_TIMEOUT_SECONDS)
+        # Built on first publish, not when the module is imported
+        self._publisher = publisher
+        self.rate_limiter = rate_limiter
+
+    @property
+    def publisher(self) -> LinkedInPublisher:
+        if self._publisher is None:
+            self._publisher = LinkedInPublisher()
+        return self._publisher
+
+    # --- Submission ---
+
+    def submit(self, db: Session, user_id: int, post_id: int, content: str) -> PublishJob:
+        """
+        Create (or return the existing) publish job for a post and enqueue it.
+        Raises PostNotPublishable when the post went out, or is going out,
+        some other way.
+        """
+        key = idempotency_key_for(post_id)
+        job = db.query(PublishJob).filter(PublishJob.idempotency_key == key).first()
+        # Only a definite failure may be retried by resubmitting
+        if job is not None and job.status != "failed":
+            if job.status == "queued":
+                self.enqueue(job.id)
+            return job
+
+        if not claim_posts_for_publishing(db, [post_id]):
+            db.rollback()
+            # A concurrent submit may have claimed it a moment ago
+            job = db.query(PublishJob).filter(PublishJob.idempotency_key == key).first()
+            if job is not None and job.status != "failed":
+                return job
+            raise PostNotPublishable(f"Post {post_id} is already published or being published")
+
+        db.execute(
+            dialect_insert(db, PublishJob)
+            .values(user_id=user_id, post_id=post_id, idempotency_key=key, content=content,
+                    status="queued", attempts=0)
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        )
+        job = db.query(PublishJob).filter(PublishJob.idempotency_key == key).first()
+        if job.status == "failed":
+            job.status = "queued"
+            job.attempts = 0
+            job.last_error = None
+            job.next_attempt_at = None
+            job.completed_at = None
+            job.content = content
+        db.commit()
+        db.refresh(job)
+
+        self.enqueue(job.id)
+        return job
+
+    # --- Database steps (run in threads) ---
+
+    def _claim(self, job_id: int) -> Optional[Dict]:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            claimed = self._transition(
+                db, job_id, ("queued", "retrying"),
+                or_(PublishJob.next_attempt_at.is_(None), PublishJob.next_attempt_at <= now),
+                status="running", attempts=PublishJob.attempts + 1, started_at=now,
+            )
+            if not claimed:
+                db.rollback()
+                return None
+
+            job = db.query(PublishJob).filter(PublishJob.id == job_id).first()
+            user = db.query(User).filter(User.id == job.user_id).first()
+            if not token_usable(user):
+                job.status = "failed"
+                job.last_error = "LinkedIn not connected or token expired"
+                job.completed_at = datetime.utcnow()
+                release_failed_post(db, job.post_id)
+                db.commit()
+                return None
+
+            db.commit()
+            return {
+                "access_token": user.access_token,
+                "person_urn": f"urn:li:person:{user.linkedin_id}",
+                "member": f"urn:li:person:{user.linkedin_id}",
+                "content": job.content,
+                "attempts": job.attempts,
+            }
+        finally:
+            db.close()
+
+    def _complete(self, job_id: int, result: Dict):
+        """Record the LinkedIn ids on the job and the post in one transaction"""
+        db = SessionLocal()
+        try:
+            job = db.query(PublishJob).filter(PublishJob.id == job_id).first()
+            job.status = "succeeded"
+            job.linkedin_post_id = result.get("post_id")
+            job.linkedin_url = result.get("linkedin_url")
+            job.last_error = None
+            job.next_attempt_at = None
+            job.completed_at = datetime.utcnow()
+            mark_post_published(db, job.post, result)
+            db.commit()
+        finally:
+            db.close()
+
+    def _reschedule(self, job_id: int, delay: float, error: Optional[str], count_attempt: bool = True):
+        db = SessionLocal()
+        try:
+            job = db.query(PublishJob).filter(PublishJob.id == job_id).first()
+            job.status = "retrying"
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            if error:
+                job.last_error = error
+            if not count_attempt:
+                job.attempts -= 1
+            db.commit()
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, status: str, error: str):
+        db = SessionLocal()
+        try:
+            # Conditional: a job already expired as orphaned keeps that verdict
+            finished = self._transition(db, job_id, ("running",), status=status, last_error=error,
+                                        completed_at=datetime.utcnow())
+            if finished and status == "failed":
+                post_id = db.query(PublishJob.post_id).filter(PublishJob.id == job_id).scalar()
+                release_failed_post(db, post_id)
+            db.commit()
+        finally:
+            db.close()
+
+    def _recoverable_jobs(self):
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            jobs = []
+            for job_id, next_attempt_at in db.query(PublishJob.id, PublishJob.next_attempt_at).filter(
+                PublishJob.status.in_(("queued", "retrying"))
+            ):
+                delay = 0
+                if next_attempt_at is not None:
+                    if next_attempt_at.tzinfo is not None:
+                        next_attempt_at = next_attempt_at.astimezone(timezone.utc).replace(tzinfo=None)
+                    delay = max(0, (next_attempt_at - now).total_seconds())
+                jobs.append((job_id, delay))
+            return jobs
+        finally:
+            db.close()
+
+    def _orphaned_values(self) -> Dict:
+        return {"last_error": "Worker stopped mid-publish; outcome unknown, not retried"}
+
+    # --- Processing ---
+
+    async def _process(self, job_id: int):
+        claim = await asyncio.to_thread(self._claim, job_id)
+        if claim is None:
+            return
+
+        request_sent = False
+        try:
+            wait = self.rate_limiter.try_acquire(claim["member"])
+            if wait > 0:
+                # Local rate limit: put it back without spending an attempt
+                await asyncio.to_thread(self._reschedule, job_id, wait, None, False)
+                self.enqueue(job_id, wait)
+                return
+
+            request_sent = True
+            result = await self.publisher.publish_post(
+                access_token=claim["access_token"],
+                person_urn=claim["person_urn"],
+                content=claim["content"]
+            )
+            if result.get("success"):
+                await asyncio.to_thread(self._complete, job_id, result)
+                return
+
+            status, delay, error = self.classify_failure(result, claim["member"], claim["attempts"])
+            if status == "retrying":
+                await asyncio.to_thread(self._reschedule, job_id, delay, error)
+                self.enqueue(job_id, delay)
+            else:
+                await asyncio.to_thread(self._finish, job_id, status, error)
+        except asyncio.CancelledError:
+            # Shutdown outlasted the drain timeout
+            if request_sent:
+                step = asyncio.to_thread(self._finish, job_id, "unknown", "Stopped mid-publish; outcome unknown")
+            else:
+                step = asyncio.to_thread(self._reschedule, job_id, 0, None, False)
+            await asyncio.shield(step)
+            raise
+        except Exception as e:
+            # e.g. a non-JSON 2xx after LinkedIn accepted the post: never a silent 'running'
+            logger.exception(f"Publish job {job_id} crashed: {e}")
+            if request_sent:
+                await asyncio.to_thread(self._finish, job_id, "unknown", f"Outcome unknown, not retried: {e}")
+            else:
+                await asyncio.to_thread(self._finish, job_id, "failed", f"Publish failed: {e}")
+
+    def classify_failure(self, result: Dict, member: str, attempts: int):
+        """
+        Decide what a failed publish attempt means for its job.
+
+        Returns:
+            (status, retry_delay, error) where status is retrying, failed or unknown
+        """
+        error = result.get("error")
+        status_code = result.get("status_code")
+        if (status_code is None and result.get("request_sent")) or status_code in AMBIGUOUS_STATUS_CODES:
+            return "unknown", None, f"Outcome unknown, not retried: {error}"
+
+        retryable = status_code is None or status_code in RETRYABLE_STATUS_CODES
+        if not retryable or attempts >= MAX_ATTEMPTS:
+            return "failed", None, error
+
+        delay = backoff_delay(attempts)
+        if status_code == 429:
+            retry_after = result.get("retry_after") or delay
+            self.rate_limiter.retry_after(member, retry_after)
+            delay = max(delay, retry_after)
+        return "retrying", delay, error
+
+
+publish_queue = PublishQueue()
@@ -0,0 +1,106 @@
+# backend/app/services/topic_suggestions.py
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+SUGGESTIONS_TTL_SECONDS = float(os.getenv("SUGGESTIONS_TTL_SECONDS", "3600"))
+# Fallback lists (the model failed) are kept briefly, so the model is retried soon
+SUGGESTIONS_FALLBACK_TTL_SECONDS = float(os.getenv("SUGGESTIONS_FALLBACK_TTL_SECONDS", "60"))
+SUGGESTIONS_CACHE_MAX_SIZE = int(os.getenv("SUGGESTIONS_CACHE_MAX_SIZE", "1000"))
+
+
+class CachedSuggestions(NamedTuple):
+    suggestions: List[str]
+    generated_at: datetime
+    expires_at: float  # time.monotonic()
+
+    def max_age(self) -> int:
+        return max(0, int(self.expires_at - time.monotonic()))
+
+
+class TopicSuggestionCache:
+    """
+    TTL + LRU cache of topic suggestions per industry. Suggestions are the
+    same for every user in an industry, so one model call serves everyone
+    until the entry expires. Concurrent misses for the same industry share
+    a single generation.
+    """
+
+    def __init__(self, ttl: float = SUGGESTIONS_TTL_SECONDS, fallback_ttl: float = SUGGESTIONS_FALLBACK_TTL_SECONDS,
+                 max_size: int = SUGGESTIONS_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.fallback_ttl = fallback_ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, CachedSuggestions]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def key(industry: str) -> str:
+        return industry.strip().lower()[:100]
+
+    def peek(self, industry: str) -> Optional[CachedSuggestions]:
+        key = self.key(industry)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry.expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, industry: str, suggestions: List[str], fallback: bool = False) -> CachedSuggestions:
+        ttl = self.fallback_ttl if fallback else self.ttl
+        entry = CachedSuggestions(list(suggestions), datetime.utcnow(), time.monotonic() + ttl)
+        key = self.key(industry)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    async def get(self, industry: str,
+                  generate: Callable[[str], Awaitable[tuple]]) -> CachedSuggestions:
+        """
+        Cached entry, or run generate(industry) -> (suggestions, is_fallback)
+        once and cache it.
+        """
+        entry = self.peek(industry)
+        if entry is not None:
+            return entry
+
+        key = self.key(industry)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            suggestions, fallback = await generate(industry)
+            entry = self.put(industry, suggestions, fallback=fallback)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; mark it retrieved in case there are none
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+topic_suggestion_cache = TopicSuggestionCache()
@@ -0,0 +1,37 @@
+# backend/app/warmup.py
+"""
+Optional warm-up, run by the lifespan hook before the app takes traffic.
+
+    WARM_UP_ON_STARTUP=false     set to true to pay these costs at start
+    WARM_UP_DB_CONNECTIONS=5     connections opened ahead of time
+
+Without it, the first requests after a start pay for opening database
+connections and for importing and configuring the Gemini SDK (see
+benchmarks/startup_bench.py for what each costs). Readiness is then
+reported later, but the first users don't notice a cold process.
+"""
+import asyncio
+import logging
+import os
+import time
+from .database import warm_pool
+from .api.content import ai_service
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+WARM_UP_DB_CONNECTIONS = int(os.getenv("WARM_UP_DB_CONNECTIONS", "5"))
+
+
+async def warm_up():
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        asyncio.to_thread(warm_pool, WARM_UP_DB_CONNECTIONS),
+        asyncio.to_thread(ai_service.warm_up),
+        return_exceptions=True,
+    )
+    for step, result in zip(("database pool", "gemini client"), results):
+        if isinstance(result, Exception):
+            # Warm-up is best effort; the first request will retry it
+            logger.warning(f"Warm-up of {step} failed: {result}")
+    logger.info("warm-up finished", extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)})
@@ -0,0 +1,182 @@
+# backend/app/workers/analytics_sync.py
+"""
+LinkedIn analytics sync worker.
+
+    python -m app.workers.analytics_sync          # run forever
+    python -m app.workers.analytics_sync --once   # one pass, then exit
+
+Each pass picks published posts whose next_sync_at has passed (newest
+first), groups them by access token, fetches engagement with batch-get
+calls and writes everything back with one set-based upsert. Sync intervals
+double with every day of post age, so fresh posts stay current while old
+ones cost almost nothing. Point LINKEDIN_API_BASE at devtools/fake_linkedin
+to run it offline.
+"""
+import asyncio
+import logging
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import or_
+from ..database import SessionLocal
+from ..logging_config import setup_logging
+from ..models.analytics import PostAnalytics
+from ..models.post import Post
+from ..models.user import User
+from ..services.analytics_store import reschedule_syncs, upsert_post_metrics
+from ..services.http_client import close_http_client
+from ..services.linkedin_analytics import BATCH_GET_MAX_IDS, LinkedInAnalyticsClient
+from ..services.linkedin_rate_limiter import linkedin_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+SYNC_POLL_INTERVAL_SECONDS = float(os.getenv("ANALYTICS_SYNC_POLL_INTERVAL", "60"))
+# Posts considered per pass
+SYNC_PASS_LIMIT = int(os.getenv("ANALYTICS_SYNC_PASS_LIMIT", "5000"))
+# Concurrent LinkedIn calls per access token and overall
+PER_TOKEN_CONCURRENCY = int(os.getenv("ANALYTICS_SYNC_PER_TOKEN_CONCURRENCY", "2"))
+GLOBAL_CONCURRENCY = int(os.getenv("ANALYTICS_SYNC_CONCURRENCY", "20"))
+
+BASE_INTERVAL = timedelta(minutes=15)
+MAX_INTERVAL = timedelta(days=7)
+
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def next_sync_interval(published_time: datetime, now: datetime) -> timedelta:
+    """15 minutes for a new post, doubling per day of age, capped at a week"""
+    age_days = max(0, (now - _utc_naive(published_time)).days)
+    if age_days >= 20:
+        return MAX_INTERVAL
+    return min(MAX_INTERVAL, BASE_INTERVAL * (2 ** age_days))
+
+
+class AnalyticsSyncWorker:
+    def __init__(self, client: LinkedInAnalyticsClient = None):
+        self.client = client or LinkedInAnalyticsClient()
+        self.global_semaphore = asyncio.Semaphore(GLOBAL_CONCURRENCY)
+        self._stopping = False
+
+    def due_posts(self, now: datetime) -> List:
+        """Published posts due for a sync, with a usable token, newest first"""
+        db = SessionLocal()
+        try:
+            return (
+                db.query(
+                    PostAnalytics.post_id,
+                    PostAnalytics.user_id,
+                    Post.linkedin_post_id,
+                    Post.published_time,
+                    User.access_token,
+                )
+                .join(Post, Post.id == PostAnalytics.post_id)
+                .join(User, User.id == PostAnalytics.user_id)
+                .filter(
+                    Post.status == "published",
+                    Post.linkedin_post_id.isnot(None),
+                    User.linkedin_connected.is_(True),
+                    User.access_token.isnot(None),
+                    or_(User.token_expiry.is_(None), User.token_expiry > now),
+                    or_(PostAnalytics.next_sync_at.is_(None), PostAnalytics.next_sync_at <= now),
+                )
+                .order_by(Post.published_time.desc())
+                .limit(SYNC_PASS_LIMIT)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def write_results(self, rows: List[Dict]) -> int:
+        # Posts whose fetch failed only move their next sync; that isn't new analytics
+        fetched = [row for row in rows if "last_synced_at" in row]
+        skipped = {row["post_id"]: row["next_sync_at"] for row in rows if "last_synced_at" not in row}
+        db = SessionLocal()
+        try:
+            written = upsert_post_metrics(db, fetched) + reschedule_syncs(db, skipped)
+            db.commit()
+            return written
+        finally:
+            db.close()
+
+    async def _fetch_batch(self, token_semaphore: asyncio.Semaphore, access_token: str,
+                           batch: List, now: datetime) -> List[Dict]:
+        async with token_semaphore, self.global_semaphore:
+            await linkedin_rate_limiter.acquire(access_token, member_limited=False)
+            result = await self.client.batch_get_social_actions(
+                access_token, [post.linkedin_post_id for post in batch]
+            )
+
+        rows = []
+        stats = result.get("stats", {}) if result.get("success") else {}
+        if not result.get("success"):
+            logger.warning(f"Analytics batch of {len(batch)} failed: {result.get('error')}")
+        for post in batch:
+            row = {
+                "post_id": post.post_id,
+                "user_id": post.user_id,
+                # Failed posts still move forward, so one bad token can't hot-loop
+                "next_sync_at": now + next_sync_interval(post.published_time, now),
+            }
+            if post.linkedin_post_id in stats:
+                row.update(stats[post.linkedin_post_id])
+                row["last_synced_at"] = now
+            rows.append(row)
+        return rows
+
+    async def run_once(self) -> int:
+        now = datetime.utcnow()
+        posts = await asyncio.to_thread(self.due_posts, now)
+        if not posts:
+            return 0
+
+        by_token = defaultdict(list)
+        for post in posts:
+            by_token[post.access_token].append(post)
+
+        tasks = []
+        for access_token, token_posts in by_token.items():
+            token_semaphore = asyncio.Semaphore(PER_TOKEN_CONCURRENCY)
+            for start in range(0, len(token_posts), BATCH_GET_MAX_IDS):
+                batch = token_posts[start:start + BATCH_GET_MAX_IDS]
+                tasks.append(self._fetch_batch(token_semaphore, access_token, batch, now))
+
+        rows = [row for batch_rows in await asyncio.gather(*tasks) for row in batch_rows]
+        written = await asyncio.to_thread(self.write_results, rows)
+        logger.info(f"Analytics sync: {written} posts across {len(by_token)} tokens")
+        return written
+
+    async def run(self):
+        while not self._stopping:
+            try:
+                written = await self.run_once()
+            except Exception as e:
+                logger.error(f"Analytics sync pass failed: {e}")
+                written = 0
+            # A full pass likely means a backlog; go again right away
+            if written < SYNC_PASS_LIMIT:
+                await asyncio.sleep(SYNC_POLL_INTERVAL_SECONDS)
+
+    def stop(self):
+        self._stopping = True
+
+
+async def main(once: bool = False):
+    worker = AnalyticsSyncWorker()
+    try:
+        if once:
+            await worker.run_once()
+        else:
+            await worker.run()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main(once="--once" in sys.argv))
@@ -0,0 +1,36 @@
+# backend/app/workers/generation_tasks.py
+"""
+Celery worker for generation jobs, used when GENERATION_BACKEND=celery.
+
+    celery -A app.workers.generation_tasks worker --concurrency 4
+
+The API stores the job and sends its id; the worker runs the same runner
+the local pool would, writing stage progress and the result to
+generation_jobs where the API's polling endpoint and WebSocket read it.
+Acks are late, so a job whose worker dies is redelivered; it only runs
+again if it never got past the queued state, otherwise the API marks it
+failed once it has been running for twice the job timeout.
+"""
+import asyncio
+import os
+from celery import Celery
+from ..logging_config import setup_logging
+from ..api import content  # noqa: F401  (registers the generate/improve runners)
+from ..services.generation_jobs import generation_queue
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+
+setup_logging()
+
+celery_app = Celery("linkedin_ai_agent", broker=CELERY_BROKER_URL)
+celery_app.conf.update(
+    task_acks_late=True,
+    # A generation is long; don't let one worker hoard queued jobs
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+)
+
+
+@celery_app.task(name="generation_jobs.run")
+def run_generation_job(job_id: int):
+    asyncio.run(generation_queue.run_job(job_id))
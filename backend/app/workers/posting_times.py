@@ -0,0 +1,52 @@
+# backend/app/workers/posting_times.py
+"""
+Optimal posting time job.
+
+    python -m app.workers.posting_times          # run forever
+    python -m app.workers.posting_times --once   # one pass, then exit
+
+Each pass finds users whose analytics changed since their last run, bins
+their published posts by weekday and hour (UTC) weighted by engagement,
+smooths the histograms toward industry priors and stores the best slots
+in UserSettings.optimal_posting_times, which the dashboard serves.
+"""
+import logging
+import os
+import sys
+import time
+from ..database import SessionLocal
+from ..logging_config import setup_logging
+from ..services.posting_times import refresh_posting_times
+
+logger = logging.getLogger(__name__)
+
+POSTING_TIMES_INTERVAL_SECONDS = float(os.getenv("POSTING_TIMES_INTERVAL", "3600"))
+
+
+def run_once() -> int:
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        updated = refresh_posting_times(db)
+        logger.info(f"Posting times: {updated} users in {time.monotonic() - started:.1f}s")
+        return updated
+    finally:
+        db.close()
+
+
+def main(once: bool = False):
+    while True:
+        try:
+            run_once()
+        except Exception as e:
+            logger.error(f"Posting time pass failed: {e}")
+            if once:
+                raise
+        if once:
+            return
+        time.sleep(POSTING_TIMES_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main(once="--once" in sys.argv)
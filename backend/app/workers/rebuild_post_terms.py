@@ -0,0 +1,31 @@
+# backend/app/workers/rebuild_post_terms.py
+"""
+One-off rebuild of post_topics / post_hashtags, the per-user stats and the
+industry hashtag graph from existing posts and analytics:
+
+    python -m app.workers.rebuild_post_terms
+
+New posts and analytics updates keep the tables current on their own;
+this is only needed for data written before they existed.
+"""
+import logging
+from ..database import SessionLocal
+from ..logging_config import setup_logging
+from ..services.hashtag_recommender import rebuild_hashtag_graph
+from ..services.post_terms import rebuild_post_terms
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        logger.info(f"Indexed topics and hashtags for {rebuild_post_terms(db)} posts")
+        logger.info(f"Rebuilt hashtag graph from {rebuild_hashtag_graph(db)} published posts")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,337 @@
+# backend/app/workers/scheduler.py
+"""
+Scheduled post publisher.
+
+Run one or more of these next to the API:
+
+    python -m app.workers.scheduler
+
+Workers claim due posts with SELECT ... FOR UPDATE SKIP LOCKED and stamp a
+lease on them, so any number of workers (on any number of nodes) can run
+without two of them publishing the same post. Posts due within the claim
+horizon are held in a local timing wheel and fired on time instead of
+tight-polling the database. A worker that dies simply lets its leases
+expire, and the posts become claimable again. A post that was already
+flipped to 'publishing' is never reclaimed automatically, since the
+LinkedIn call may have gone through; a publish that raises hands its post
+back itself (rescheduled if nothing was sent, failed otherwise).
+Publishing a scheduled post directly (POST /api/linkedin/publish) flips
+it out of 'scheduled' first, so the scheduler skips it.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_, update
+from ..database import SessionLocal
+from ..logging_config import setup_logging
+from ..models.post import Post
+from ..models.user import User
+from ..services.http_client import close_http_client
+from ..services.linkedin_publisher import LinkedInPublisher
+from ..services.linkedin_rate_limiter import linkedin_rate_limiter
+from ..services.linkedin_tokens import token_usable
+from ..services.post_publishing import mark_post_published
+
+logger = logging.getLogger(__name__)
+
+# Claim posts due within this many seconds
+CLAIM_HORIZON_SECONDS = int(os.getenv("SCHEDULER_HORIZON_SECONDS", "60"))
+# Lease must outlive the horizon plus the publish call itself
+LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "300"))
+POLL_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_POLL_INTERVAL", "5"))
+# Backpressure: posts held in the wheel plus publishes in flight
+MAX_IN_FLIGHT = int(os.getenv("SCHEDULER_MAX_IN_FLIGHT", "50"))
+PUBLISH_CONCURRENCY = int(os.getenv("SCHEDULER_PUBLISH_CONCURRENCY", "5"))
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 120
+
+
+def _utc_naive(value: datetime) -> datetime:
+    """Compare aware (PostgreSQL) and naive (utcnow/SQLite) datetimes safely"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class TimingWheel:
+    """Single-level timing wheel with one-second slots covering the claim horizon"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.slots: List[Dict[int, float]] = [dict() for _ in range(size)]
+        self.current_tick = int(time.time())
+        self.count = 0
+
+    def add(self, item_id: int, due_ts: float):
+        # Overdue items go in the current slot and fire on the next advance
+        tick = max(int(due_ts), self.current_tick)
+        self.slots[tick % self.size][item_id] = due_ts
+        self.count += 1
+
+    def advance(self, now_ts: float) -> List[int]:
+        """Move the wheel up to now and return the items that became due"""
+        due = []
+        now_tick = int(now_ts)
+        while self.current_tick <= now_tick:
+            slot = self.slots[self.current_tick % self.size]
+            ready = [item_id for item_id, due_ts in slot.items() if due_ts <= now_ts]
+            for item_id in ready:
+                del slot[item_id]
+            due.extend(ready)
+            if self.current_tick == now_tick:
+                break
+            self.current_tick += 1
+        self.count -= len(due)
+        return due
+
+
+class SchedulerMetrics:
+    """Publish lag (actual minus scheduled time) and outcome counters"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.lags: List[float] = []
+        self.published = 0
+        self.failed = 0
+        self.claimed = 0
+
+    def record_lag(self, seconds: float):
+        self.lags.append(seconds)
+        del self.lags[:-self.window]
+
+    def snapshot(self) -> Dict:
+        lags = sorted(self.lags)
+
+        def pct(p):
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))], 3) if lags else None
+
+        return {
+            "claimed": self.claimed,
+            "published": self.published,
+            "failed": self.failed,
+            "lag_p50_seconds": pct(0.50),
+            "lag_p95_seconds": pct(0.95),
+            "lag_max_seconds": round(lags[-1], 3) if lags else None,
+        }
+
+
+class ScheduledPostWorker:
+    def __init__(self, worker_id: Optional[str] = None, publisher: Optional[LinkedInPublisher] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.publisher = publisher or LinkedInPublisher()
+        self.wheel = TimingWheel(CLAIM_HORIZON_SECONDS + 1)
+        self.metrics = SchedulerMetrics()
+        self.semaphore = asyncio.Semaphore(PUBLISH_CONCURRENCY)
+        self.running: set = set()
+        self._stopping = False
+
+    def in_flight(self) -> int:
+        return self.wheel.count + len(self.running)
+
+    def claim_due_posts(self, limit: int) -> List[Tuple[int, datetime]]:
+        """Lease up to `limit` posts due within the horizon (blocking)"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            rows = (
+                db.query(Post.id, Post.scheduled_time)
+                .filter(
+                    Post.status == "scheduled",
+                    Post.scheduled_time <= now + timedelta(seconds=CLAIM_HORIZON_SECONDS),
+                    or_(Post.publish_lease_until.is_(None), Post.publish_lease_until < now),
+                )
+                .order_by(Post.scheduled_time)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if rows:
+                db.execute(
+                    update(Post)
+                    .where(Post.id.in_([row.id for row in rows]))
+                    .values(
+                        publish_lease_until=now + timedelta(seconds=LEASE_SECONDS),
+                        publish_worker_id=self.worker_id,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            return [(row.id, row.scheduled_time) for row in rows]
+        finally:
+            db.close()
+
+    def _begin_publish(self, post_id: int) -> Optional[Tuple[str, str, str, datetime]]:
+        """
+        Flip the post to 'publishing' only if we still hold its lease.
+        A worker whose lease expired and was reclaimed loses this race.
+        """
+        db = SessionLocal()
+        try:
+            claimed = db.execute(
+                update(Post)
+                .where(
+                    Post.id == post_id,
+                    Post.status == "scheduled",
+                    Post.publish_worker_id == self.worker_id,
+                )
+                .values(status="publishing")
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not claimed:
+                db.rollback()
+                return None
+
+            post = db.query(Post).filter(Post.id == post_id).first()
+            user = db.query(User).filter(User.id == post.user_id).first()
+            # Expired tokens fail here instead of costing a LinkedIn call
+            if not token_usable(user):
+                post.status = "failed"
+                post.publish_lease_until = None
+                db.commit()
+                logger.warning(f"Post {post_id} not published: LinkedIn not connected or token expired")
+                return None
+
+            db.commit()
+            return user.access_token, f"urn:li:person:{user.linkedin_id}", post.content, post.scheduled_time
+        finally:
+            db.close()
+
+    def _finish_publish(self, post_id: int, result: Dict):
+        db = SessionLocal()
+        try:
+            post = db.query(Post).filter(Post.id == post_id).first()
+            if result.get("success"):
+                mark_post_published(db, post, result)
+            else:
+                self._retry_or_fail(post)
+            db.commit()
+        finally:
+            db.close()
+
+    def _retry_or_fail(self, post: Post):
+        post.publish_attempts = (post.publish_attempts or 0) + 1
+        if post.publish_attempts >= MAX_ATTEMPTS:
+            post.status = "failed"
+            post.publish_lease_until = None
+        else:
+            # Back to the queue; the lease doubles as the retry delay
+            post.status = "scheduled"
+            post.publish_worker_id = None
+            post.publish_lease_until = datetime.utcnow() + timedelta(seconds=RETRY_DELAY_SECONDS)
+
+    def _abort_publish(self, post_id: int, retry: bool):
+        """
+        Hand back a post whose publish raised. Retried later only if the
+        LinkedIn call never went out; otherwise failed, never sent twice.
+        """
+        db = SessionLocal()
+        try:
+            post = db.query(Post).filter(Post.id == post_id, Post.status == "publishing").first()
+            if post is None:
+                return
+            if retry:
+                self._retry_or_fail(post)
+            else:
+                post.status = "failed"
+                post.publish_lease_until = None
+            db.commit()
+        finally:
+            db.close()
+
+    async def publish(self, post_id: int):
+        async with self.semaphore:
+            claim = await asyncio.to_thread(self._begin_publish, post_id)
+            if claim is None:
+                return
+            access_token, person_urn, content, scheduled_time = claim
+
+            request_sent = False
+            result = {}
+            try:
+                await linkedin_rate_limiter.acquire(person_urn)
+                request_sent = True
+                result = await self.publisher.publish_post(
+                    access_token=access_token,
+                    person_urn=person_urn,
+                    content=content
+                )
+                await asyncio.to_thread(self._finish_publish, post_id, result)
+            except Exception as e:
+                # A DB error or an unexpected publisher error: don't leave the post in 'publishing'
+                self.metrics.failed += 1
+                if result.get("success"):
+                    logger.error(f"Post {post_id} published as {result.get('post_id')} but not recorded: {e}")
+                else:
+                    logger.exception(f"Post {post_id} publish crashed: {e}")
+                try:
+                    await asyncio.to_thread(self._abort_publish, post_id, not request_sent)
+                except Exception as e:
+                    logger.error(f"Could not release post {post_id} after a crashed publish: {e}")
+                return
+
+            if result.get("success"):
+                self.metrics.published += 1
+                lag = (datetime.utcnow() - _utc_naive(scheduled_time)).total_seconds()
+                self.metrics.record_lag(lag)
+            else:
+                self.metrics.failed += 1
+                logger.warning(f"Post {post_id} publish failed: {result.get('error')}")
+
+    def _spawn(self, post_id: int):
+        task = asyncio.create_task(self.publish(post_id))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def run(self):
+        logger.info(f"Scheduler worker {self.worker_id} started")
+        next_poll = 0.0
+        last_report = time.monotonic()
+
+        while not self._stopping:
+            now_mono = time.monotonic()
+            capacity = MAX_IN_FLIGHT - self.in_flight()
+            if now_mono >= next_poll and capacity > 0:
+                try:
+                    claimed = await asyncio.to_thread(self.claim_due_posts, capacity)
+                except Exception as e:
+                    logger.error(f"Claiming scheduled posts failed: {e}")
+                    claimed = []
+                self.metrics.claimed += len(claimed)
+                for post_id, scheduled_time in claimed:
+                    due_ts = _utc_naive(scheduled_time).replace(tzinfo=timezone.utc).timestamp()
+                    self.wheel.add(post_id, due_ts)
+                # A full batch means more may be due right now
+                next_poll = now_mono + (0 if len(claimed) == capacity else POLL_INTERVAL_SECONDS)
+
+            for post_id in self.wheel.advance(time.time()):
+                self._spawn(post_id)
+
+            if now_mono - last_report >= 60:
+                logger.info(f"Scheduler metrics: {self.metrics.snapshot()}")
+                last_report = now_mono
+
+            # Sleep to the next wheel tick
+            await asyncio.sleep(1 - (time.time() % 1))
+
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+
+    def stop(self):
+        self._stopping = True
+
+
+async def main():
+    try:
+        await ScheduledPostWorker().run()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
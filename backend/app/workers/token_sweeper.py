@@ -0,0 +1,169 @@
+# backend/app/workers/token_sweeper.py
+"""
+LinkedIn token expiry sweeper.
+
+    python -m app.workers.token_sweeper          # run forever
+    python -m app.workers.token_sweeper --once   # one pass, then exit
+
+Each pass range-scans users.token_expiry for tokens expiring within
+TOKEN_REFRESH_AHEAD_DAYS. Tokens with a usable refresh token are
+refreshed in rate-limited batches. The rest get a one-time "reconnect"
+notification, and once they are within TOKEN_DISCONNECT_AHEAD_HOURS of
+expiring they are marked disconnected, so the publisher and analytics
+sync stop spending calls on them. A refresh that fails transiently (5xx,
+network) is retried on the next pass; it only disconnects the user once
+the token has actually expired. API processes see the change once
+their user cache entry expires (USER_CACHE_TTL_SECONDS); the publish
+queue, bulk publish and the scheduler read the token from the database
+at publish time, so they never use a stale one.
+"""
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import or_, tuple_
+from ..database import SessionLocal
+from ..logging_config import setup_logging
+from ..models.user import User
+from ..services.http_client import close_http_client
+from ..services.linkedin_oauth_service import LinkedInOAuthService
+from ..services.linkedin_rate_limiter import linkedin_rate_limiter
+from ..services.linkedin_tokens import apply_token_response
+from ..services.notifications import notify
+
+logger = logging.getLogger(__name__)
+
+REFRESH_AHEAD = timedelta(days=float(os.getenv("TOKEN_REFRESH_AHEAD_DAYS", "7")))
+DISCONNECT_AHEAD = timedelta(hours=float(os.getenv("TOKEN_DISCONNECT_AHEAD_HOURS", "24")))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("TOKEN_SWEEP_INTERVAL", "3600"))
+SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", "200"))
+REFRESH_CONCURRENCY = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "5"))
+
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class TokenSweeper:
+    def __init__(self, oauth_service: Optional[LinkedInOAuthService] = None):
+        self.oauth_service = oauth_service or LinkedInOAuthService()
+        self.semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+    def expiring_users(self, now: datetime, after: Optional[tuple]) -> List:
+        """Next batch of connected users whose token expires within REFRESH_AHEAD, soonest first"""
+        db = SessionLocal()
+        try:
+            query = (
+                db.query(User.id, User.token_expiry, User.refresh_token, User.refresh_token_expiry)
+                .filter(
+                    User.linkedin_connected.is_(True),
+                    User.access_token.isnot(None),
+                    User.token_expiry <= now + REFRESH_AHEAD,
+                )
+            )
+            if after is not None:
+                query = query.filter(tuple_(User.token_expiry, User.id) > after)
+            return query.order_by(User.token_expiry, User.id).limit(SWEEP_BATCH_SIZE).all()
+        finally:
+            db.close()
+
+    async def _refresh(self, user, now: datetime) -> Dict:
+        """Try a refresh; returns the token response or an {"error": ...} dict"""
+        expiry = user.refresh_token_expiry
+        if not user.refresh_token or (expiry is not None and _utc_naive(expiry) <= now):
+            return {"error": "No usable refresh token", "status_code": 400}
+        async with self.semaphore:
+            # Refreshes share the app-wide LinkedIn budget with publishing and sync
+            await linkedin_rate_limiter.acquire(f"token-refresh:{user.id}", member_limited=False)
+            return await self.oauth_service.refresh_access_token(user.refresh_token)
+
+    def _apply(self, batch: List, results: List[Dict], now: datetime) -> List[int]:
+        """Write refreshes, disconnects and notifications for a batch in one transaction"""
+        db = SessionLocal()
+        changed = []
+        try:
+            users = {u.id: u for u in db.query(User).filter(User.id.in_([row.id for row in batch]))}
+            for row, result in zip(batch, results):
+                user = users.get(row.id)
+                # Reconnected or refreshed elsewhere since the scan: the result is about an old token
+                if user is None or user.token_expiry is None or user.token_expiry != row.token_expiry:
+                    continue
+                expiry = _utc_naive(user.token_expiry)
+
+                if "error" not in result:
+                    apply_token_response(user, result, now)
+                    changed.append(user.id)
+                    continue
+
+                rejected = result.get("status_code") in (400, 401)
+                if rejected:
+                    # Refresh token rejected: don't try it again
+                    user.refresh_token = None
+                    user.refresh_token_expiry = None
+
+                # A transient failure leaves a usable refresh token, so only an expired token disconnects
+                if expiry <= now or (rejected and expiry <= now + DISCONNECT_AHEAD):
+                    user.linkedin_connected = False
+                    changed.append(user.id)
+                    notify(
+                        db, user.id, "linkedin_disconnected",
+                        "Your LinkedIn connection has expired. Reconnect LinkedIn to keep publishing.",
+                        dedupe_key=f"linkedin-disconnected:{user.id}:{expiry:%Y-%m-%d}",
+                    )
+                elif rejected:
+                    notify(
+                        db, user.id, "linkedin_token_expiring",
+                        f"Your LinkedIn connection expires on {expiry:%Y-%m-%d}. Reconnect LinkedIn to avoid interruptions.",
+                        dedupe_key=f"linkedin-expiring:{user.id}:{expiry:%Y-%m-%d}",
+                    )
+                # Anything else was a transient refresh failure; the next pass retries it
+            db.commit()
+        finally:
+            db.close()
+        return changed
+
+    async def run_once(self) -> Dict:
+        now = datetime.utcnow()
+        stats = {"checked": 0, "refreshed": 0, "changed": 0}
+        after = None
+        while True:
+            batch = await asyncio.to_thread(self.expiring_users, now, after)
+            if not batch:
+                break
+            results = await asyncio.gather(*(self._refresh(row, now) for row in batch))
+            changed = await asyncio.to_thread(self._apply, batch, results, now)
+
+            stats["checked"] += len(batch)
+            stats["refreshed"] += sum(1 for result in results if "error" not in result)
+            stats["changed"] += len(changed)
+            after = (batch[-1].token_expiry, batch[-1].id)
+        logger.info(f"Token sweep: {stats}")
+        return stats
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Token sweep failed: {e}")
+            await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+
+
+async def main(once: bool = False):
+    sweeper = TokenSweeper()
+    try:
+        if once:
+            await sweeper.run_once()
+        else:
+            await sweeper.run()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main(once="--once" in sys.argv))
@@ -0,0 +1,303 @@
+# backend/benchmarks/hot_functions_bench.py
+"""
+CPU cost of the pure-Python helpers every generation runs, with a
+regression gate against stored baseline timings.
+
+    python -m benchmarks.hot_functions_bench                     # compare to the baseline
+    python -m benchmarks.hot_functions_bench --threshold 0.10    # fail above +10%
+    python -m benchmarks.hot_functions_bench --update-baseline   # re-measure and store
+
+Functions (µs per call, best of --repeat rounds over the whole corpus):
+
+    calculate_character_limit_status   app.api.content
+    trim_content_to_limit              app.api.content (input hashtags copied each call)
+    _predict_engagement                GeminiContentService
+    _extract_hashtags                  GeminiContentService
+    _create_prompt                     GeminiContentService
+    _get_content_structure             GeminiContentService
+
+The corpus is generated from a fixed seed: posts from one line to past
+LinkedIn's 3000 characters, many carrying 10-30 hashtags, with mentions,
+questions, figures and emoji, so both the "fits" and "must trim" paths of
+the limit helpers are exercised.
+
+Machines differ in speed, so each run also times a fixed reference loop
+and scales the baseline by how fast this machine runs it. The run fails
+(exit 1) when a function is slower than baseline * (1 + threshold). The
+baseline is written only when the file is missing or --update-baseline
+is given; commit it alongside the change that moved the numbers.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hot_functions_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+_WORDS = (
+    "team product customers launch quarter growth hiring engineers data pipeline roadmap feedback "
+    "strategy leadership culture remote hybrid meetings focus outcomes metrics revenue churn onboarding "
+    "mentorship learning automation platform security privacy compliance budget partners community"
+).split()
+_OPENERS = [
+    "Last week our team shipped something I have wanted for years.",
+    "Recently I was asked what the hardest part of scaling a team is.",
+    "Here is a story about a failed launch and what it taught us.",
+    "A new study found that 62% of managers skip one-on-ones when busy.",
+    "Remember when everyone said remote work would never last?",
+]
+_CLOSERS = [
+    "What do you think?", "Let me know in the comments.", "Agree?", "What's your experience?",
+    "Share your take below.", "Thoughts?", "",
+]
+_EMOJI = ["🚀", "💡", "📈", "✅", "👉", "🙌"]
+_TAGS = (
+    "leadership innovation productivity careers technology strategy growth ai machinelearning "
+    "remotework hiring startups management marketing sales data analytics cloud security devops "
+    "futureofwork culture mentorship learning saas b2b product engineering design ux"
+).split()
+_POST_TYPES = ["professional", "story", "tips", "question", "announcement", "unknown"]
+_LENGTHS = ["short", "medium", "long", "unknown"]
+_TONES = ["professional", "casual", "inspirational", None]
+_AUDIENCES = ["entry", "manager", "executive", "all", None]
+_INDUSTRIES = ["Technology", "Marketing", "Finance", "Healthcare", "Education", None]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.sample(_WORDS, rng.randint(6, 18))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words)), f"{rng.randint(2, 95)}%")
+    if rng.random() < 0.1:
+        words.insert(rng.randrange(len(words)), f"@{rng.choice(_WORDS)}_{rng.randint(1, 99)}")
+    sentence = " ".join(words).capitalize()
+    return sentence + rng.choice([".", ".", ".", "!", "?"])
+
+
+def _post(rng: random.Random, target_chars: int):
+    """(content with inline hashtags, separate hashtag list) of roughly target_chars"""
+    parts = [rng.choice(_OPENERS)]
+    while sum(len(p) + 1 for p in parts) < target_chars:
+        parts.append(_sentence(rng))
+        if rng.random() < 0.15:
+            parts.append(rng.choice(_EMOJI))
+        if rng.random() < 0.1:
+            parts.append("\n\n")
+    parts.append(rng.choice(_CLOSERS))
+    inline = " ".join(f"#{tag}" for tag in rng.sample(_TAGS, rng.randint(0, 6)))
+    content = " ".join(p for p in parts if p) + (f"\n\n{inline}" if inline else "")
+    hashtags = rng.sample(_TAGS, rng.choice([0, 3, 5, 10, 20, 30]))
+    return content, hashtags
+
+
+def build_corpus(size: int = 200, seed: int = 49):
+    rng = random.Random(seed)
+    # Mostly the lengths Gemini returns, plus a tail at and past the hard limit
+    targets = [rng.choice([80, 200, 400, 800, 1300, 2000, 2600, 2900, 3000, 3400]) for _ in range(size)]
+    return [_post(rng, target) for target in targets]
+
+
+def _users(rng: random.Random, count: int = 8):
+    from app.models.user import User
+
+    return [
+        User(
+            name=f"Bench User {i}", email=f"bench{i}@example.com", hashed_password="x",
+            headline=rng.choice([None, "Engineering leader building calm teams"]),
+            industry=rng.choice(_INDUSTRIES), current_role=rng.choice([None, "VP Engineering"]),
+            company=rng.choice([None, "Acme"]), location=rng.choice([None, "Berlin"]),
+            brand_voice=rng.choice(["professional", "casual", "bold"]),
+            skills=rng.sample(_TAGS, rng.randint(0, 12)),
+        )
+        for i in range(count)
+    ]
+
+
+def _cases(corpus):
+    from app.api.content import calculate_character_limit_status, trim_content_to_limit
+    from app.services.gemini_content_service import GeminiContentService
+
+    service = GeminiContentService()
+    rng = random.Random(7)
+    users = _users(rng)
+    engagement_args = [
+        (content, rng.choice(users), rng.choice(_TONES), rng.choice(_AUDIENCES)) for content, _ in corpus
+    ]
+    prompt_args = [
+        (rng.choice(users), rng.choice(_WORDS), rng.choice(_POST_TYPES), rng.choice(_LENGTHS),
+         rng.choice(_TONES), rng.choice(_AUDIENCES))
+        for _ in corpus
+    ]
+    structure_args = [(rng.choice(_POST_TYPES), rng.choice(_LENGTHS)) for _ in corpus]
+
+    # Each case is a zero-argument loop over the corpus; the count is its number of calls
+    def character_limit_status():
+        for content, hashtags in corpus:
+            calculate_character_limit_status(content, hashtags)
+
+    def trim_to_limit():
+        # trim_content_to_limit pops from the list it is given
+        for content, hashtags in corpus:
+            trim_content_to_limit(content, list(hashtags))
+
+    def predict_engagement():
+        for args in engagement_args:
+            service._predict_engagement(*args)
+
+    def extract_hashtags():
+        for content, _ in corpus:
+            service._extract_hashtags(content)
+
+    def create_prompt():
+        for args in prompt_args:
+            service._create_prompt(*args)
+
+    def content_structure():
+        for args in structure_args:
+            service._get_content_structure(*args)
+
+    return {
+        "calculate_character_limit_status": character_limit_status,
+        "trim_content_to_limit": trim_to_limit,
+        "_predict_engagement": predict_engagement,
+        "_extract_hashtags": extract_hashtags,
+        "_create_prompt": create_prompt,
+        "_get_content_structure": content_structure,
+    }
+
+
+def _reference_loop():
+    # Fixed pure-Python work (string building, splitting, dict lookups) used to
+    # tell a slower machine from slower code
+    table = {str(i): i for i in range(64)}
+    total = 0
+    for i in range(200):
+        text = " ".join(str(j) for j in range(i % 64, i % 64 + 16))
+        total += sum(table.get(word, 0) for word in text.split())
+    return total
+
+
+def _best_seconds(funcs, repeat: int, number: int):
+    """Best time of `repeat` rounds for each func, each round running it `number` times.
+
+    Rounds are interleaved (every func once per round) so a burst of
+    background load lands on all of them, not on whichever ran then.
+    """
+    for func in funcs.values():
+        func()  # warm caches (regex, lru_cache, attribute lookups) outside the timing
+    best = dict.fromkeys(funcs, float("inf"))
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, func in funcs.items():
+                started = time.perf_counter()
+                for _ in range(number):
+                    func()
+                best[name] = min(best[name], time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def measure(corpus_size: int, repeat: int, number: int):
+    corpus = build_corpus(corpus_size)
+    cases = _cases(corpus)
+    best = _best_seconds(dict(cases, reference=_reference_loop), repeat, number)
+    timings = {name: round(best[name] / (number * len(corpus)) * 1e6, 3) for name in cases}
+    reference_us = round(best["reference"] / number * 1e6, 1)
+    return {
+        "corpus": {
+            "posts": len(corpus),
+            "max_chars": max(len(content) for content, _ in corpus),
+            "max_hashtags": max(len(hashtags) for _, hashtags in corpus),
+        },
+        "reference_us": reference_us,
+        "timings_us": timings,
+    }
+
+
+def compare(current, baseline, threshold: float):
+    """Per-function verdicts against a baseline scaled to this machine's speed"""
+    scale = current["reference_us"] / baseline["reference_us"]
+    verdicts = {}
+    for name, us in current["timings_us"].items():
+        if name not in baseline["timings_us"]:
+            verdicts[name] = {"us": us, "baseline_us": None, "change": None, "regressed": False}
+            continue
+        expected = baseline["timings_us"][name] * scale
+        change = us / expected - 1
+        verdicts[name] = {
+            "us": us,
+            "baseline_us": round(expected, 3),
+            "change": round(change, 3),
+            "regressed": change > threshold,
+        }
+    return {"machine_scale": round(scale, 3), "threshold": threshold, "functions": verdicts}
+
+
+def _write_baseline(path, results, args):
+    baseline = dict(
+        results,
+        repeat=args.repeat,
+        number=args.number,
+        python=platform.python_version(),
+        platform=platform.platform(terse=True),
+        measured_at=datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+    )
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=int, default=200, help="posts in the generated corpus")
+    parser.add_argument("--repeat", type=int, default=15, help="timed rounds; the best one counts")
+    parser.add_argument("--number", type=int, default=10, help="passes over the corpus per round")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing, as a fraction (0.25 = +25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = measure(args.corpus, args.repeat, args.number)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        _write_baseline(args.baseline, results, args)
+        print(json.dumps(results, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        report = results
+        status = 0
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report = dict(results, comparison=compare(results, baseline, args.threshold))
+        verdicts = report["comparison"]["functions"]
+        print(f"{'function':<36}{'µs/call':>10}{'baseline':>10}{'change':>9}")
+        for name, v in verdicts.items():
+            change = "new" if v["change"] is None else f"{v['change']:+.1%}"
+            expected = "-" if v["baseline_us"] is None else f"{v['baseline_us']:.3f}"
+            flag = "  REGRESSION" if v["regressed"] else ""
+            print(f"{name:<36}{v['us']:>10.3f}{expected:>10}{change:>9}{flag}")
+        print(f"machine scale {report['comparison']['machine_scale']}x, threshold +{args.threshold:.0%}")
+        regressed = [name for name, v in verdicts.items() if v["regressed"]]
+        if regressed:
+            print(f"Slower than baseline: {', '.join(regressed)}")
+        status = 1 if regressed else 0
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
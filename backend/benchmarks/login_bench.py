@@ -0,0 +1,143 @@
+# backend/benchmarks/login_bench.py
+"""
+Login throughput and latency under concurrent load.
+
+    python -m benchmarks.login_bench                     # hashing pool
+    python -m benchmarks.login_bench --inline            # bcrypt on the event loop (old behaviour)
+    python -m benchmarks.login_bench --requests 400 --concurrency 50 --rounds 12
+
+Drives the app in-process through httpx's ASGI transport against a
+throwaway sqlite database (unless DATABASE_URL is set). While logins
+run, /health is polled every 10 ms; its latency (counted from when each
+poll was due) shows how responsive the event loop stays for everyone else.
+The API rate limiter is switched off for the run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def pct(p):
+        return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 1)
+
+    return {"p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "max_ms": round(samples[-1] * 1000, 1)}
+
+
+async def run(args):
+    import httpx
+    from app.auth.password_hashing import PasswordHasher, password_context
+    from app.auth import auth_utils
+    from app.database import Base, SessionLocal, get_engine
+    from app.main import app
+    from app.models.user import User
+
+    if args.inline:
+        class InlineHasher(PasswordHasher):
+            async def _run(self, fn, *call_args):
+                return fn(*call_args)
+        hasher = InlineHasher(rounds=args.rounds)
+    else:
+        hasher = PasswordHasher(workers=args.workers, rounds=args.rounds)
+    auth_utils.password_hasher = hasher
+    await hasher.start()
+
+    Base.metadata.create_all(bind=get_engine())
+    hashed = password_context(args.rounds).hash("benchmark-password")
+    db = SessionLocal()
+    db.query(User).filter(User.email.like("bench-%@example.com")).delete(synchronize_session=False)
+    db.add_all([
+        User(name=f"Bench {i}", email=f"bench-{i}@example.com", hashed_password=hashed,
+             headline="", industry="", current_role="", company="")
+        for i in range(args.users)
+    ])
+    db.commit()
+    db.close()
+
+    login_latencies, health_latencies = [], []
+    failures = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    done = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i):
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/users/login", json={
+                    "email": f"bench-{i % args.users}@example.com", "password": "benchmark-password"
+                })
+                login_latencies.append(time.perf_counter() - started)
+                failures += response.status_code != 200
+
+        async def poll_health():
+            due = time.perf_counter()
+            while not done.is_set():
+                await client.get("/health")
+                # Counted from when the poll was due, so time spent waiting
+                # for a blocked event loop shows up too
+                health_latencies.append(time.perf_counter() - due)
+                due = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+
+        poller = asyncio.create_task(poll_health())
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(login(i) for i in range(args.requests)))
+        finally:
+            elapsed = time.perf_counter() - started
+            done.set()
+            await poller
+
+    hasher.shutdown()
+    return {
+        "mode": "inline" if args.inline else f"process-pool({args.workers})",
+        "bcrypt_rounds": args.rounds,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "failures": failures,
+        "logins_per_second": round(args.requests / elapsed, 1),
+        "login": _percentiles(login_latencies),
+        "health_during_load": _percentiles(health_latencies),
+        "health_mean_ms": round(statistics.mean(health_latencies) * 1000, 1) if health_latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))))
+    parser.add_argument("--inline", action="store_true", help="verify on the event loop, as before the hashing pool")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/login_bench.db"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Every benchmark login comes from one address, which the API rate
+    # limiter would throttle; this measures hashing, not the limiter
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if not results["failures"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# backend/benchmarks/serialization_bench.py
+"""
+Cost of turning a page of posts into JSON, per 1k posts.
+
+    python -m benchmarks.serialization_bench
+    python -m benchmarks.serialization_bench --posts 5000 --fields all
+
+Compares the ways a post listing has been serialized:
+
+    orm_jsonable     full Post objects, dicts built from attributes, then
+                     jsonable_encoder + json.dumps (FastAPI without a
+                     response model; no preview, that one is computed in SQL)
+    rows_jsonable    selected columns, dicts via getattr, jsonable_encoder +
+                     json.dumps (the paginated listing before orjson)
+    response_model   dicts validated and dumped through the DraftsPage
+                     response model, then orjson (a validated endpoint;
+                     unselected fields come out as nulls)
+    rows_orjson      selected columns, dict(zip(...)) from the row tuples,
+                     straight to orjson (the listings now)
+
+Runs against a throwaway sqlite database unless DATABASE_URL is set.
+Fetch and encode are timed separately; the figure that matters is the
+total per 1k posts.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def run(args):
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+    from app.api.content import DraftsPage
+    from app.api.pagination import POST_FIELDS, POST_SUMMARY_FIELDS
+    from app.database import Base, SessionLocal, get_engine
+    from app.models.post import Post
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    user = db.query(User).filter_by(email="serialization-bench@example.com").first()
+    if user is None:
+        user = User(name="Bench", email="serialization-bench@example.com", hashed_password="-")
+        db.add(user)
+        db.flush()
+    db.query(Post).filter(Post.user_id == user.id).delete(synchronize_session=False)
+    db.add_all([
+        Post(
+            user_id=user.id,
+            content=f"Post {i}: " + "A reasonably long LinkedIn post body. " * 20,
+            hashtags=["ai", "leadership", f"tag{i % 50}"],
+            topics_used=["AI"],
+            status="draft",
+            predicted_engagement={"predicted_likes": i % 300, "engagement_score": i % 100},
+        )
+        for i in range(args.posts)
+    ])
+    db.commit()
+
+    fields = [f for f in POST_FIELDS if f != "preview"] if args.fields == "all" else list(POST_SUMMARY_FIELDS)
+    columns = [POST_FIELDS[f].label(f) for f in fields]
+    mine = Post.user_id == user.id
+
+    def stdlib_dumps(content):
+        # What starlette's JSONResponse.render does
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+    def page(items):
+        return {"drafts": items, "total": len(items), "next_cursor": None, "has_more": False}
+
+    orm_attrs = [f for f in fields if f != "preview"]
+    variants = {
+        "orm_jsonable": (
+            lambda: db.query(Post).filter(mine).all(),
+            lambda posts: stdlib_dumps(jsonable_encoder(page([{f: getattr(p, f) for f in orm_attrs} for p in posts]))),
+        ),
+        "rows_jsonable": (
+            lambda: db.query(*columns).filter(mine).all(),
+            lambda rows: stdlib_dumps(jsonable_encoder(page([{f: getattr(row, f) for f in fields} for row in rows]))),
+        ),
+        "response_model": (
+            lambda: db.query(*columns).filter(mine).all(),
+            lambda rows: orjson.dumps(
+                DraftsPage.model_validate(page([dict(zip(fields, row)) for row in rows])).model_dump(mode="json")
+            ),
+        ),
+        "rows_orjson": (
+            lambda: db.query(*columns).filter(mine).all(),
+            lambda rows: orjson.dumps(page([dict(zip(fields, row)) for row in rows])),
+        ),
+    }
+
+    per_1k = 1000 / args.posts
+    results = {}
+    for name, (fetch, encode) in variants.items():
+        def fetch_fresh():
+            # Drop the identity map so ORM loads really build objects each time
+            db.expunge_all()
+            return fetch()
+
+        fetch_s, rows = _time(fetch_fresh, args.repeat)
+        encode_s, body = _time(lambda: encode(rows), args.repeat)
+        results[name] = {
+            "fetch_ms_per_1k": round(fetch_s * 1000 * per_1k, 2),
+            "encode_ms_per_1k": round(encode_s * 1000 * per_1k, 2),
+            "total_ms_per_1k": round((fetch_s + encode_s) * 1000 * per_1k, 2),
+            "bytes": len(body),
+        }
+
+    db.query(Post).filter(mine).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+    baseline = results["rows_jsonable"]["total_ms_per_1k"]
+    for result in results.values():
+        result["speedup_vs_rows_jsonable"] = round(baseline / result["total_ms_per_1k"], 2) if result["total_ms_per_1k"] else None
+    return {"posts": args.posts, "fields": fields, "repeat": args.repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--fields", choices=["summary", "all"], default="summary",
+                        help="default listing projection, or every column")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/serialization_bench.db"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# backend/benchmarks/startup_bench.py
+"""
+Cold start: how long a fresh process takes to import the app, become
+ready (lifespan startup done) and serve its first requests.
+
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --runs 7 --warm-up
+
+Each run is a new interpreter, so nothing is cached between runs. Times
+are medians across runs, in milliseconds:
+
+    import_ms            import app.main
+    ready_ms             import + lifespan startup (what a readiness probe waits for)
+    first_health_ms      first GET /health after ready
+    first_db_ms          first request that touches the database (/db-test)
+    first_gemini_ms      resolving the Gemini client, paid by the first generation
+    process_ms           interpreter start to first_db, measured from outside
+
+--warm-up sets WARM_UP_ON_STARTUP=true: ready_ms grows by what the first
+requests no longer pay. Runs against a throwaway sqlite database unless
+DATABASE_URL is set; GEMINI_API_KEY is not needed (no call is made).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _child():
+    """One cold start, reported as JSON on stdout"""
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def serve():
+        import httpx
+        from app.api.content import ai_service
+
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                t = time.perf_counter()
+                await client.get("/health")
+                first_health = time.perf_counter() - t
+                t = time.perf_counter()
+                await client.get("/db-test")
+                first_db = time.perf_counter() - t
+            t = time.perf_counter()
+            await asyncio.to_thread(ai_service.warm_up)
+            first_gemini = time.perf_counter() - t
+        return ready, first_health, first_db, first_gemini
+
+    ready, first_health, first_db, first_gemini = asyncio.run(serve())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "ready_ms": (ready - started) * 1000,
+        "first_health_ms": first_health * 1000,
+        "first_db_ms": first_db * 1000,
+        "first_gemini_ms": first_gemini * 1000,
+    }))
+
+
+def run(args):
+    env = dict(os.environ, LOG_LEVEL="WARNING", PYTHONWARNINGS="ignore")
+    if not env.get("DATABASE_URL"):
+        env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/startup_bench.db"
+        # Tables exist before the timed runs, as they would in production
+        subprocess.run(
+            [sys.executable, "-c",
+             "from app.database import Base, get_engine; import app.models; Base.metadata.create_all(bind=get_engine())"],
+            env=env, check=True,
+        )
+    env["WARM_UP_ON_STARTUP"] = "true" if args.warm_up else "false"
+
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-m", "benchmarks.startup_bench", "--child"],
+                             env=env, check=True, capture_output=True, text=True).stdout
+        process_ms = (time.perf_counter() - started) * 1000
+        sample = json.loads(out.strip().splitlines()[-1])
+        sample["process_ms"] = process_ms
+        samples.append(sample)
+
+    return {
+        "runs": args.runs,
+        "warm_up": args.warm_up,
+        "median": {key: round(statistics.median(s[key] for s in samples), 1) for key in samples[0]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm-up", action="store_true", help="start with WARM_UP_ON_STARTUP=true")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return 0
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 # backend/create_db.py
-from app.database import engine, Base, test_connection
+from app.database import get_engine, Base, test_connection
 from app.models import *  # Import all models
 import sys
 
@@ -13,10 +13,10 @@ def recreate_tables():
         
         print("⚠️  WARNING: This will delete all existing data!")
         print("🗑️  Dropping all existing tables...")
-        Base.metadata.drop_all(bind=engine)
+        Base.metadata.drop_all(bind=get_engine())
         
         print("🏗️  Creating all tables with updated schema...")
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         print("✅ Database schema updated successfully!")
         
         # Print created tables
@@ -0,0 +1,61 @@
+# backend/devtools/fake_gemini.py
+"""
+Local stand-in for the Gemini model, so load tests and local runs make no
+paid (or rate-limited) calls. Select it with:
+
+    GEMINI_BACKEND=fake
+
+It answers generate_content(prompt) like google.generativeai's
+GenerativeModel: from a worker thread, after a blocking delay, with an
+object whose .text is a plausible LinkedIn post (a few sentences and
+hashtags, derived from the prompt so repeated prompts answer the same).
+
+FAKE_GEMINI_LATENCY_MS (default 800) and FAKE_GEMINI_JITTER_MS (default
+200) shape the delay; FAKE_GEMINI_FAIL_RATE (0-1) makes that share of
+calls raise, as a quota or network error would.
+"""
+import hashlib
+import os
+import random
+import re
+import time
+
+LATENCY_SECONDS = float(os.getenv("FAKE_GEMINI_LATENCY_MS", "800")) / 1000
+JITTER_SECONDS = float(os.getenv("FAKE_GEMINI_JITTER_MS", "200")) / 1000
+FAIL_RATE = float(os.getenv("FAKE_GEMINI_FAIL_RATE", "0"))
+
+_SENTENCES = [
+    "Most teams underestimate how much {topic} changes the way they plan.",
+    "Last quarter we tried a different approach to {topic}, and the results surprised us.",
+    "The biggest lesson: start small, measure honestly, and share what you learn.",
+    "Data beats opinions, but only when everyone can see the same numbers.",
+    "The hard part of {topic} is rarely the technology; it's the habits around it.",
+    "Three things made the difference: clear ownership, short feedback loops and patience.",
+    "If you're just getting started, pick one workflow and make it boringly reliable.",
+    "What would you add from your own experience?",
+]
+_HASHTAGS = ["leadership", "innovation", "productivity", "careers", "technology", "strategy", "growth"]
+_TOPIC = re.compile(r"Topic:\s*(.+)")
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name: str = "gemini-1.5-flash"):
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        time.sleep(max(0.0, LATENCY_SECONDS + random.uniform(-JITTER_SECONDS, JITTER_SECONDS)))
+        if FAIL_RATE and random.random() < FAIL_RATE:
+            raise RuntimeError("Injected fake Gemini failure")
+
+        match = _TOPIC.search(prompt)
+        topic = match.group(1).strip() if match else "this"
+        # Same prompt, same post
+        rng = random.Random(hashlib.sha256(prompt.encode()).digest())
+        sentences = [s.format(topic=topic) for s in rng.sample(_SENTENCES, rng.randint(4, 7))]
+        hashtags = " ".join(f"#{tag}" for tag in rng.sample(_HASHTAGS, 3))
+        return FakeResponse("\n\n".join(sentences) + "\n\n" + hashtags)
@@ -0,0 +1,109 @@
+# backend/devtools/fake_linkedin.py
+"""
+Local stand-in for the LinkedIn OAuth and REST endpoints the backend calls.
+
+    uvicorn devtools.fake_linkedin:app --port 8081
+
+Point the backend at it with:
+
+    LINKEDIN_OAUTH_BASE=http://127.0.0.1:8081/oauth/v2
+    LINKEDIN_API_BASE=http://127.0.0.1:8081/v2
+
+FAKE_LINKEDIN_LATENCY_MS adds a fixed delay to every call and
+FAKE_LINKEDIN_FAIL_RATE (0-1) makes that share of publishes fail with
+FAKE_LINKEDIN_FAIL_STATUS (default 503; 429 also sends Retry-After).
+"""
+import asyncio
+import itertools
+import os
+import random
+import secrets
+import time
+from fastapi import FastAPI, Form, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+LATENCY_SECONDS = float(os.getenv("FAKE_LINKEDIN_LATENCY_MS", "0")) / 1000
+FAIL_RATE = float(os.getenv("FAKE_LINKEDIN_FAIL_RATE", "0"))
+FAIL_STATUS = int(os.getenv("FAKE_LINKEDIN_FAIL_STATUS", "503"))
+
+app = FastAPI(title="Fake LinkedIn API")
+
+_post_ids = itertools.count(1)
+_tokens = {}
+published = {}
+
+
+async def _simulate_latency():
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+
+
+def _member_for(authorization: str) -> str:
+    token = (authorization or "").removeprefix("Bearer ").strip()
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing access token")
+    # Unknown tokens are accepted so load tests can use made-up ones
+    return _tokens.setdefault(token, f"member-{abs(hash(token)) % 10_000_000}")
+
+
+@app.post("/oauth/v2/accessToken")
+async def access_token(grant_type: str = Form(...), code: str = Form(None), refresh_token: str = Form(None)):
+    await _simulate_latency()
+    if grant_type not in ("authorization_code", "refresh_token"):
+        raise HTTPException(status_code=400, detail="unsupported_grant_type")
+
+    token = f"fake-{secrets.token_urlsafe(16)}"
+    _tokens[token] = f"member-{abs(hash(code or refresh_token)) % 10_000_000}"
+    return {
+        "access_token": token,
+        "expires_in": 5184000,
+        "refresh_token": f"fake-refresh-{secrets.token_urlsafe(16)}",
+        "refresh_token_expires_in": 31536000,
+        "scope": "openid email profile w_member_social",
+    }
+
+
+@app.get("/v2/userinfo")
+async def userinfo(authorization: str = Header(None)):
+    await _simulate_latency()
+    member = _member_for(authorization)
+    return {
+        "sub": member,
+        "name": f"Fake {member}",
+        "email": f"{member}@example.com",
+        "email_verified": True,
+    }
+
+
+@app.post("/v2/ugcPosts", status_code=201)
+async def ugc_posts(request: Request, authorization: str = Header(None)):
+    await _simulate_latency()
+    _member_for(authorization)
+    if FAIL_RATE and random.random() < FAIL_RATE:
+        headers = {"Retry-After": "1"} if FAIL_STATUS == 429 else None
+        return JSONResponse(status_code=FAIL_STATUS, content={"message": "Injected failure"}, headers=headers)
+
+    body = await request.json()
+    post_urn = f"urn:li:share:{next(_post_ids)}"
+    published[post_urn] = body
+    return JSONResponse(status_code=201, content={"id": post_urn}, headers={"X-RestLi-Id": post_urn})
+
+
+@app.get("/v2/socialActions")
+async def social_actions(ids: str, authorization: str = Header(None)):
+    """Batch-get engagement summaries: ?ids=List(urn1,urn2,...)"""
+    await _simulate_latency()
+    _member_for(authorization)
+    if not (ids.startswith("List(") and ids.endswith(")")):
+        raise HTTPException(status_code=400, detail="ids must be List(...)")
+
+    results = {}
+    for urn in filter(None, ids[5:-1].split(",")):
+        # Deterministic counts that grow over time, so repeated syncs see changes
+        seed = abs(hash(urn)) % 97
+        ticks = int(time.time() // 60)
+        results[urn] = {
+            "likesSummary": {"totalLikes": seed + ticks % 50},
+            "commentsSummary": {"aggregatedTotalComments": seed // 5 + ticks % 7},
+        }
+    return {"results": results, "statuses": {urn: 200 for urn in results}, "errors": {}}
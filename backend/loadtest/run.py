@@ -0,0 +1,102 @@
+# backend/loadtest/run.py
+"""
+End-to-end load test: the real API under uvicorn, against SQLite or
+Postgres, with Gemini and LinkedIn faked locally.
+
+    python -m loadtest.run                                   # 20 users, 60 s, SQLite
+    python -m loadtest.run --users 100 --duration 300 --workers 4 \\
+        --database-url postgresql://localhost/linkedin_loadtest
+    python -m loadtest.run --mix generate=0,drafts=10 --out before.json
+    python -m loadtest.run --base-url http://127.0.0.1:8000  # an already running stack
+
+Virtual users register, log in and connect LinkedIn, then loop over a
+weighted mix of generate, improve, drafts, save_draft, schedule, publish,
+dashboard and login (see loadtest.workload.DEFAULT_MIX) with no think
+time unless --think-ms is set. The JSON report has throughput and
+p50/p95/p99 per endpoint, with stable key order, so two runs can be
+compared with a plain diff.
+
+FAKE_GEMINI_LATENCY_MS / FAKE_GEMINI_FAIL_RATE and FAKE_LINKEDIN_LATENCY_MS
+/ FAKE_LINKEDIN_FAIL_RATE shape the fakes. Rate limiting is off unless
+--rate-limit is given, so the test measures capacity, not the limiter.
+A Postgres database must exist; its tables are created if missing.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from .servers import BACKEND_DIR, running_stack
+from .workload import parse_mix, run_workload
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after the ramp")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's actions")
+    parser.add_argument("--mix", help="action weights, e.g. generate=3,drafts=5 (0 disables)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    parser.add_argument("--base-url", help="load an already running API instead of starting one")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the API rate limiter on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="loadtest-results.json")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    workload = dict(users=args.users, duration=args.duration, mix=mix, think=args.think_ms / 1000,
+                    ramp=args.ramp, seed=args.seed)
+    if args.base_url:
+        database = "external"
+        results = asyncio.run(run_workload(args.base_url, **workload))
+    else:
+        database = (args.database_url or "sqlite").split(":", 1)[0]
+        with running_stack(args.database_url, workers=args.workers, rate_limit=args.rate_limit) as base_url:
+            results = asyncio.run(run_workload(base_url, **workload))
+
+    report = {
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "ramp_s": args.ramp,
+            "think_ms": args.think_ms,
+            "mix": mix,
+            "workers": args.workers,
+            "database": database,
+            "rate_limit": args.rate_limit,
+            "fake_gemini_latency_ms": float(os.getenv("FAKE_GEMINI_LATENCY_MS", "800")),
+            "fake_linkedin_latency_ms": float(os.getenv("FAKE_LINKEDIN_LATENCY_MS", "0")),
+            "seed": args.seed,
+        },
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    print(f"{results['requests']} requests in {results['duration_s']}s "
+          f"({results['throughput_rps']} req/s, {results['errors']} errors) -> {args.out}")
+    print(f"{'endpoint':<18}{'req':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, e in results["endpoints"].items():
+        print(f"{name:<18}{e['requests']:>7}{e['errors']:>6}{e['throughput_rps']:>9}"
+              f"{e['p50_ms']:>9}{e['p95_ms']:>9}{e['p99_ms']:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# backend/loadtest/servers.py
+"""
+Processes a load test runs against: the API under uvicorn and the fake
+LinkedIn API, each on a free local port. Gemini is faked inside the API
+process (GEMINI_BACKEND=fake), so its latency lands on the same thread
+pool a real call would use.
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with {process.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def _uvicorn(target: str, port: int, env: Dict[str, str], workers: int = 1) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+def _stop(process: subprocess.Popen):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def create_tables(env: Dict[str, str]):
+    subprocess.run(
+        [sys.executable, "-c",
+         "from app.database import Base, get_engine; import app.models; Base.metadata.create_all(bind=get_engine())"],
+        cwd=BACKEND_DIR, env=env, check=True,
+    )
+
+
+@contextmanager
+def running_stack(database_url: Optional[str] = None, workers: int = 1, rate_limit: bool = False,
+                  extra_env: Optional[Dict[str, str]] = None, ready_timeout: float = 60) -> Iterator[str]:
+    """Start fake LinkedIn and the API; yields the API's base URL"""
+    linkedin_port, api_port = free_port(), free_port()
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url or f"sqlite:///{tempfile.mkdtemp()}/loadtest.db",
+        "GEMINI_BACKEND": "fake",
+        "LINKEDIN_OAUTH_BASE": f"http://127.0.0.1:{linkedin_port}/oauth/v2",
+        "LINKEDIN_API_BASE": f"http://127.0.0.1:{linkedin_port}/v2",
+        "LINKEDIN_CLIENT_ID": env.get("LINKEDIN_CLIENT_ID", "loadtest"),
+        "LINKEDIN_CLIENT_SECRET": env.get("LINKEDIN_CLIENT_SECRET", "loadtest"),
+        "RATE_LIMIT_ENABLED": "true" if rate_limit else "false",
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+        "PYTHONWARNINGS": "ignore",
+    })
+    env.update(extra_env or {})
+    create_tables(env)
+
+    linkedin = _uvicorn("devtools.fake_linkedin:app", linkedin_port, env)
+    api = None
+    try:
+        _wait_ready(f"http://127.0.0.1:{linkedin_port}/docs", linkedin, ready_timeout)
+        api = _uvicorn("app.main:app", api_port, env, workers=workers)
+        _wait_ready(f"http://127.0.0.1:{api_port}/health", api, ready_timeout)
+        yield f"http://127.0.0.1:{api_port}"
+    finally:
+        if api is not None:
+            _stop(api)
+        _stop(linkedin)
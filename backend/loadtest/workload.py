@@ -0,0 +1,223 @@
+# backend/loadtest/workload.py
+"""
+Mixed workload: virtual users that sign up, connect LinkedIn (fake), then
+loop over weighted actions until the test ends, the way the frontend
+drives the API. Every request is timed under an endpoint name.
+"""
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = {
+    "generate": 15,
+    "improve": 5,
+    "drafts": 25,
+    "save_draft": 10,
+    "schedule": 8,
+    "publish": 5,
+    "dashboard": 25,
+    "login": 2,
+}
+
+TOPICS = ["remote work", "AI adoption", "hiring", "product launches", "team culture", "data privacy"]
+LENGTHS = ["short", "medium", "long"]
+PASSWORD = "loadtest-password"
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    """'generate=3,drafts=5' overrides DEFAULT_MIX weights (0 disables an action)"""
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (spec or "").split(",")):
+        name, _, weight = item.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown action {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = int(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * p))]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, status: str, ok: bool):
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, duration: float) -> Dict:
+        endpoints = {}
+        for name in sorted(self.latencies):
+            samples = sorted(self.latencies[name])
+            endpoints[name] = {
+                "requests": len(samples),
+                "errors": self.errors[name],
+                "throughput_rps": round(len(samples) / duration, 2),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+                "max_ms": round(samples[-1] * 1000, 1),
+                "status_codes": dict(sorted(self.statuses[name].items())),
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "duration_s": round(duration, 1),
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0,
+            "throughput_rps": round(total / duration, 2),
+            "endpoints": endpoints,
+        }
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, mix: Dict[str, int], think: float, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+        self.think = think
+        self.rng = rng
+        self.email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+        self.headers: Dict[str, str] = {}
+        self.posts: List[Dict] = []      # {"id", "content"} the user can schedule or publish
+        self.published = set()
+        self.etags: Dict[str, str] = {}
+
+    async def request(self, name: str, method: str, url: str, ok_statuses=(200,), **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(name, time.perf_counter() - started, type(e).__name__, False)
+            return None
+        self.stats.record(name, time.perf_counter() - started, str(response.status_code),
+                          response.status_code in ok_statuses)
+        return response
+
+    async def conditional_get(self, name: str, url: str):
+        # Browsers revalidate with the ETag they hold, so most of these can be 304s
+        headers = dict(self.headers)
+        if url in self.etags:
+            headers["If-None-Match"] = self.etags[url]
+        response = await self.request(name, "GET", url, ok_statuses=(200, 304), headers=headers)
+        if response is not None and response.headers.get("etag"):
+            self.etags[url] = response.headers["etag"]
+
+    # --- Session setup ---
+
+    async def sign_up(self) -> bool:
+        response = await self.request("register", "POST", "/api/users/register", json={
+            "name": "Load Test", "email": self.email, "password": PASSWORD, "industry": "Technology",
+        })
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        await self.login()
+        # The fake LinkedIn accepts any code, so publishing works afterwards
+        await self.request("linkedin_connect", "POST", "/api/linkedin/exchange-token",
+                           json={"code": uuid.uuid4().hex}, headers=self.headers)
+        # Connecting syncs the profile, email included; later logins use the synced one
+        response = await self.request("me", "GET", "/api/users/me", headers=self.headers)
+        if response is not None and response.status_code == 200:
+            self.email = response.json()["email"]
+        return True
+
+    async def login(self):
+        response = await self.request("login", "POST", "/api/users/login",
+                                      json={"email": self.email, "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # --- Actions ---
+
+    async def generate(self):
+        response = await self.request("generate", "POST", "/api/content/generate", headers=self.headers, json={
+            "topic": self.rng.choice(TOPICS), "length": self.rng.choice(LENGTHS),
+        })
+        if response is not None and response.status_code == 200:
+            body = response.json()
+            self.posts.append({"id": body["post_id"], "content": body["content"]})
+
+    async def improve(self):
+        content = self.posts[-1]["content"] if self.posts else "We shipped a new feature this week. Feedback welcome."
+        response = await self.request("improve", "POST", "/api/content/improve", headers=self.headers, json={
+            "current_content": content, "suggestion_type": self.rng.choice(["improve", "shorten", "expand"]),
+        })
+        if response is not None and response.status_code == 200:
+            body = response.json()
+            self.posts.append({"id": body["post_id"], "content": body["content"]})
+
+    async def save_draft(self):
+        content = f"Draft about {self.rng.choice(TOPICS)} #loadtest"
+        response = await self.request("save_draft", "POST", "/api/content/save-draft", headers=self.headers, json={
+            "content": content, "hashtags": ["loadtest"], "topic": "load test",
+        })
+        if response is not None and response.status_code == 200:
+            self.posts.append({"id": response.json()["post_id"], "content": content})
+
+    async def drafts(self):
+        await self.conditional_get("drafts", "/api/content/drafts")
+
+    async def dashboard(self):
+        await self.conditional_get("dashboard", "/api/analytics/dashboard")
+
+    async def schedule(self):
+        if not self.posts:
+            return await self.save_draft()
+        post = self.rng.choice(self.posts)
+        when = datetime.now(timezone.utc) + timedelta(days=self.rng.randint(1, 14))
+        # Posts already published (or on their way) answer 409, which is expected
+        await self.request("schedule", "POST", "/api/content/schedule-post", ok_statuses=(200, 409),
+                           headers=self.headers, json={"post_id": post["id"], "scheduled_time": when.isoformat()})
+
+    async def publish(self):
+        unpublished = [p for p in self.posts if p["id"] not in self.published]
+        if not unpublished:
+            return await self.save_draft()
+        post = unpublished[0]
+        self.published.add(post["id"])
+        await self.request("publish", "POST", "/api/linkedin/publish", ok_statuses=(202,), headers=self.headers,
+                           json={"post_id": post["id"], "content": post["content"]})
+
+    async def run(self, deadline: float):
+        if not await self.sign_up():
+            return
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            await getattr(self, action)()
+            if self.think:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think))
+
+
+async def run_workload(base_url: str, users: int, duration: float, mix: Dict[str, int],
+                       think: float = 0.0, ramp: float = 0.0, seed: int = 0) -> Dict:
+    """Run `users` virtual users for `duration` seconds (users start spread over `ramp`)"""
+    stats = Stats()
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        started = time.monotonic()
+        deadline = started + ramp + duration
+
+        async def user(i: int):
+            if ramp:
+                await asyncio.sleep(ramp * i / users)
+            await VirtualUser(client, stats, mix, think, random.Random(rng.random())).run(deadline)
+
+        await asyncio.gather(*(user(i) for i in range(users)))
+        elapsed = time.monotonic() - started
+    return stats.report(elapsed)
@@ -196,7 +196,7 @@ const ContentGenerator = () => {
         content: editMode ? editableContent : generatedContent.content
       });
       if (response.data.success) {
-        setSnackbar({ open: true, message: 'Published to LinkedIn successfully!', severity: 'success' });
+        setSnackbar({ open: true, message: 'Post queued for publishing to LinkedIn!', severity: 'success' });
       } else {
         setSnackbar({ open: true, message: 'Failed to publish to LinkedIn: ' + response.data.error, severity: 'error' });
       }